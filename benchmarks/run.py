@@ -0,0 +1,232 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from ipaddress import IPv4Network, ip_network
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from simplecidr.calculator import Calculator  # noqa: E402
+from simplecidr.export import iter_division_chunks  # noqa: E402
+from simplecidr.parser import parse_prefix  # noqa: E402
+from simplecidr.vectorized import info_rows_for_prefixes, numpy_available  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# 吞吐量下降或峰值内存上升超过该比例时视为回退
+DEFAULT_TOLERANCE = 0.25
+SEED = 2024
+# 单次采样的最短时间（秒）
+MIN_SAMPLE_SECONDS = 0.5
+
+# BGP 路由表中常见的前缀长度分布（约数）
+BGP_PREFIXLEN_WEIGHTS = {24: 58, 23: 8, 22: 11, 21: 5, 20: 5, 19: 3, 18: 2, 17: 1, 16: 3,
+                         15: 1, 14: 1, 13: 1, 12: 1}
+
+
+# 随机前缀：地址均匀分布，前缀长度 8~32，部分带主机位
+def random_prefixes(count, seed=SEED):
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(count):
+        address = rng.getrandbits(32)
+        lines.append(f"{address >> 24}.{address >> 16 & 255}.{address >> 8 & 255}.{address & 255}"
+                     f"/{rng.randint(8, 32)}")
+    return lines
+
+
+# 类 BGP 前缀：先随机选出若干分配块，再在块内按常见长度分布切出前缀，
+# 因此有大量相邻、嵌套与重复的前缀，接近真实路由表的汇总特征
+def bgp_like_prefixes(count, seed=SEED):
+    rng = random.Random(seed)
+    lengths = list(BGP_PREFIXLEN_WEIGHTS)
+    weights = list(BGP_PREFIXLEN_WEIGHTS.values())
+    allocations = [rng.randrange(1 << 4, 224 << 4) << 20 for _ in range(max(1, count // 200))]
+    lines = []
+    for prefixlen in rng.choices(lengths, weights, k=count):
+        block = rng.choice(allocations)
+        offset = rng.getrandbits(20) >> (32 - prefixlen) << (32 - prefixlen) if prefixlen > 12 else 0
+        lines.append(str(IPv4Network((block + offset, prefixlen))))
+    return lines
+
+
+# 工作负载：返回 (名称, 处理的条目数, 准备函数, 执行函数)；准备阶段不计入时间与内存
+def build_workloads(scale):
+    def division(name, network, new_prefixlen):
+        network = ip_network(network)
+
+        def run(calculator, _):
+            subnets = calculator.calculate_subnets_by_new_prefix(network, new_prefixlen)
+            stop = max(1, int(subnets.count * scale))
+            for _ in iter_division_chunks(calculator, subnets, stop=stop):
+                pass
+        count = max(1, int((1 << (new_prefixlen - network.prefixlen)) * scale))
+        return name, count, lambda: None, run
+
+    def info(name, count):
+        def prepare():
+            return random_prefixes(count)
+
+        def run(calculator, lines):
+            for line in lines:
+                calculator.get_single_subnet_info(line)
+        return name, count, prepare, run
+
+    # 与 info 相同的输入，使用 NumPy 整列计算（未安装 numpy 时跳过）
+    def vectorized_info(name, count):
+        def prepare():
+            return random_prefixes(count)
+
+        def run(calculator, lines):
+            info_rows_for_prefixes([parse_prefix(line) for line in lines])
+        return name, count, prepare, run
+
+    def aggregation(name, generator, count, new_prefixlen):
+        count = max(1, int(count * scale))
+
+        def run(calculator, lines):
+            calculator.aggregation_subnets_by_new_prefix(lines, new_prefixlen)
+        return name, count, lambda: generator(count), run
+
+    # 有界压缩：前缀数量限制为输入的十分之一
+    def compression(name, generator, count):
+        count = max(1, int(count * scale))
+
+        def run(calculator, lines):
+            calculator.compress_subnets(lines, max_prefixes=max(1, count // 10))
+        return name, count, lambda: generator(count), run
+
+    workloads = [
+        info("info_random_20k", max(1, int(20000 * scale))),
+        division("divide_v4_8_to_16", "10.0.0.0/8", 16),
+        division("divide_v4_8_to_24", "10.0.0.0/8", 24),
+        division("divide_v4_8_to_30", "10.0.0.0/8", 30),
+        division("divide_v6_48_to_64", "2001:db8::/48", 64),
+        aggregation("aggregate_random_10k", random_prefixes, 10000, 24),
+        aggregation("aggregate_random_100k", random_prefixes, 100000, 24),
+        aggregation("aggregate_random_1m", random_prefixes, 1000000, 24),
+        aggregation("aggregate_bgp_10k", bgp_like_prefixes, 10000, 24),
+        aggregation("aggregate_bgp_100k", bgp_like_prefixes, 100000, 24),
+        aggregation("aggregate_bgp_1m", bgp_like_prefixes, 1000000, 24),
+        compression("compress_bgp_100k", bgp_like_prefixes, 100000),
+        compression("compress_bgp_1m", bgp_like_prefixes, 1000000),
+    ]
+    if numpy_available():
+        workloads.insert(1, vectorized_info("info_numpy_random_20k", max(1, int(20000 * scale))))
+    return workloads
+
+
+# 运行一次并计时；loops 次取平均，用于耗时很短的工作负载
+def time_run(run, data, loops=1):
+    # 每次使用不带缓存的新实例，测量的是计算本身
+    calculator = Calculator(cache_budget=0)
+    gc.collect()
+    started = time.perf_counter()
+    for _ in range(loops):
+        run(calculator, data)
+    return (time.perf_counter() - started) / loops
+
+
+# 运行一个工作负载：取 repeat 次计时的中位数计算吞吐量（比最快一次更不易受偶然波动影响），
+# 另外单独运行一次用 tracemalloc 统计峰值内存
+def measure(count, prepare, run, repeat, memory=True):
+    data = prepare()
+    # 先运行一次校准，单次过快时循环多次，减少计时误差
+    first = time_run(run, data)
+    loops = max(1, int(MIN_SAMPLE_SECONDS / first)) if first else 1000
+    samples = [first] if loops == 1 else []
+    while len(samples) < repeat:
+        samples.append(time_run(run, data, loops))
+    seconds = statistics.median(samples)
+    peak = None
+    if memory:
+        calculator = Calculator(cache_budget=0)
+        gc.collect()
+        tracemalloc.start()
+        run(calculator, data)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {"count": count, "seconds": seconds, "rate": count / seconds if seconds else 0.0,
+            "peak_mb": None if peak is None else peak / (1 << 20)}
+
+
+# 与基线比较，返回回退说明列表；没有可比较的基线（不存在或数据量不同）时返回 None
+def compare(name, result, baseline, tolerance):
+    base = baseline.get(name)
+    if not base or base.get("count") != result["count"]:
+        return None
+    problems = []
+    if result["rate"] < base["rate"] * (1 - tolerance):
+        problems.append(f"吞吐量 {result['rate']:.0f}/s 低于基线 {base['rate']:.0f}/s")
+    if result["peak_mb"] is not None and base.get("peak_mb") is not None \
+            and result["peak_mb"] > base["peak_mb"] * (1 + tolerance) + 1:
+        problems.append(f"峰值内存 {result['peak_mb']:.1f} MB 高于基线 {base['peak_mb']:.1f} MB")
+    return problems
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get("results", {})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="子网计算热点路径的基准测试")
+    parser.add_argument("-k", "--filter", default="", help="只运行名称包含该字符串的工作负载")
+    parser.add_argument("--repeat", type=int, default=3, help="每个工作负载的重复次数，取中位数")
+    parser.add_argument("--quick", action="store_true", help="数据量缩小为 1/16，用于快速检查")
+    parser.add_argument("--no-memory", action="store_true", help="不统计峰值内存（tracemalloc 会明显变慢）")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="基线文件路径")
+    parser.add_argument("--save-baseline", action="store_true", help="将本次结果保存为新的基线")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="允许的性能波动比例，超过时视为回退")
+    parser.add_argument("--json", metavar="FILE", help="将本次结果另存为 JSON")
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.baseline)
+    results = {}
+    regressions = 0
+    print(f"{'workload':<24}{'count':>10}{'seconds':>10}{'items/s':>14}{'peak MB':>10}  status")
+    for name, count, prepare, run in build_workloads(1 / 16 if args.quick else 1):
+        if args.filter not in name:
+            continue
+        result = measure(count, prepare, run, args.repeat, memory=not args.no_memory)
+        results[name] = result
+        problems = compare(name, result, baseline, args.tolerance)
+        regressions += bool(problems)
+        peak = "-" if result["peak_mb"] is None else f"{result['peak_mb']:.1f}"
+        if problems is None:
+            status = "no baseline"
+        elif problems:
+            status = "REGRESSION: " + "；".join(problems)
+        else:
+            status = "ok"
+        print(f"{name:<24}{count:>10}{result['seconds']:>10.3f}{result['rate']:>14.0f}{peak:>10}  {status}",
+              flush=True)
+
+    report = {"python": platform.python_version(), "machine": platform.machine(),
+              "cpus": os.cpu_count(), "results": results}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+    if args.save_baseline:
+        # 只覆盖本次运行的工作负载
+        merged = dict(baseline)
+        merged.update(results)
+        report["results"] = merged
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+            f.write("\n")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
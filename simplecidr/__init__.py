@@ -0,0 +1,29 @@
+# 按需导入：导入包本身只需几毫秒，访问对应名称时才加载子模块；
+# 图形界面在 simplecidr.gui 中，包内其他模块都不依赖 tkinter
+_EXPORTS = {
+    "Calculator": "calculator",
+    "SubnetRange": "division",
+    "SubnetInfo": "subnetinfo",
+    "SubnetInfoBlock": "subnetinfo",
+    "brief_rows": "subnetinfo",
+    "PrefixTable": "lookup",
+    "PrefixSet": "prefixset",
+    "set_operation": "setops",
+    "allocate_vlsm": "vlsm",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,165 @@
+import time
+from ipaddress import IPv4Network, IPv6Network
+
+from .parallel import run_parallel
+from .parser import parse_lines
+from .profiling import stage
+from .subnetinfo import format_address
+
+MAX_PREFIXLEN = {4: 32, 6: 128}
+NETWORK_CLASS = {4: IPv4Network, 6: IPv6Network}
+# 两个协议版本的前缀数量都超过该值时才并行处理，否则启动子进程的开销得不偿失
+PARALLEL_THRESHOLD = 200000
+
+
+# 将整数区间 [start, end] 拆分为最少的 CIDR 块，依次产出 (网络地址, 前缀长度)
+def range_to_cidrs(start, end, max_prefixlen):
+    while start <= end:
+        # 起始地址的对齐位数与区间剩余长度共同决定块大小
+        align_bits = (start & -start).bit_length() - 1 if start else max_prefixlen
+        span_bits = (end - start + 1).bit_length() - 1
+        bits = min(align_bits, span_bits)
+        yield start, max_prefixlen - bits
+        start += 1 << bits
+
+
+# 合并同一协议版本的前缀：先按目标前缀长度取超网，再按整数区间排序合并
+# prefixes 为 (网络地址, 前缀长度) 的可迭代对象，返回合并后的最少 CIDR 列表（已排序）
+def collapse_prefixes(prefixes, max_prefixlen, new_prefixlen=None):
+    keys = set()
+    for base, prefixlen in prefixes:
+        if new_prefixlen is not None and prefixlen > new_prefixlen:
+            base &= ((1 << new_prefixlen) - 1) << (max_prefixlen - new_prefixlen)
+            prefixlen = new_prefixlen
+        # 网络地址与前缀长度编码为一个整数，排序整数比排序元组更快
+        keys.add(base << 8 | prefixlen)
+    collapsed = []
+    current_start = current_end = -2
+    for key in sorted(keys):
+        start = key >> 8
+        end = start + (1 << (max_prefixlen - (key & 0xFF))) - 1
+        if start <= current_end + 1:
+            if end > current_end:
+                current_end = end
+            continue
+        if current_start >= 0:
+            collapsed.extend(range_to_cidrs(current_start, current_end, max_prefixlen))
+        current_start, current_end = start, end
+    if current_start >= 0:
+        collapsed.extend(range_to_cidrs(current_start, current_end, max_prefixlen))
+    return collapsed
+
+
+# 合并已按网络地址排序的前缀（例如二进制前缀集）：取超网不改变顺序，
+# 无需去重与排序，一遍扫描完成，结果与 collapse_prefixes 相同
+def collapse_sorted_prefixes(prefixes, max_prefixlen, new_prefixlen=None):
+    if new_prefixlen is not None:
+        mask = ((1 << new_prefixlen) - 1) << (max_prefixlen - new_prefixlen) \
+            if new_prefixlen <= max_prefixlen else -1
+    collapsed = []
+    current_start = current_end = -2
+    for start, prefixlen in prefixes:
+        if new_prefixlen is not None and prefixlen > new_prefixlen:
+            start &= mask
+            prefixlen = new_prefixlen
+        end = start + (1 << (max_prefixlen - prefixlen)) - 1
+        if start <= current_end + 1:
+            if end > current_end:
+                current_end = end
+            continue
+        if current_start >= 0:
+            collapsed.extend(range_to_cidrs(current_start, current_end, max_prefixlen))
+        current_start, current_end = start, end
+    if current_start >= 0:
+        collapsed.extend(range_to_cidrs(current_start, current_end, max_prefixlen))
+    return collapsed
+
+
+# 取某个协议版本的目标前缀长度：new_prefixlen 可以是整数（两个版本共用）或 {4: .., 6: ..}
+def target_prefixlen(new_prefixlen, version):
+    if isinstance(new_prefixlen, dict):
+        return new_prefixlen.get(version)
+    return new_prefixlen
+
+
+# 汇总单个协议版本并计时（可在子进程中执行）
+def collapse_family(prefixes, max_prefixlen, new_prefixlen):
+    started = time.perf_counter()
+    collapsed = collapse_prefixes(prefixes, max_prefixlen, new_prefixlen)
+    return collapsed, time.perf_counter() - started
+
+
+# 汇总结果：按协议版本保存整数前缀，以及无法解析的行（含行号）与各阶段耗时
+class AggregationResult:
+    def __init__(self):
+        self.prefixes = {4: [], 6: []}
+        self.invalid = []
+        self.invalid_lines = []
+        self.input_count = {4: 0, 6: 0}
+        self.timings = {}
+        self.out_of_range = False
+
+    # 转换为 ip_network 对象列表，IPv4 在前、IPv6 在后
+    def networks(self, version=None):
+        versions = (4, 6) if version is None else (version,)
+        return [NETWORK_CLASS[v]((base, prefixlen))
+                for v in versions for base, prefixlen in self.prefixes[v]]
+
+    # 以文本形式依次产出结果（"网络地址/前缀长度"），比创建 ip_network 对象快得多
+    def cidrs(self):
+        for version in (4, 6):
+            for base, prefixlen in self.prefixes[version]:
+                yield f"{format_address(version, base)}/{prefixlen}"
+
+    def __len__(self):
+        return len(self.prefixes[4]) + len(self.prefixes[6])
+
+    # 耗时与数量摘要，便于在状态栏或命令行输出
+    def summary(self):
+        parts = []
+        for version in (4, 6):
+            if self.input_count[version]:
+                parts.append(f"IPv{version}: {self.input_count[version]} -> "
+                             f"{len(self.prefixes[version])}，用时 {self.timings.get(version, 0):.3f} 秒")
+        parts.append(f"解析用时 {self.timings.get('parse', 0):.3f} 秒")
+        if self.invalid:
+            parts.append(f"无效 {len(self.invalid)} 行")
+        return "；".join(parts)
+
+
+# 解析子网文本并分协议版本汇总；两个版本的数据量都较大时并行处理
+def aggregate_subnets(subnets, new_prefixlen, parallel=True):
+    for version in (4, 6):
+        family_prefixlen = target_prefixlen(new_prefixlen, version)
+        if family_prefixlen is not None and family_prefixlen < 0:
+            raise ValueError(f"期望汇总后的子网掩码不能为负数：{family_prefixlen}")
+    parsed = parse_lines(subnets, parallel=parallel)
+    result = AggregationResult()
+    result.timings['parse'] = parsed.seconds
+    result.invalid_lines = parsed.invalid
+    # 与原先一致，无效行去重后返回
+    result.invalid = list(dict.fromkeys(line for _, line in parsed.invalid))
+    for version in (4, 6):
+        family_prefixlen = target_prefixlen(new_prefixlen, version)
+        if parsed.prefixes[version] and family_prefixlen is not None \
+                and MAX_PREFIXLEN[version] < family_prefixlen:
+            result.out_of_range = True
+    with stage("合并前缀") as record:
+        collapse_parsed(result, parsed.prefixes, new_prefixlen, parallel)
+        record.add(len(parsed))
+    return result
+
+
+# 分协议版本合并已解析的整数前缀，数量较多的版本在当前进程中处理
+def collapse_parsed(result, parsed, new_prefixlen, parallel=True):
+    versions = sorted((4, 6), key=lambda v: len(parsed[v]), reverse=True)
+    jobs = [(parsed[v], MAX_PREFIXLEN[v], target_prefixlen(new_prefixlen, v)) for v in versions]
+    if parallel and len(parsed[versions[1]]) >= PARALLEL_THRESHOLD:
+        outputs = run_parallel(collapse_family, jobs)
+    else:
+        outputs = [collapse_family(*job) for job in jobs]
+    for version, (collapsed, seconds) in zip(versions, outputs):
+        result.input_count[version] = len(parsed[version])
+        result.prefixes[version] = collapsed
+        result.timings[version] = seconds
+    return result
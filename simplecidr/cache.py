@@ -0,0 +1,98 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+# 缓存的内存预算（MB），可通过环境变量 SIMPLECIDR_CACHE_MB 调整，0 表示不缓存
+DEFAULT_BUDGET_MB = 128
+BUDGET_ENV = "SIMPLECIDR_CACHE_MB"
+
+
+def default_budget():
+    try:
+        return int(float(os.environ.get(BUDGET_ENV, DEFAULT_BUDGET_MB)) * (1 << 20))
+    except ValueError:
+        return DEFAULT_BUDGET_MB << 20
+
+
+# 估算若干行的内存占用：按第一行的元组与字符串大小推算
+def estimate_rows_size(rows):
+    if not rows:
+        return sys.getsizeof(rows)
+    first = rows[0]
+    row_size = sys.getsizeof(first) + sum(sys.getsizeof(value) for value in first)
+    return sys.getsizeof(rows) + row_size * len(rows)
+
+
+# 按内存预算淘汰的 LRU 缓存：每个条目带估算大小，总量超过预算时淘汰最久未使用的条目；
+# 可在后台线程与界面线程之间共用
+class LRUCache:
+    def __init__(self, budget=None):
+        self.budget = default_budget() if budget is None else budget
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    # 命中时返回缓存值并移到最近使用的位置，未命中返回 default
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    # 写入缓存；单个条目超过预算时不缓存
+    def put(self, key, value, size=None):
+        if size is None:
+            size = sys.getsizeof(value)
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+            if size > self.budget:
+                return
+            self.entries[key] = (value, size)
+            self.size += size
+            while self.size > self.budget:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+
+    # 命中直接返回，否则调用 compute() 计算并缓存；sizeof 用于估算结果大小
+    def get_or_compute(self, key, compute, sizeof=None):
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value, None if sizeof is None else sizeof(value))
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    # 命中/未命中计数与占用摘要，便于在状态栏显示
+    def summary(self):
+        return cache_summary([self])
+
+
+# 多个缓存合计的命中/未命中计数与占用
+def cache_summary(caches):
+    hits = sum(cache.hits for cache in caches)
+    misses = sum(cache.misses for cache in caches)
+    size = sum(cache.size for cache in caches) / (1 << 20)
+    budget = sum(cache.budget for cache in caches) / (1 << 20)
+    return f"缓存 命中 {hits} / 未命中 {misses} | {size:.1f}/{budget:.0f} MB"
@@ -0,0 +1,202 @@
+from ipaddress import ip_network
+from math import ceil, log2
+
+from .aggregation import aggregate_subnets
+from .cache import LRUCache, cache_summary, default_budget, estimate_rows_size
+from .compression import compress_prefix_set, compress_subnets
+from .division import SubnetRange
+from .incremental import IncrementalAggregator
+from .lookup import PrefixTable
+from .prefixset import aggregate_prefix_set, open_prefix_set, save_prefix_set
+from .profiling import stage
+from .setops import set_operation
+from .subnetinfo import brief_rows
+from .utilization import analyze_utilization
+from .vlsm import allocate_vlsm
+
+
+# 子网计算（不依赖 GUI，可供图形界面与命令行共用）
+class Calculator:
+    # cache_budget 为缓存的内存预算（字节），默认读取环境变量 SIMPLECIDR_CACHE_MB；
+    # 子网信息与划分结果占用很小，单独缓存，避免被导出时大量生成的行挤出
+    def __init__(self, cache_budget=None):
+        if cache_budget is None:
+            cache_budget = default_budget()
+        self.cache = LRUCache(cache_budget // 8)
+        self.rows_cache = LRUCache(cache_budget - cache_budget // 8)
+        # 增量汇总的状态（子网汇总页面反复汇总同一份列表时使用）
+        self.aggregator = IncrementalAggregator()
+
+    def cache_summary(self):
+        return cache_summary([self.cache, self.rows_cache])
+
+    # 格式化网络信息
+    def format_network_info(self, network):
+        info = f"CIDR: {network['cidr']}\n"
+        info += f"协议版本: IPv{network['version']}\n"
+        info += f"网络地址: {network['network_address']}\n"
+        info += f"广播地址: {network['broadcast_address']}\n"
+        info += f"子网掩码: {network['netmask']}\n"
+        info += f"主机掩码: {network['hostmask']}\n"
+        info += f"可用地址范围: {network['first_address']} - {network['last_address']}\n"
+        info += f"所有地址总数: {network['num_addresses']}\n"
+        info += f"可用地址总数: {network['host_addresses']}\n"
+        return info
+
+    # 获取单个子网信息（相同输入直接使用缓存结果）；返回副本，调用方修改结果不会影响缓存
+    def get_single_subnet_info(self, subnet):
+        info = self.cache.get_or_compute(
+            ("info", str(subnet)), lambda: self.compute_single_subnet_info(subnet))
+        return dict(info) if isinstance(info, dict) else info
+
+    def compute_single_subnet_info(self, subnet):
+        subnet_info = {
+            "cidr": "",
+            "version": "",
+            "network_address": "",
+            "broadcast_address": "",
+            "netmask": "",
+            "hostmask": "",
+            "first_address": "",
+            "last_address": "",
+            "num_addresses": "",
+            "host_addresses": ""
+        }
+        try:
+            network = ip_network(f"{subnet}", strict=False)
+        except ValueError as e:
+            return f"[ {subnet} ] 不是一个合规的网络！\n{e}"
+
+        # 记录子网信息
+        subnet_info['cidr'] = network.with_prefixlen
+        subnet_info['version'] = network.version
+        subnet_info['network_address'] = network.network_address
+        subnet_info['broadcast_address'] = network.broadcast_address
+        subnet_info['netmask'] = network.netmask
+        subnet_info['hostmask'] = network.hostmask
+        if network.prefixlen == (network.max_prefixlen - 1):
+            subnet_info['first_address'] = network.network_address
+            subnet_info['last_address'] = network.broadcast_address
+            subnet_info['num_addresses'] = 2
+            subnet_info['host_addresses'] = 2
+        elif network.prefixlen == network.max_prefixlen:
+            subnet_info['first_address'] = network.network_address
+            subnet_info['last_address'] = network.network_address
+            subnet_info['num_addresses'] = 1
+            subnet_info['host_addresses'] = 1
+        else:
+            subnet_info['first_address'] = network[1]
+            subnet_info['last_address'] = network[-2]
+            subnet_info['num_addresses'] = network.num_addresses
+            subnet_info['host_addresses'] = network.num_addresses - 2
+        return subnet_info
+
+    # 获取多个子网信息（整数运算批量生成，字段与 get_single_subnet_info 一致）；
+    # 惰性子网序列的一段由 (版本, 起始地址, 前缀长度, 数量) 唯一确定，生成的行会被缓存；
+    # 导出与流式输出只读取一次，cache=False 时不经过缓存，以免挤出界面窗口的行
+    def get_multiple_subnet_info(self, subnets, cache=True):
+        with stage("生成表格行") as record:
+            if cache and isinstance(subnets, SubnetRange):
+                key = ("rows", subnets.version, subnets.base, subnets.new_prefixlen, subnets.count)
+                rows = self.rows_cache.get_or_compute(key, lambda: brief_rows(subnets), estimate_rows_size)
+            else:
+                rows = brief_rows(subnets)
+            # VLSM 结果附带需求名称，作为最后一列
+            names = getattr(subnets, "names", None)
+            if names is not None:
+                rows = [row + (name,) for row, name in zip(rows, names)]
+            record.add(len(rows))
+        return rows
+
+    # 划分结果按 (网络, 方式, 参数) 缓存
+    def cached_division(self, network, method, value, compute):
+        return self.cache.get_or_compute(("division", network, method, value), compute,
+                                         lambda subnets: 200 + 120 * len(getattr(subnets, "subnets", ())))
+
+    # 指定子网掩码（返回惰性序列，超出范围时为空）
+    def calculate_subnets_by_new_prefix(self, network, new_prefixlen):
+        return self.cached_division(network, "prefix", new_prefixlen,
+                                    lambda: SubnetRange(network, new_prefixlen))
+
+    # 指定地址数量
+    def calculate_subnets_by_num_address(self, network, num_address):
+        return self.cached_division(network, "num_address", num_address,
+                                    lambda: self.divide_by_num_address(network, num_address))
+
+    def divide_by_num_address(self, network, num_address):
+        if network.num_addresses < num_address:
+            return SubnetRange(network, -1)
+        host_prefixlen = ceil(log2(num_address))
+        new_prefixlen = network.max_prefixlen - host_prefixlen
+        return SubnetRange(network, new_prefixlen)
+
+    # 指定子网数量
+    def calculate_subnets_by_num_subnets(self, network, num_subnets):
+        if network.num_addresses < num_subnets:
+            return SubnetRange(network, -1)
+        new_num_address = int(network.num_addresses / num_subnets)
+        return self.cached_division(network, "num_subnets", num_subnets,
+                                    lambda: self.divide_by_num_address(network, new_num_address))
+
+    # 按需求分配子网（VLSM），requirements 为需求文本或 [(名称, 前缀长度), ...]
+    def calculate_subnets_by_requirements(self, network, requirements):
+        if not isinstance(requirements, str):
+            requirements = tuple(requirements)
+        return self.cached_division(network, "vlsm", requirements,
+                                    lambda: allocate_vlsm(network, requirements))
+
+    # 子网汇总聚合（按协议版本在整数区间上合并，结果与 collapse_addresses 一致）
+    def aggregation_subnets_by_new_prefix(self, subnets, new_prefixlen):
+        result = self.aggregate_subnets(subnets, new_prefixlen)
+        return result.networks(), result.invalid
+
+    # 子网汇总聚合，返回包含各协议版本结果与耗时的 AggregationResult
+    def aggregate_subnets(self, subnets, new_prefixlen):
+        return aggregate_subnets(subnets, new_prefixlen)
+
+    # 增量汇总：与上一次的输入比较，只解析变化的行、只重新合并受影响的区间，
+    # 返回本次的变化 AggregationDiff；完整结果由 aggregation_result() 获取
+    def update_aggregation(self, subnets, new_prefixlen):
+        return self.aggregator.update(subnets, new_prefixlen)
+
+    def aggregation_result(self):
+        return self.aggregator.result()
+
+    def clear_aggregation(self):
+        self.aggregator.clear()
+
+    # 子网集合运算：union / intersect / difference / symdiff / overlap，
+    # 返回包含最少 CIDR 结果（或重叠前缀对）与无效行的 SetOperationResult
+    def subnet_set_operation(self, operation, left_subnets, right_subnets):
+        return set_operation(operation, left_subnets, right_subnets)
+
+    # 地址空间利用率：父网络内已分配的地址、空闲块与各前缀长度的可分配数量
+    def analyze_utilization(self, network, allocated_subnets):
+        return analyze_utilization(network, allocated_subnets)
+
+    # 由划分或汇总的结果构建最长前缀匹配表
+    def build_prefix_table(self, subnets):
+        return PrefixTable.from_subnets(subnets)
+
+    # 由文本行（例如导入的文件）加载最长前缀匹配表
+    def load_prefix_table(self, lines):
+        return PrefixTable.from_lines(lines)
+
+    # 划分或汇总的结果保存为二进制前缀集（.cidrset），返回写入的前缀数量
+    def save_prefix_set(self, path, subnets, progress=None):
+        return save_prefix_set(path, subnets, progress)
+
+    # 内存映射打开二进制前缀集，不解析文本
+    def open_prefix_set(self, path):
+        return open_prefix_set(path)
+
+    # 汇总前缀集：记录已经有序，一遍扫描合并
+    def aggregate_prefix_set(self, prefix_set, new_prefixlen):
+        return aggregate_prefix_set(prefix_set, new_prefixlen)
+
+    # 有界压缩：最多 max_prefixes 个前缀，或多覆盖的地址不超过原本覆盖的 max_overcover%
+    def compress_subnets(self, subnets, max_prefixes=None, max_overcover=None):
+        return compress_subnets(subnets, max_prefixes, max_overcover)
+
+    def compress_prefix_set(self, prefix_set, max_prefixes=None, max_overcover=None):
+        return compress_prefix_set(prefix_set, max_prefixes, max_overcover)
@@ -0,0 +1,409 @@
+import argparse
+import sys
+from contextlib import contextmanager, nullcontext
+from ipaddress import ip_network
+
+from .calculator import Calculator
+from .export import RowWriter, detect_format, iter_chunks, iter_division_chunks, open_output
+from .profiling import Profiler, activate, deactivate, iter_stage, stage
+from .parser import parse_prefix
+from .prefixset import PrefixSetWriter, is_prefix_set_file, is_prefix_set_path
+from .sources import iter_prefix_file
+
+INFO_COLUMNS = ("cidr", "version", "network_address", "broadcast_address", "netmask",
+                "hostmask", "first_address", "last_address", "num_addresses", "host_addresses")
+DIVISION_COLUMNS = ("network", "netmask", "first", "last", "broadcast")
+# 按需求分配（VLSM）时最后一列为需求名称
+VLSM_COLUMNS = DIVISION_COLUMNS + ("name",)
+AGGREGATION_COLUMNS = ("network",)
+LOOKUP_COLUMNS = ("address", "network")
+OVERLAP_COLUMNS = ("left", "right")
+SET_OPERATIONS = ("union", "intersect", "difference", "symdiff", "overlap")
+
+
+# 读取输入：命令行参数优先，其次是输入文件（"-" 表示标准输入），默认读取标准输入；
+# 输入文件可以是文本、CSV（取第一列）或 gzip，按块流式读取
+# keep_blank 为 True 时保留空行，使行号与输入文件一致
+def iter_input_lines(values, input_files, keep_blank=False):
+    if values:
+        yield from values
+        return
+    for path in input_files or ["-"]:
+        if path == "-":
+            lines = (line.rstrip("\r\n") for line in sys.stdin)
+        else:
+            lines = iter_prefix_file(path)
+        for line in lines:
+            if keep_blank or line.strip():
+                yield line
+
+
+def report_invalid(message):
+    print(message, file=sys.stderr)
+
+
+# 打开结果输出：-o 指定文件时按扩展名决定格式与 gzip 压缩，否则写到标准输出
+@contextmanager
+def open_result_writer(args, columns, plain=False):
+    if args.output:
+        fmt, compress = detect_format(args.output, default="text")
+        with open_output(args.output, compress) as stream:
+            yield RowWriter(stream, args.format or fmt, columns, plain=plain)
+    else:
+        yield RowWriter(sys.stdout, args.format or "text", columns, plain=plain)
+
+
+# 唯一的输入是二进制前缀集文件时返回其路径，可直接内存映射，不逐行解析
+def prefix_set_input(values, input_files):
+    if not values and input_files and len(input_files) == 1 and input_files[0] != "-" \
+            and is_prefix_set_file(input_files[0]):
+        return input_files[0]
+    return None
+
+
+# 逐块写出结果；剖析时生成行与写入分别计时
+def write_chunks(out, chunks):
+    for chunk in iter_stage("生成结果行", chunks, len):
+        with stage("写入结果") as record:
+            out.writerows(chunk)
+            record.add(len(chunk))
+
+
+# 子命令：查询子网信息
+def command_info(args, calculator):
+    if args.numpy:
+        return command_info_vectorized(args, calculator)
+    failed = 0
+    with open_result_writer(args, INFO_COLUMNS) as out:
+        for subnet in iter_input_lines(args.networks, args.input):
+            info = calculator.get_single_subnet_info(subnet)
+            if isinstance(info, str):
+                report_invalid(info)
+                failed += 1
+            elif out.fmt == "text":
+                out.stream.write(calculator.format_network_info(info) + "\n")
+            else:
+                out.writerows([[info[column] for column in INFO_COLUMNS]])
+    return 1 if failed else 0
+
+
+# 查询子网信息（NumPy 向量化）：按块解析后整列计算，输出与逐行计算相同
+def command_info_vectorized(args, calculator):
+    from .vectorized import CHUNK_SIZE, info_rows_for_prefixes, load_numpy
+    try:
+        load_numpy()
+    except ImportError as e:
+        report_invalid(str(e))
+        return 2
+    failed = 0
+    with open_result_writer(args, INFO_COLUMNS) as out:
+        for chunk in iter_chunks(iter_input_lines(args.networks, args.input), max(args.chunk_size, CHUNK_SIZE)):
+            prefixes = []
+            for subnet in chunk:
+                try:
+                    prefixes.append(parse_prefix(subnet))
+                except ValueError as e:
+                    report_invalid(f"[ {subnet} ] 不是一个合规的网络！\n{e}")
+                    failed += 1
+            with stage("生成表格行") as record:
+                rows = info_rows_for_prefixes(prefixes)
+                record.add(len(rows))
+            if out.fmt == "text":
+                out.stream.writelines(
+                    calculator.format_network_info(dict(zip(INFO_COLUMNS, row))) + "\n" for row in rows)
+            else:
+                out.writerows(rows)
+    return 1 if failed else 0
+
+
+# 子命令：划分子网，结果按块流式输出
+def command_divide(args, calculator):
+    failed = 0
+    stop = None if args.limit is None else args.offset + args.limit
+    # -o 为 .cidrset 时收集所有划分结果，最后写入一个二进制前缀集
+    prefix_set = PrefixSetWriter() if args.output and is_prefix_set_path(args.output) else None
+    # VLSM 的需求名称是用户输入的文本，需要转义，不能直接拼接
+    with nullcontext() if prefix_set is not None else open_result_writer(
+            args, VLSM_COLUMNS if args.vlsm else DIVISION_COLUMNS, plain=not args.vlsm) as out:
+        for subnet in iter_input_lines(args.networks, args.input):
+            try:
+                network = ip_network(subnet, strict=False)
+            except ValueError as e:
+                report_invalid(f"[ {subnet} ] 不是一个合规的网络！\n{e}")
+                failed += 1
+                continue
+            if args.prefix is not None:
+                subnets = calculator.calculate_subnets_by_new_prefix(network, args.prefix)
+            elif args.subnets is not None:
+                subnets = calculator.calculate_subnets_by_num_subnets(network, args.subnets)
+            elif args.addresses is not None:
+                subnets = calculator.calculate_subnets_by_num_address(network, args.addresses)
+            else:
+                try:
+                    subnets = calculator.calculate_subnets_by_requirements(network, args.vlsm)
+                except ValueError as e:
+                    report_invalid(f"[ {subnet} ] 分配需求有误：{e}")
+                    return 2
+                for name, prefixlen in subnets.unallocated:
+                    report_invalid(f"[ {subnet} ] 地址空间不足，未能分配：{name} (/{prefixlen})")
+                    failed += 1
+            if not subnets:
+                report_invalid(f"[ {subnet} ] 划分参数超出最大范围！")
+                failed += 1
+                continue
+            if prefix_set is not None:
+                try:
+                    prefix_set.add(subnets[args.offset:stop] if args.offset or stop is not None else subnets)
+                except ValueError as e:
+                    report_invalid(f"[ {subnet} ] {e}")
+                    return 2
+                continue
+            write_chunks(out, iter_division_chunks(calculator, subnets, args.chunk_size, args.offset, stop))
+    if prefix_set is not None:
+        prefix_set.write(args.output)
+    return 1 if failed else 0
+
+
+# 子命令：汇总子网；唯一的输入是二进制前缀集时直接内存映射汇总
+# 指定 --max-prefixes 或 --max-overcover 时改为有界压缩
+def command_aggregate(args, calculator):
+    compress = args.max_prefixes is not None or args.max_overcover is not None
+    has_prefix = args.prefix is not None or args.prefix4 is not None or args.prefix6 is not None
+    if compress and has_prefix:
+        report_invalid("--max-prefixes、--max-overcover 不能与 -p、--prefix4、--prefix6 同时使用")
+        return 2
+    if not compress and not has_prefix:
+        report_invalid("请使用 -p、--prefix4 或 --prefix6 指定期望汇总后的子网掩码，"
+                       "或使用 --max-prefixes、--max-overcover 限制压缩后的规模")
+        return 2
+    new_prefixlen = {4: args.prefix if args.prefix4 is None else args.prefix4,
+                     6: args.prefix if args.prefix6 is None else args.prefix6}
+    path = prefix_set_input(args.networks, args.input)
+    try:
+        if path is not None:
+            with calculator.open_prefix_set(path) as prefix_set:
+                if compress:
+                    result = calculator.compress_prefix_set(prefix_set, args.max_prefixes, args.max_overcover)
+                else:
+                    result = calculator.aggregate_prefix_set(prefix_set, new_prefixlen)
+                write_aggregation(args, result)
+        else:
+            subnets = iter_input_lines(args.networks, args.input, keep_blank=True)
+            if compress:
+                result = calculator.compress_subnets(subnets, args.max_prefixes, args.max_overcover)
+            else:
+                result = calculator.aggregate_subnets(subnets=subnets, new_prefixlen=new_prefixlen)
+            write_aggregation(args, result)
+    except ValueError as e:
+        report_invalid(str(e))
+        return 2
+    if result.out_of_range:
+        report_invalid("指定的掩码超出范围")
+    for lineno, line in result.invalid_lines:
+        report_invalid(f"第 {lineno} 行 [ {line} ] 不是一个合规的网络！")
+    if args.stats:
+        report_invalid(result.summary())
+    return 1 if result.invalid else 0
+
+
+# 写出汇总结果：-o 为 .cidrset 时保存为二进制前缀集
+def write_aggregation(args, result):
+    if args.output and is_prefix_set_path(args.output):
+        writer = PrefixSetWriter()
+        writer.add(result)
+        writer.write(args.output)
+        return
+    rows = ((cidr,) for cidr in result.cidrs())
+    with open_result_writer(args, AGGREGATION_COLUMNS, plain=True) as out:
+        write_chunks(out, iter_chunks(rows, args.chunk_size))
+
+
+# 子命令：最长前缀匹配查询，先加载前缀表，再流式查询地址并输出匹配的子网
+def command_lookup(args, calculator):
+    path = prefix_set_input(None, args.table)
+    # 二进制前缀集在查询结束后关闭
+    with calculator.open_prefix_set(path) if path is not None else nullcontext() as prefix_set:
+        if prefix_set is not None:
+            table = prefix_set.lookup_table()
+        else:
+            table = calculator.load_prefix_table(
+                line for path in args.table for line in iter_prefix_file(path))
+        for lineno, line in table.invalid:
+            report_invalid(f"前缀表第 {lineno} 行 [ {line} ] 不是一个合规的网络！")
+        if not table:
+            report_invalid("前缀表为空")
+            return 2
+        invalid = []
+        rows = table.lookup_lines(
+            iter_input_lines(args.networks, args.input, keep_blank=True), invalid)
+        with open_result_writer(args, LOOKUP_COLUMNS, plain=True) as out:
+            write_chunks(out, iter_chunks(rows, args.chunk_size))
+    for lineno, line in invalid:
+        report_invalid(f"第 {lineno} 行 [ {line} ] 不是一个合规的 IP 地址！")
+    return 1 if invalid else 0
+
+
+# 子命令：子网集合运算，A、B 两组子网分别从文件读取
+def command_setop(args, calculator):
+    result = calculator.subnet_set_operation(
+        args.operation,
+        iter_input_lines(None, args.left, keep_blank=True),
+        iter_input_lines(None, args.right, keep_blank=True))
+    if args.operation == "overlap":
+        columns, rows = OVERLAP_COLUMNS, result.rows()
+    else:
+        columns, rows = AGGREGATION_COLUMNS, ((network,) for network, _ in result.rows())
+    with open_result_writer(args, columns, plain=True) as out:
+        write_chunks(out, iter_chunks(rows, args.chunk_size))
+    for side in ("A", "B"):
+        for lineno, line in result.invalid_lines[side]:
+            report_invalid(f"{side} 第 {lineno} 行 [ {line} ] 不是一个合规的网络！")
+    if args.stats:
+        report_invalid(result.summary())
+    return 1 if result.invalid_lines["A"] or result.invalid_lines["B"] else 0
+
+
+# 子命令：父网络的空间利用率，输出空闲块，--report 时在标准错误输出各前缀长度的空闲统计
+def command_utilization(args, calculator):
+    try:
+        network = ip_network(args.network, strict=False)
+    except ValueError as e:
+        report_invalid(f"[ {args.network} ] 不是一个合规的网络！\n{e}")
+        return 2
+    report = calculator.analyze_utilization(network, iter_input_lines(None, args.input, keep_blank=True))
+    rows = ((cidr,) for cidr in report.free_cidrs())
+    with open_result_writer(args, AGGREGATION_COLUMNS, plain=True) as out:
+        write_chunks(out, iter_chunks(rows, args.chunk_size))
+    for lineno, line in report.invalid_lines:
+        report_invalid(f"第 {lineno} 行 [ {line} ] 不是一个合规的网络！")
+    if args.report:
+        for line in report.report_lines():
+            report_invalid(line)
+    return 1 if report.invalid_lines else 0
+
+
+# 子命令：启动本地 HTTP/JSON 服务（按需导入 asyncio 相关模块）
+def command_serve(args, calculator):
+    import asyncio
+    from .server import serve
+    asyncio.run(serve(args.host, args.port, args.workers))
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="simplecidr", description="子网信息查询、子网划分与子网汇总（命令行版本）")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="剖析本次运行并写入文件：.json 为各阶段用时、数量与内存峰值的 JSON 跟踪"
+                             "（可在 chrome://tracing 中查看），其他扩展名为 cProfile 数据（用 python -m pstats 查看）；"
+                             "阶段摘要输出到标准错误")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_common_arguments(subparser, item="网络（CIDR）"):
+        subparser.add_argument("networks", nargs="*", help=f"{item}，不填写时从输入文件或标准输入读取")
+        subparser.add_argument("-i", "--input", action="append", metavar="FILE",
+                               help="输入文件（文本、CSV 或 gzip），每行一个，- 表示标准输入，可重复指定")
+        add_output_arguments(subparser)
+
+    def add_output_arguments(subparser):
+        subparser.add_argument("-f", "--format", choices=("csv", "jsonl", "text"),
+                               help="输出格式（默认 text，指定 -o 时按扩展名推断）")
+        subparser.add_argument("-o", "--output", metavar="FILE",
+                               help="输出文件，扩展名为 .gz 时使用 gzip 压缩；divide 与 aggregate 的扩展名为 .cidrset 时"
+                                    "保存为二进制前缀集（可作为各子命令的输入，内存映射读取）")
+        subparser.add_argument("--chunk-size", type=int, default=4096, help=argparse.SUPPRESS)
+
+    info_parser = subparsers.add_parser("info", help="查询子网信息")
+    add_common_arguments(info_parser)
+    info_parser.add_argument("--numpy", action="store_true",
+                             help="使用 NumPy 整列计算（需要安装 numpy），适合一次查询大量前缀")
+    info_parser.set_defaults(handler=command_info)
+
+    divide_parser = subparsers.add_parser("divide", help="划分子网")
+    add_common_arguments(divide_parser)
+    method = divide_parser.add_mutually_exclusive_group(required=True)
+    method.add_argument("-p", "--prefix", type=int, help="指定新子网的子网掩码")
+    method.add_argument("-n", "--subnets", type=int, help="指定新子网的子网数量")
+    method.add_argument("-a", "--addresses", type=int, help="指定新子网的地址数量")
+    method.add_argument("--vlsm", metavar="SPEC",
+                        help="按需求分配子网，例如 \"A:2000,500,40*/31\"（主机数或 /前缀长度，N* 表示数量）")
+    divide_parser.add_argument("--offset", type=int, default=0, help="从第几个子网开始输出")
+    divide_parser.add_argument("--limit", type=int, help="最多输出的子网数量")
+    divide_parser.set_defaults(handler=command_divide)
+
+    aggregate_parser = subparsers.add_parser("aggregate", help="汇总子网")
+    add_common_arguments(aggregate_parser)
+    aggregate_parser.add_argument("-p", "--prefix", type=int, help="期望汇总后的子网掩码（IPv4 与 IPv6 共用）")
+    aggregate_parser.add_argument("--prefix4", type=int, help="IPv4 期望汇总后的子网掩码，优先于 -p；未指定时只合并不取超网")
+    aggregate_parser.add_argument("--prefix6", type=int, help="IPv6 期望汇总后的子网掩码，优先于 -p；未指定时只合并不取超网")
+    aggregate_parser.add_argument("--max-prefixes", type=int, metavar="N",
+                                  help="有界压缩：每个协议版本最多 N 个前缀，合并相邻块时多覆盖的地址尽量少")
+    aggregate_parser.add_argument("--max-overcover", type=float, metavar="PCT",
+                                  help="有界压缩：多覆盖的地址不超过原本覆盖地址的 PCT%%，在此范围内尽量减少前缀")
+    aggregate_parser.add_argument("--stats", action="store_true", help="在标准错误输出各协议版本的数量与耗时")
+    aggregate_parser.set_defaults(handler=command_aggregate)
+
+    lookup_parser = subparsers.add_parser("lookup", help="查询地址所属的子网（最长前缀匹配）")
+    add_common_arguments(lookup_parser, item="IP 地址")
+    lookup_parser.add_argument("-t", "--table", action="append", required=True, metavar="FILE",
+                               help="前缀表文件（文本、CSV 或 gzip），例如划分或汇总的导出结果，可重复指定")
+    lookup_parser.set_defaults(handler=command_lookup)
+
+    setop_parser = subparsers.add_parser("setop", help="子网集合运算（并集、交集、差集、对称差、重叠检测）")
+    setop_parser.add_argument("operation", choices=SET_OPERATIONS,
+                              help="union 并集、intersect 交集、difference 差集 A-B、symdiff 对称差、overlap 重叠检测")
+    setop_parser.add_argument("-a", "--left", action="append", required=True, metavar="FILE",
+                              help="集合 A 的子网文件（文本、CSV 或 gzip），- 表示标准输入，可重复指定")
+    setop_parser.add_argument("-b", "--right", action="append", required=True, metavar="FILE",
+                              help="集合 B 的子网文件，格式同上")
+    setop_parser.add_argument("--stats", action="store_true", help="在标准错误输出数量与耗时")
+    add_output_arguments(setop_parser)
+    setop_parser.set_defaults(handler=command_setop)
+
+    utilization_parser = subparsers.add_parser("utilization", help="父网络的空间利用率与空闲块")
+    utilization_parser.add_argument("network", help="父网络（CIDR）")
+    utilization_parser.add_argument("-i", "--input", action="append", metavar="FILE",
+                                    help="已分配前缀文件（文本、CSV 或 gzip），- 表示标准输入，可重复指定")
+    utilization_parser.add_argument("--report", action="store_true",
+                                    help="在标准错误输出利用率、最大空闲块与各前缀长度的可分配数量")
+    add_output_arguments(utilization_parser)
+    utilization_parser.set_defaults(handler=command_utilization)
+
+    serve_parser = subparsers.add_parser("serve", help="启动本地 HTTP/JSON 服务（/info、/divide、/aggregate、/batch、/metrics）")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="监听地址（默认 127.0.0.1）")
+    serve_parser.add_argument("--port", type=int, default=8080, help="监听端口（默认 8080）")
+    serve_parser.add_argument("--workers", type=int, help="计算进程数，默认与 CPU 数量相同（最多 8），0 表示不使用进程池")
+    serve_parser.set_defaults(handler=command_serve)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    profiler = None
+    if args.profile:
+        # JSON 跟踪记录内存峰值；cProfile 数据不记录，避免 tracemalloc 干扰函数耗时
+        as_json = detect_format(args.profile)[0] == "jsonl"
+        profiler = activate(Profiler(args.command, memory=as_json, cprofile=not as_json))
+    try:
+        return args.handler(args, Calculator())
+    except BrokenPipeError:
+        # 下游管道提前关闭（例如 | head），静默退出
+        sys.stderr.close()
+        return 0
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        if profiler is not None:
+            finish_profile(profiler, args.profile)
+
+
+# 结束剖析：保存剖析数据，并在标准错误输出阶段摘要
+def finish_profile(profiler, path):
+    deactivate(profiler)
+    if profiler.cprofile is None:
+        profiler.write_json(path)
+    else:
+        profiler.dump_stats(path)
+    if not sys.stderr.closed:
+        for line in profiler.summary_lines():
+            report_invalid(line)
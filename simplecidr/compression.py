@@ -0,0 +1,178 @@
+import heapq
+import time
+from fractions import Fraction
+
+from .aggregation import (MAX_PREFIXLEN, PARALLEL_THRESHOLD, AggregationResult, collapse_prefixes,
+                          collapse_sorted_prefixes, target_prefixlen)
+from .parallel import run_parallel
+from .parser import parse_lines
+from .profiling import stage
+
+
+# 有界压缩：在最少 CIDR 的基础上继续把相邻的块合并为它们的最近公共超网（LCA），
+# 用多覆盖的地址换取更少的前缀，适合前缀数量受限的转发表。
+# 有序不相交的块与相邻块的 LCA 构成一棵压缩二叉 trie：每对相邻块对应一个内部节点，
+# 节点内恰好只有这两个块时（两个子树都已是单个块）才能合并，合并后前缀数量减 1，
+# 代价为 LCA 中尚未覆盖的地址数；用小顶堆每次取代价最小的合并，
+# 合并只影响新块与左右两个邻居组成的两对，总体 O(n log n)
+def compress_prefixes(prefixes, max_prefixlen, max_prefixes=None, max_overcover=None, ordered=False):
+    if ordered:
+        blocks = collapse_sorted_prefixes(prefixes, max_prefixlen)
+    else:
+        blocks = collapse_prefixes(prefixes, max_prefixlen)
+    n = len(blocks)
+    starts = [base for base, _ in blocks]
+    ends = [base + (1 << (max_prefixlen - prefixlen)) - 1 for base, prefixlen in blocks]
+    covered = sum(ends) - sum(starts) + n
+    # 多覆盖比例为百分比，与覆盖的地址数精确比较（IPv6 的地址数超出浮点精度）
+    budget = None if max_overcover is None else covered * Fraction(str(max_overcover)) / 100
+    previous = list(range(-1, n - 1))
+    following = list(range(1, n + 1))
+    if n:
+        following[-1] = -1
+    # 块每次被合并时版本号加 1，被并入左邻居后为 -1，堆中过期的候选据此丢弃
+    stamps = [0] * n
+
+    # 相邻块 i、j 的合并候选：(代价, LCA 主机位数, LCA 起始地址, i, j, i 的版本号, j 的版本号)；
+    # LCA 内还有其他块时返回 None
+    def candidate(i, j):
+        bits = (starts[i] ^ ends[j]).bit_length()
+        lca_start = starts[i] >> bits << bits
+        lca_end = lca_start + (1 << bits) - 1
+        before, after = previous[i], following[j]
+        if (before >= 0 and ends[before] >= lca_start) or (after >= 0 and starts[after] <= lca_end):
+            return None
+        cost = (1 << bits) - (ends[i] - starts[i] + 1) - (ends[j] - starts[j] + 1)
+        return cost, bits, lca_start, i, j, stamps[i], stamps[j]
+
+    # 初始的候选与 candidate() 相同，邻居就是下标相邻的块；热循环中直接使用局部变量
+    heap = []
+    for i in range(n - 1):
+        bits = (starts[i] ^ ends[i + 1]).bit_length()
+        lca_start = starts[i] >> bits << bits
+        if (i and ends[i - 1] >= lca_start) or (i + 2 < n and starts[i + 2] < lca_start + (1 << bits)):
+            continue
+        cost = (1 << bits) - (ends[i] - starts[i] + 1) - (ends[i + 1] - starts[i + 1] + 1)
+        heap.append((cost, bits, lca_start, i, i + 1, 0, 0))
+    heapq.heapify(heap)
+    heappop = heapq.heappop
+    count = n
+    wasted = 0
+    while heap:
+        cost, bits, lca_start, i, j, stamp_i, stamp_j = heappop(heap)
+        if stamps[i] != stamp_i or stamps[j] != stamp_j:
+            continue
+        # 不多覆盖地址的合并（两个相邻的兄弟块）总是进行
+        if cost:
+            if max_prefixes is not None and count <= max_prefixes:
+                break
+            if budget is not None and wasted + cost > budget:
+                break
+        wasted += cost
+        count -= 1
+        starts[i] = lca_start
+        ends[i] = lca_start + (1 << bits) - 1
+        after = following[j]
+        following[i] = after
+        if after >= 0:
+            previous[after] = i
+        stamps[i] += 1
+        stamps[j] = -1
+        for left, right in ((previous[i], i), (i, after)):
+            if left >= 0 and right >= 0:
+                entry = candidate(left, right)
+                if entry is not None:
+                    heapq.heappush(heap, entry)
+    # 第一个块只会作为左侧被合并，始终是链表的头
+    compressed = []
+    i = 0 if n else -1
+    while i >= 0:
+        compressed.append((starts[i], max_prefixlen - (ends[i] - starts[i] + 1).bit_length() + 1))
+        i = following[i]
+    return compressed, n, covered, wasted
+
+
+# 压缩单个协议版本并计时（可在子进程中执行）
+def compress_family(prefixes, max_prefixlen, max_prefixes, max_overcover, ordered=False):
+    started = time.perf_counter()
+    compressed, collapsed_count, covered, wasted = compress_prefixes(
+        prefixes, max_prefixlen, max_prefixes, max_overcover, ordered)
+    return compressed, collapsed_count, covered, wasted, time.perf_counter() - started
+
+
+# 压缩结果：在汇总结果的基础上记录精确合并后的数量、原本覆盖的地址数与多覆盖的地址数
+class CompressionResult(AggregationResult):
+    def __init__(self):
+        super().__init__()
+        self.collapsed_count = {4: 0, 6: 0}
+        self.covered = {4: 0, 6: 0}
+        self.wasted = {4: 0, 6: 0}
+
+    # 多覆盖的地址占原本覆盖地址的比例
+    def overcover(self, version):
+        return self.wasted[version] / self.covered[version] if self.covered[version] else 0.0
+
+    def summary(self):
+        parts = []
+        for version in (4, 6):
+            if self.input_count[version]:
+                parts.append(f"IPv{version}: {self.input_count[version]} -> 精确合并 {self.collapsed_count[version]} "
+                             f"-> 压缩 {len(self.prefixes[version])} 个，多覆盖 {self.wasted[version]} 个地址"
+                             f"（{self.overcover(version):.2%}），用时 {self.timings.get(version, 0):.3f} 秒")
+        parts.append(f"解析用时 {self.timings.get('parse', 0):.3f} 秒")
+        if self.invalid:
+            parts.append(f"无效 {len(self.invalid)} 行")
+        return "；".join(parts)
+
+
+# 检查压缩的限制：前缀数量上限（整数或 {4: .., 6: ..}，按协议版本分别限制）与多覆盖百分比，至少指定一个
+def check_limits(max_prefixes, max_overcover):
+    if max_prefixes is None and max_overcover is None:
+        raise ValueError("请指定前缀数量上限或多覆盖比例")
+    for version in (4, 6):
+        limit = target_prefixlen(max_prefixes, version)
+        if limit is not None and limit < 1:
+            raise ValueError(f"前缀数量上限至少为 1：{limit}")
+    if max_overcover is not None and max_overcover < 0:
+        raise ValueError(f"多覆盖比例不能为负数：{max_overcover}")
+
+
+# 分协议版本压缩已解析（或已排序）的整数前缀，两个版本的数据量都较大时并行处理
+def compress_parsed(result, prefixes, max_prefixes, max_overcover, ordered=False, parallel=True):
+    versions = sorted((4, 6), key=lambda v: len(prefixes[v]), reverse=True)
+    jobs = [(prefixes[v], MAX_PREFIXLEN[v], target_prefixlen(max_prefixes, v), max_overcover, ordered)
+            for v in versions]
+    with stage("压缩前缀") as record:
+        if parallel and len(prefixes[versions[1]]) >= PARALLEL_THRESHOLD:
+            outputs = run_parallel(compress_family, jobs)
+        else:
+            outputs = [compress_family(*job) for job in jobs]
+        record.add(len(prefixes[4]) + len(prefixes[6]))
+    for version, (compressed, collapsed_count, covered, wasted, seconds) in zip(versions, outputs):
+        result.input_count[version] = len(prefixes[version])
+        result.prefixes[version] = compressed
+        result.collapsed_count[version] = collapsed_count
+        result.covered[version] = covered
+        result.wasted[version] = wasted
+        result.timings[version] = seconds
+    return result
+
+
+# 解析子网文本并压缩：最多 max_prefixes 个前缀，或多覆盖不超过 max_overcover%（同时指定时都要满足，
+# 多覆盖比例优先，此时前缀数量可能仍多于上限）
+def compress_subnets(subnets, max_prefixes=None, max_overcover=None, parallel=True):
+    check_limits(max_prefixes, max_overcover)
+    parsed = parse_lines(subnets, parallel=parallel)
+    result = CompressionResult()
+    result.timings['parse'] = parsed.seconds
+    result.invalid_lines = parsed.invalid
+    result.invalid = list(dict.fromkeys(line for _, line in parsed.invalid))
+    return compress_parsed(result, parsed.prefixes, max_prefixes, max_overcover, parallel=parallel)
+
+
+# 压缩二进制前缀集：记录已经有序，无需解析与排序
+def compress_prefix_set(prefix_set, max_prefixes=None, max_overcover=None):
+    check_limits(max_prefixes, max_overcover)
+    result = CompressionResult()
+    result.timings['parse'] = 0.0
+    return compress_parsed(result, prefix_set.prefixes, max_prefixes, max_overcover, ordered=True, parallel=False)
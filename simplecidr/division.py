@@ -0,0 +1,78 @@
+from operator import index as to_index
+
+
+# 惰性子网序列：按下标直接计算第 N 个子网，不预先生成全部子网
+class SubnetRange:
+    def __init__(self, network, new_prefixlen):
+        self.network = network
+        self.version = network.version
+        self.max_prefixlen = network.max_prefixlen
+        self.new_prefixlen = new_prefixlen
+        self._network_class = network.__class__
+        # 超出范围时为空序列
+        if new_prefixlen < network.prefixlen or network.max_prefixlen < new_prefixlen:
+            self.step = 0
+            self.base = int(network.network_address)
+            self.count = 0
+            return
+        self.step = 1 << (network.max_prefixlen - new_prefixlen)
+        self.base = int(network.network_address)
+        self.count = 1 << (new_prefixlen - network.prefixlen)
+
+    # 子网总数（IPv6 可能超过 sys.maxsize，此时请使用 count 属性）
+    def __len__(self):
+        return self.count
+
+    def __bool__(self):
+        return self.count > 0
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self._make_network(self.base + i * self.step)
+
+    def __eq__(self, other):
+        if isinstance(other, SubnetRange):
+            return (self.version, self.base, self.new_prefixlen, self.count) == \
+                (other.version, other.base, other.new_prefixlen, other.count)
+        if isinstance(other, list):
+            return self.count == len(other) and list(self) == other
+        return NotImplemented
+
+    def __repr__(self):
+        return f"SubnetRange({self.network.with_prefixlen}, /{self.new_prefixlen}, count={self.count})"
+
+    # 支持整数下标与步长为 1 的切片
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, stride = item.indices(self.count)
+            if stride != 1:
+                raise ValueError("SubnetRange 仅支持步长为 1 的切片")
+            return self._sub_range(start, max(0, stop - start))
+        i = to_index(item)
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("子网下标超出范围")
+        return self._make_network(self.base + i * self.step)
+
+    # 第 N 个子网的网络地址（整数）
+    def base_of(self, i):
+        return self.base + i * self.step
+
+    # 地址所在子网的下标，不在范围内时返回 None
+    def index_of(self, address):
+        offset = int(address) - self.base
+        if self.count == 0 or offset < 0:
+            return None
+        i = offset // self.step
+        return i if i < self.count else None
+
+    def _sub_range(self, start, count):
+        sub = SubnetRange.__new__(SubnetRange)
+        sub.__dict__.update(self.__dict__)
+        sub.base = self.base + start * self.step
+        sub.count = count
+        return sub
+
+    def _make_network(self, base):
+        return self._network_class((base, self.new_prefixlen))
@@ -0,0 +1,118 @@
+import gzip
+import json
+from csv import writer
+from itertools import islice
+
+from .profiling import iter_stage, stage
+
+EXPORT_FILETYPES = [
+    ("CSV Files", "*.csv"),
+    ("CSV Files (gzip)", "*.csv.gz"),
+    ("JSON Lines Files", "*.jsonl"),
+    ("JSON Lines Files (gzip)", "*.jsonl.gz"),
+]
+# 写入文件时的缓冲区大小
+BUFFER_SIZE = 1 << 20
+# 划分结果的行数达到该值且安装了 numpy 时按列批量生成（结果相同），行数较少时不值得导入 numpy
+VECTORIZE_THRESHOLD = 20000
+
+
+# 按输出格式逐行写出结果：csv / jsonl / text
+# plain 为 True 表示所有字段都是无需转义的字符串（如地址、CIDR），可直接拼接，速度更快
+class RowWriter:
+    def __init__(self, stream, fmt, columns, header=None, lineterminator="\n", plain=False):
+        self.stream = stream
+        self.fmt = fmt
+        self.columns = columns
+        self.lineterminator = lineterminator
+        self.plain = plain
+        if fmt == "csv":
+            self.csv_writer = writer(stream, lineterminator=lineterminator)
+            self.csv_writer.writerow(header or columns)
+        elif fmt == "jsonl" and plain:
+            self.json_template = "{" + ", ".join(f'"{column}": "%s"' for column in columns) + "}\n"
+
+    def writerows(self, rows):
+        if self.plain and self.fmt == "csv":
+            lineterminator = self.lineterminator
+            self.stream.writelines(",".join(row) + lineterminator for row in rows)
+        elif self.plain and self.fmt == "jsonl":
+            template = self.json_template
+            self.stream.writelines(template % tuple(row) for row in rows)
+        elif self.fmt == "csv":
+            self.csv_writer.writerows(rows)
+        elif self.fmt == "jsonl":
+            columns = self.columns
+            self.stream.writelines(
+                json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str) + "\n" for row in rows)
+        else:
+            self.stream.writelines("\t".join(map(str, row)) + "\n" for row in rows)
+
+
+# 根据文件名推断导出格式与是否压缩，例如 result.jsonl.gz -> ("jsonl", True)
+def detect_format(path, default="csv"):
+    name = str(path).lower()
+    compress = name.endswith(".gz")
+    if compress:
+        name = name[:-3]
+    if name.endswith(".jsonl") or name.endswith(".json"):
+        return "jsonl", compress
+    if name.endswith(".txt"):
+        return "text", compress
+    if name.endswith(".csv"):
+        return "csv", compress
+    return default, compress
+
+
+# 打开带缓冲的文本输出流，compress 为 True 时写入 gzip
+def open_output(path, compress=False):
+    if compress:
+        return gzip.open(path, mode="wt", encoding="utf-8", newline="", compresslevel=6)
+    return open(path, mode="w", encoding="utf-8", newline="", buffering=BUFFER_SIZE)
+
+
+# 将行迭代器按块切分
+def iter_chunks(rows, chunk_size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# 划分结果：按块从惰性子网序列生成五元组行；行数较多且安装了 numpy 时使用向量化后端
+def iter_division_chunks(calculator, subnets, chunk_size=8192, start=0, stop=None):
+    total = getattr(subnets, "count", None)
+    if total is None:
+        total = len(subnets)
+    stop = total if stop is None else min(stop, total)
+    if stop - start >= VECTORIZE_THRESHOLD:
+        from .vectorized import iter_division_chunks_vectorized, numpy_available
+        if numpy_available():
+            yield from iter_division_chunks_vectorized(subnets, chunk_size, start, stop)
+            return
+    for offset in range(start, stop, chunk_size):
+        yield calculator.get_multiple_subnet_info(subnets[offset:min(offset + chunk_size, stop)], cache=False)
+
+
+# 流式导出：逐块写入文件，每块写完后回调 progress(已写行数)
+# chunks 为行块的迭代器，内存占用只与块大小有关
+def export_chunks(path, columns, chunks, header=None, fmt=None, compress=None,
+                  progress=None, lineterminator="\r\n", plain=False):
+    detected_fmt, detected_compress = detect_format(path)
+    fmt = fmt or detected_fmt
+    compress = detected_compress if compress is None else compress
+    written = 0
+    with open_output(path, compress) as stream:
+        out = RowWriter(stream, fmt, columns, header=header,
+                        lineterminator=lineterminator, plain=plain)
+        # 生成行（惰性计算的结果在这里产生）与写入文件分别计时
+        for chunk in iter_stage("生成导出行", chunks, len):
+            with stage("写入文件") as record:
+                out.writerows(chunk)
+                record.add(len(chunk))
+            written += len(chunk)
+            if progress is not None:
+                progress(written)
+    return written
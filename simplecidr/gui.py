@@ -0,0 +1,1806 @@
+from tkinter import ttk, filedialog, messagebox
+from tkinter import END, CENTER, LEFT
+from tkinter import Tk, Toplevel, Text, StringVar, BooleanVar, Canvas
+from ipaddress import ip_network
+from itertools import zip_longest
+import os
+import time
+
+from .aggregation import AggregationResult
+from .calculator import Calculator
+from .export import EXPORT_FILETYPES, export_chunks, iter_chunks, iter_division_chunks
+from .incremental import AggregationDiff
+from .prefixset import PREFIX_SET_FILETYPES, PrefixSet, is_prefix_set_file, is_prefix_set_path
+from .profiling import Profiler, activate, deactivate, stage
+from .sources import PREFIX_FILETYPES, iter_prefix_file, preview_prefix_file
+from .subnetinfo import format_address
+from .table import MAX_INDEX_ROWS, TableIndex
+from .tasks import BackgroundTask
+from .utilization import GRID_COLUMNS
+
+# 集合运算页面的运算方式
+SET_OPERATION_METHODS = {
+    "并集 A ∪ B": "union",
+    "交集 A ∩ B": "intersect",
+    "差集 A − B": "difference",
+    "对称差 A △ B": "symdiff",
+    "重叠检测": "overlap",
+}
+
+# 划分结果表格的列标题；排序时在标题后显示方向
+DIVISION_HEADINGS = {
+    'network': '子网',
+    'netmask': '子网掩码',
+    'first': '首个可用地址',
+    'last': '最后可用地址',
+    'broadcast': '广播地址',
+    'name': '名称',
+}
+DIVISION_FILTER_MODES = {"包含": "substring", "前缀": "prefix"}
+# 子网汇总页面的汇总方式：按期望掩码取超网，或有界压缩（限制前缀数量、限制多覆盖比例）
+AGGREGATION_MODES = {"按期望掩码": None, "限制前缀数量": "max_prefixes", "限制多覆盖比例(%)": "max_overcover"}
+
+
+# 划分结果的列：VLSM 结果附带需求名称，多显示一列“名称”
+def division_columns(source):
+    columns = tuple(DIVISION_HEADINGS)
+    return columns if hasattr(source, 'names') else columns[:-1]
+
+
+# 普通 Treeview 每批插入的行数，批次之间让出事件循环
+TREE_INSERT_BATCH = 500
+
+# 空间利用热力图：每个格子的边长（像素），颜色从空闲（浅灰）经绿、黄到已满（红）
+UTILIZATION_CELL_PIXELS = 6
+UTILIZATION_COLORS = ['#eeeeee'] + [
+    f'#{min(255, 510 * i // 100):02x}{min(255, 510 * (100 - i) // 100):02x}40' for i in range(1, 101)]
+
+
+# Windows 上 Python 自带的 Tcl/Tk 库目录，启动界面时若未设置且目录存在才使用
+TCL_TK_LIBRARIES = {
+    'TCL_LIBRARY': r'C:\Program Files\Python313\tcl\tcl8.6',
+    'TK_LIBRARY': r'C:\Program Files\Python313\tcl\tk8.6',
+}
+
+
+# 虚拟化的Treeview：只为可见窗口内的行创建条目，数据源只需支持长度和切片
+# 设置视图（表格索引与行号列表）后改为显示排序、筛选后的行，数据源保持不变
+class VirtualTreeview:
+    def __init__(self, frame, columns, row_builder, height=18):
+        self.row_builder = row_builder
+        self.source = []
+        self.index = None
+        self.view = None
+        self.total = 0
+        self.offset = 0
+        self.page_size = height
+        self.tree = ttk.Treeview(
+            frame, columns=columns, show="headings", height=height)
+        self.scrollbar = ttk.Scrollbar(
+            frame, orient='vertical', command=self.on_scroll)
+        self.scrollbar.pack(side='right', fill='y')
+        self.tree.pack(side=LEFT, expand=True, fill='both')
+        self.tree.bind('<Configure>', self.on_resize)
+        self.tree.bind('<MouseWheel>', self.on_mouse_wheel)
+        self.tree.bind('<Button-4>', lambda e: self.scroll_to(self.offset - 3))
+        self.tree.bind('<Button-5>', lambda e: self.scroll_to(self.offset + 3))
+        self.tree.bind('<Prior>', lambda e: self.scroll_to(self.offset - self.page_size))
+        self.tree.bind('<Next>', lambda e: self.scroll_to(self.offset + self.page_size))
+        self.tree.bind('<Home>', lambda e: self.scroll_to(0))
+        self.tree.bind('<End>', lambda e: self.scroll_to(self.total))
+
+    # 更换数据源并回到顶部
+    def set_source(self, source):
+        self.source = source
+        self.index = None
+        self.view = None
+        self.reset_total()
+
+    def reset_total(self):
+        # 超大的 IPv6 序列无法使用 len()，优先读取 count 属性
+        self.total = getattr(self.source, 'count', None)
+        if self.total is None:
+            self.total = len(self.source)
+        self.offset = 0
+        self.render()
+
+    # 显示表格索引中按 view（行号列表）排列的行；view 为 None 时恢复显示完整数据源
+    def set_view(self, index, view):
+        self.index = index
+        self.view = view
+        if view is None:
+            self.reset_total()
+            return
+        self.total = len(view)
+        self.offset = 0
+        self.render()
+
+    # 当前显示的行（已排序、筛选时为视图中的行），按块产出，用于导出
+    def iter_view_chunks(self, chunk_size=8192):
+        rows = self.index.rows
+        for start in range(0, len(self.view), chunk_size):
+            yield [rows[i] for i in self.view[start:start + chunk_size]]
+
+    # 只渲染当前窗口内的行
+    def render(self):
+        self.tree.delete(*self.tree.get_children())
+        stop = min(self.offset + self.page_size, self.total)
+        if self.offset < stop:
+            if self.view is not None:
+                rows = [self.index.rows[i] for i in self.view[self.offset:stop]]
+            else:
+                rows = self.row_builder(self.source[self.offset:stop])
+            with stage("插入表格") as record:
+                for item in rows:
+                    self.tree.insert("", "end", values=item)
+                record.add(stop - self.offset)
+        if self.total:
+            self.scrollbar.set(self.offset / self.total, stop / self.total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def scroll_to(self, offset):
+        offset = max(0, min(offset, self.total - self.page_size))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+        return 'break'
+
+    # 滚动条回调：moveto 按比例跳转，scroll 按行或按页移动
+    def on_scroll(self, action, value, unit=None):
+        if action == 'moveto':
+            self.scroll_to(int(float(value) * self.total))
+        elif action == 'scroll':
+            step = self.page_size if unit == 'pages' else 1
+            self.scroll_to(self.offset + int(value) * step)
+
+    def on_mouse_wheel(self, event):
+        return self.scroll_to(self.offset - int(event.delta / 120) * 3)
+
+    # 根据组件高度重新计算可见行数
+    def on_resize(self, event):
+        row_height = ttk.Style().lookup('Treeview', 'rowheight') or 20
+        page_size = max(1, (event.height - 25) // int(row_height))
+        if page_size != self.page_size:
+            self.page_size = page_size
+            self.render()
+
+
+# 界面只负责输入输出，计算交给 Calculator（不依赖 tkinter，也可单独用于命令行与进程池）
+class Utils:
+    def __init__(self, calculator=None):
+        self.calculator = calculator or Calculator()
+        # 正在分批插入的 Treeview 及其 after() 任务
+        self.tree_insert_jobs = {}
+
+    # 在Text组件输出信息
+    def show_info_in_text_weight(self, info, text_weight):
+        text_weight.config(state='normal')
+        text_weight.delete('1.0', END)
+        if isinstance(info, dict):
+            text_weight.insert(END, self.calculator.format_network_info(info))
+        elif isinstance(info, list):
+            self.append_lines_to_text_weight(info, text_weight)
+        else:
+            messagebox.showerror("错误", info)
+        text_weight.config(state='disabled')
+
+    # 在Text组件末尾追加多行（一次插入，减少 Tcl 调用）
+    def append_lines_to_text_weight(self, lines, text_weight):
+        if not lines:
+            return
+        with stage("显示结果") as record:
+            state = text_weight.cget('state')
+            text_weight.config(state='normal')
+            text_weight.insert(END, "".join(f"{line}\n" for line in lines))
+            text_weight.config(state=state)
+            record.add(len(lines))
+
+    # 在Tree组件输出信息：一次删除全部旧行，新行分批插入，批次之间让出事件循环
+    def show_info_in_tree_weight(self, info, tree_weight):
+        job = self.tree_insert_jobs.pop(str(tree_weight), None)
+        if job is not None:
+            self.root.after_cancel(job)
+        tree_weight.delete(*tree_weight.get_children())
+        if isinstance(info, list):
+            self.insert_rows_in_batches(tree_weight, info, 0)
+        else:
+            messagebox.showerror("错误", info)
+
+    def insert_rows_in_batches(self, tree_weight, rows, start):
+        stop = min(start + TREE_INSERT_BATCH, len(rows))
+        with stage("插入表格") as record:
+            for item in rows[start:stop]:
+                tree_weight.insert("", "end", values=item)
+            record.add(stop - start)
+        if stop < len(rows):
+            self.tree_insert_jobs[str(tree_weight)] = self.root.after(
+                1, self.insert_rows_in_batches, tree_weight, rows, stop)
+        else:
+            self.tree_insert_jobs.pop(str(tree_weight), None)
+
+    # 在虚拟Tree组件输出子网序列
+    def show_subnets_in_virtual_tree(self, subnets, virtual_tree):
+        if isinstance(subnets, str):
+            virtual_tree.set_source([])
+            messagebox.showerror("错误", subnets)
+        else:
+            if virtual_tree is self.subnet_view:
+                virtual_tree.tree.configure(displaycolumns=division_columns(subnets))
+            virtual_tree.set_source(subnets)
+        if virtual_tree is self.subnet_view:
+            self.hold_prefix_set("division", subnets if isinstance(subnets, PrefixSet) else None)
+
+    # 从Entry组件读取整数
+    def read_intger_from_entry_weight(self, entry_weight):
+        try:
+            value = int(entry_weight.get())
+            return value
+        except TypeError:
+            return None
+        except ValueError:
+            return None
+
+    # 从Entry组件读取非空值
+    def read_non_empty_value_from_entry_weight(self, entry_weight):
+        entry_value = entry_weight.get()
+        if entry_value:
+            return entry_value
+        else:
+            return None
+
+    # 从Text组件读取非空行内容
+    def read_non_empty_lines_from_text_weight(self, text_weight):
+        text_lines = text_weight.get("1.0", END).splitlines()
+        non_empty_lines = [line for line in text_lines if line.strip()]
+        return non_empty_lines
+
+    # 强制让组件获得焦点
+    def force_weight_to_focus(self, weight):
+        weight.focus_force()
+
+
+class Event(Utils):
+    def __init__(self, calculator=None):
+        super().__init__(calculator)
+
+    # =================== 事件0——后台任务 =================== #
+    # 在后台线程运行耗时计算，结果通过 after() 轮询分批交回界面
+    def run_task(self, action, func, *args, on_done=None, on_batch=None, on_error=None, on_cancel=None):
+        if self.current_task is not None and self.current_task.running:
+            messagebox.showwarning("告警", "已有任务正在运行，请等待完成或先取消！")
+            return None
+        # 启用剖析时，后台计算与结果显示的各阶段都记录到该任务的剖析器
+        task = BackgroundTask(func, *args)
+        task.profiler = None
+        if self.profile_enabled.get():
+            task.profiler = activate(Profiler(action, memory=self.profile_memory.get()))
+        task.start()
+        task.action = action
+        task.handlers = {"done": on_done, "batch": on_batch,
+                         "error": on_error, "cancelled": on_cancel}
+        self.current_task = task
+        self.cancel_btn.config(state='normal')
+        self.poll_task()
+        return task
+
+    # 轮询后台任务的事件队列并刷新状态栏
+    def poll_task(self):
+        task = self.current_task
+        if task is None:
+            return
+        for kind, value in task.poll():
+            handler = task.handlers.get(kind)
+            if kind != "batch":
+                self.finish_task(task, kind)
+            if handler is not None:
+                handler(value)
+            elif kind == "error":
+                messagebox.showerror("错误", f"{task.action}失败！\n{value}")
+            if kind != "batch":
+                self.finish_profile(task)
+        if self.current_task is task:
+            self.show_task_status(task)
+            self.root.after(50, self.poll_task)
+
+    # 任务结束：恢复状态栏
+    def finish_task(self, task, kind):
+        self.current_task = None
+        self.cancel_btn.config(state='disabled')
+        self.progress_bar.stop()
+        self.progress_bar.config(mode='determinate')
+        self.progress_bar['value'] = 100 if kind == "done" else 0
+        result = {"done": "完成", "cancelled": "已取消", "error": "失败"}[kind]
+        self.status_label.config(
+            text=f"{task.action}{result} | 处理 {task.done} 行 | 用时 {task.elapsed:.2f} 秒 | {task.rate:.0f} 行/秒")
+        self.show_cache_status()
+
+    # 任务结束且结果显示完成后停止剖析，在调试面板中显示各阶段的统计
+    def finish_profile(self, task):
+        if task.profiler is None:
+            return
+        self.last_profile = deactivate(task.profiler)
+        self.show_profile()
+
+    # 在状态栏显示结果缓存的命中/未命中计数
+    def show_cache_status(self):
+        self.cache_label.config(text=self.calculator.cache_summary())
+
+    # 在状态栏显示进度、用时与速度；总数未知时进度条为往复模式
+    def show_task_status(self, task):
+        if task.total:
+            self.progress_bar.config(mode='determinate')
+            self.progress_bar['value'] = task.done * 100 / task.total
+            progress = f"{task.done} / {task.total} 行"
+        else:
+            if str(self.progress_bar.cget('mode')) != 'indeterminate':
+                self.progress_bar.config(mode='indeterminate')
+                self.progress_bar.start(20)
+            progress = f"{task.done} 行"
+        self.status_label.config(
+            text=f"{task.action}中: {progress} | 用时 {task.elapsed:.1f} 秒 | {task.rate:.0f} 行/秒")
+
+    # 触发取消任务
+    def on_click_cancel_btn(self, *args):
+        if self.current_task is not None:
+            self.current_task.cancel()
+
+    # 后台导出，取消或失败时删除写了一半的文件
+    def export_in_background(self, file_path, columns, chunks, total, **kwargs):
+        def export(task):
+            task.report(0, total)
+            return export_chunks(file_path, columns, chunks,
+                                 progress=task.report, **kwargs)
+
+        def on_done(written):
+            messagebox.showinfo("导出成功", f"成功将 {written} 行导出到 {file_path} ！")
+
+        def on_error(e):
+            self.remove_partial_file(file_path)
+            if isinstance(e, PermissionError):
+                messagebox.showwarning(
+                    "文件被占用", " CSV 文件被其他程序占用！请先关闭 CSV 文件后重试！")
+            else:
+                messagebox.showerror("错误", f"导出失败！\n{e}")
+
+        self.run_task("导出", export, on_done=on_done, on_error=on_error,
+                      on_cancel=lambda _: self.remove_partial_file(file_path))
+
+    # 后台保存二进制前缀集；先写临时文件再替换，失败或取消时原文件保持不变
+    def save_prefix_set_in_background(self, file_path, subnets, total):
+        def save(task):
+            task.report(0, total)
+            return self.calculator.save_prefix_set(file_path, subnets, progress=task.report)
+
+        def on_done(written):
+            messagebox.showinfo("保存成功", f"成功将 {written} 条前缀保存到 {file_path} ！")
+
+        def on_error(e):
+            if isinstance(e, PermissionError):
+                messagebox.showwarning(
+                    "文件被占用", "前缀集文件被占用！请先关闭使用该文件的程序后重试！")
+            else:
+                messagebox.showerror("错误", f"保存失败！\n{e}")
+
+        self.run_task("保存前缀集", save, on_done=on_done, on_error=on_error)
+
+    # 记录某个页面正在使用的前缀集（None 表示不再使用），关闭被替换的前缀集，
+    # 释放内存映射与文件句柄（Windows 上同时解除对文件的占用）
+    def hold_prefix_set(self, role, prefix_set):
+        previous = self.prefix_sets.pop(role, None)
+        if previous is not None and previous is not prefix_set:
+            previous.close()
+        if prefix_set is not None:
+            self.prefix_sets[role] = prefix_set
+
+    def remove_partial_file(self, file_path):
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
+
+    # =================== 事件1——子网信息 =================== #
+    # 触发点击按钮
+    def on_click_get_info_btn(self, *args):
+        address = self.address_entry.get()
+        mask = self.mask_entry.get()
+        if not address:
+            messagebox.showwarning("警告", "未填写网络地址！")
+            self.force_weight_to_focus(weight=self.address_entry)
+        elif not mask:
+            messagebox.showwarning("警告", "未填写子网掩码！")
+            self.force_weight_to_focus(weight=self.mask_entry)
+        else:
+            info = self.calculator.get_single_subnet_info(f"{address}/{mask}")
+            self.show_info_in_text_weight(info, self.detail_info)
+            self.show_cache_status()
+
+    # =================== 事件2——子网划分 =================== #
+    # 触发变更划分方式
+    def on_change_division_method(self, *args):
+        selected_item = self.method_combobox.get()
+        if selected_item == "1. 指定新子网的子网掩码":
+            self.method_label.config(text='子网掩码:')
+        elif selected_item == "2. 指定新子网的子网数量":
+            self.method_label.config(text='子网数量:')
+        elif selected_item == "4. 按需求分配子网(VLSM)":
+            self.method_label.config(text='分配需求:')
+        else:
+            self.method_label.config(text='地址数量:')
+        # VLSM 需求文本较长，加宽输入框
+        if selected_item == "4. 按需求分配子网(VLSM)":
+            self.new_subnets_entry.config(width=30)
+        else:
+            self.new_subnets_entry.config(width=5)
+
+    # 按需求划分出所有子网（在后台线程中运行）
+    def divide_subnets(self, task, network, method, new_subnet):
+        with stage("计算划分"):
+            return self.compute_division(network, method, new_subnet)
+
+    def compute_division(self, network, method, new_subnet):
+        if method == "1. 指定新子网的子网掩码":
+            return self.calculator.calculate_subnets_by_new_prefix(network, new_subnet)
+        elif method == "2. 指定新子网的子网数量":
+            return self.calculator.calculate_subnets_by_num_subnets(network, new_subnet)
+        elif method == "4. 按需求分配子网(VLSM)":
+            return self.calculator.calculate_subnets_by_requirements(network, new_subnet)
+        else:
+            return self.calculator.calculate_subnets_by_num_address(network, new_subnet)
+
+    # 触发划分子网功能
+    def on_click_division_btn(self, *args):
+        # 解析网络信息
+        try:
+            new_subnet = None
+            address = str(self.prepare_address_entry.get())
+            mask = str(self.current_mask_entry.get())
+            method = self.method_combobox.get()
+            if method == "4. 按需求分配子网(VLSM)":
+                new_subnet = self.new_subnets_entry.get().strip() or None
+                if new_subnet is None:
+                    raise ValueError("未填写分配需求")
+            else:
+                new_subnet = int(self.new_subnets_entry.get())
+
+            network = ip_network(f"{address}/{mask}", strict=False)
+        except ValueError as e:
+            if not address:
+                messagebox.showwarning("警告", "未填写网络地址！")
+                self.force_weight_to_focus(weight=self.prepare_address_entry)
+            elif not mask:
+                messagebox.showwarning("警告", "未填写子网掩码！")
+                self.force_weight_to_focus(weight=self.current_mask_entry)
+            elif new_subnet is None:
+                messagebox.showwarning("警告", "未填有效值！")
+                self.force_weight_to_focus(weight=self.new_subnets_entry)
+            else:
+                self.show_subnets_in_virtual_tree(
+                    subnets=f" {address}/{mask} 不合规的网络！\n{e}", virtual_tree=self.subnet_view)
+            return
+
+        def on_done(new_subnets):
+            # 判断计算结果是否为空
+            if not new_subnets:
+                messagebox.showwarning(
+                    "警告", f"{self.method_label.cget('text')} 超出最大范围！")
+                self.force_weight_to_focus(weight=self.new_subnets_entry)
+            # 显示子网信息（只生成可见范围内的行）；已设置排序或筛选时对新结果重新应用
+            self.show_subnets_in_virtual_tree(
+                subnets=new_subnets, virtual_tree=self.subnet_view)
+            self.apply_division_view()
+            # VLSM 空间不足时列出未能分配的需求
+            unallocated = getattr(new_subnets, 'unallocated', None)
+            if unallocated:
+                names = "、".join(f"{name}(/{prefixlen})" for name, prefixlen in unallocated[:20])
+                more = f" 等 {len(unallocated)} 项" if len(unallocated) > 20 else ""
+                messagebox.showwarning("警告", f"地址空间不足，以下需求未能分配：\n{names}{more}")
+
+        def on_error(e):
+            if method == "4. 按需求分配子网(VLSM)":
+                messagebox.showwarning("警告", f"分配需求有误：{e}")
+                self.force_weight_to_focus(weight=self.new_subnets_entry)
+                return
+            self.show_subnets_in_virtual_tree(
+                subnets=f" {address}/{mask} 不合规的网络！\n{e}", virtual_tree=self.subnet_view)
+
+        self.run_task("划分子网", self.divide_subnets, network, method, new_subnet,
+                      on_done=on_done, on_error=on_error)
+
+    # 触发导出子网信息
+    def on_click_export_btn(self, *args):
+        # 选择文件保存路径
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=EXPORT_FILETYPES + PREFIX_SET_FILETYPES)
+        if file_path and is_prefix_set_path(file_path):
+            # 保存为二进制前缀集：已排序或筛选时只保存当前显示的子网
+            view = self.subnet_view
+            if view.view is not None:
+                subnets = (view.index.rows[i][0] for i in view.view)
+            else:
+                subnets = view.source
+            self.save_prefix_set_in_background(file_path, subnets, view.total)
+        elif file_path:
+            columns = division_columns(self.subnet_view.source)
+            header = [self.subnet_info_tree.heading(
+                column)['text'] for column in columns]
+            # 直接从子网序列分块生成并写入，而不是读取组件中的行；已排序或筛选时导出当前显示的行
+            if self.subnet_view.view is not None:
+                chunks = self.subnet_view.iter_view_chunks()
+            else:
+                chunks = iter_division_chunks(self.calculator, self.subnet_view.source)
+            # VLSM 的需求名称是用户输入的文本，需要转义，不能直接拼接
+            self.export_in_background(file_path, columns, chunks, self.subnet_view.total,
+                                      header=header, plain=len(columns) == len(DIVISION_HEADINGS) - 1)
+        else:
+            messagebox.showwarning("告警", "未选择保存文件路径！")
+
+    # 触发打开前缀集：内存映射后直接作为划分结果表格的数据源，不解析文本
+    def on_click_open_prefix_set_btn(self, *args):
+        # 后台任务可能正在读取当前的划分结果（例如导出），替换时会关闭其中的前缀集
+        if self.current_task is not None and self.current_task.running:
+            messagebox.showwarning("告警", "已有任务正在运行，请等待完成或先取消！")
+            return
+        file_path = filedialog.askopenfilename(filetypes=PREFIX_SET_FILETYPES)
+        if not file_path:
+            return
+        try:
+            prefix_set = self.calculator.open_prefix_set(file_path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("错误", f"无法打开前缀集 {file_path} ！\n{e}")
+            return
+        self.show_subnets_in_virtual_tree(subnets=prefix_set, virtual_tree=self.subnet_view)
+        self.apply_division_view()
+        self.status_label.config(text=f"已打开 {prefix_set.summary()}")
+
+    # 为划分结果建立表格索引（在后台线程中运行）
+    def build_table_index_in_background(self, task, source, columns):
+        total = getattr(source, 'count', None)
+        task.report(0, len(source) if total is None else total)
+        chunks = iter_division_chunks(self.calculator, source)
+        return TableIndex.from_chunks(columns, chunks, progress=task.report).prepare()
+
+    # 按筛选条件与排序列刷新划分结果表格；首次使用时先在后台建立索引
+    def apply_division_view(self):
+        view = self.subnet_view
+        text = self.division_filter_var.get().strip()
+        mode = DIVISION_FILTER_MODES[self.division_filter_mode.get()]
+        if not text and self.division_sort is None:
+            if view.view is not None:
+                view.set_view(None, None)
+            self.show_division_view_status()
+            return
+        source = view.source
+        total = getattr(source, 'count', None)
+        total = len(source) if total is None else total
+        if not total:
+            return
+        if self.division_index is None or self.division_index[0] is not source:
+            if total > MAX_INDEX_ROWS:
+                self.division_view_label.config(
+                    text=f"共 {total} 行，超过 {MAX_INDEX_ROWS} 行无法排序或筛选，请导出后处理")
+                return
+
+            def on_done(index):
+                self.division_index = (source, index)
+                if view.source is source:
+                    self.apply_division_view()
+
+            self.run_task("建立索引", self.build_table_index_in_background, source, division_columns(source),
+                          on_done=on_done)
+            return
+        index = self.division_index[1]
+        sort_column, reverse = self.division_sort or (None, False)
+        # 名称列只有 VLSM 结果才有
+        if sort_column not in index.columns:
+            sort_column = None
+        with stage("筛选排序") as record:
+            rows = index.view(text, mode, sort_column, reverse)
+            record.add(len(index))
+        view.set_view(index, rows)
+        self.show_division_view_status()
+
+    def show_division_view_status(self):
+        view = self.subnet_view
+        if view.view is None:
+            self.division_view_label.config(text="")
+        else:
+            self.division_view_label.config(text=f"显示 {len(view.view)} / {len(view.index)} 行")
+
+    # 筛选条件改变：稍作延迟，连续输入时只刷新一次
+    def on_change_division_filter(self, *args):
+        if self.division_filter_job is not None:
+            self.root.after_cancel(self.division_filter_job)
+        self.division_filter_job = self.root.after(150, self.on_division_filter_timer)
+
+    def on_division_filter_timer(self):
+        self.division_filter_job = None
+        self.apply_division_view()
+
+    # 触发点击列标题：按该列升序，再次点击降序，第三次点击恢复原顺序
+    def on_click_division_heading(self, column):
+        if self.division_sort is None or self.division_sort[0] != column:
+            self.division_sort = (column, False)
+        elif not self.division_sort[1]:
+            self.division_sort = (column, True)
+        else:
+            self.division_sort = None
+        for name, text in DIVISION_HEADINGS.items():
+            if self.division_sort is not None and self.division_sort[0] == name:
+                text += " ▼" if self.division_sort[1] else " ▲"
+            self.subnet_info_tree.heading(name, text=text)
+        self.apply_division_view()
+
+    # =================== 事件3——子网汇总 =================== #
+    # 汇总子网（在后台线程中运行）：与上一次的列表比较，只处理变化的部分；
+    # 全量汇总时汇总完成的子网分批交回界面，增量汇总时只返回变化
+    # pending_subnets 为文本行列表，或导入文件的路径（直接流式读取，不经过 Text 组件）
+    # 返回 (结果, 变化, 结果引用的前缀集或 None)
+    def aggregate_subnets_in_background(self, task, pending_subnets, new_prefixlen):
+        if not isinstance(pending_subnets, list):
+            return self.aggregate_file_in_background(task, pending_subnets, new_prefixlen)
+        diff = self.calculator.update_aggregation(
+            task.track(pending_subnets, len(pending_subnets)), new_prefixlen)
+        result = self.calculator.aggregation_result()
+        if diff.full:
+            for chunk in iter_chunks(result.cidrs(), 10000):
+                task.emit(chunk)
+        return result, diff, None
+
+    # 汇总导入的文件：文本文件流式解析，二进制前缀集内存映射后一遍扫描合并；
+    # 不经过增量汇总（不在内存中保留整个文件的行），增量汇总的状态随之清空，之后再汇总输入框时全量进行
+    def aggregate_file_in_background(self, task, path, new_prefixlen):
+        started = time.perf_counter()
+        self.calculator.clear_aggregation()
+        prefix_set = None
+        if is_prefix_set_file(path):
+            # 已合并的记录直接作为结果，前缀集在结果不再使用时才关闭
+            prefix_set = self.calculator.open_prefix_set(path)
+            task.report(0, len(prefix_set))
+            try:
+                result = self.calculator.aggregate_prefix_set(prefix_set, new_prefixlen)
+            except BaseException:
+                prefix_set.close()
+                raise
+            lines = len(prefix_set)
+        else:
+            result = self.calculator.aggregate_subnets(task.track(iter_prefix_file(path)), new_prefixlen)
+            lines = sum(result.input_count.values()) + len(result.invalid_lines)
+        diff = AggregationDiff()
+        diff.full = True
+        diff.lines_added = lines
+        diff.total = len(result)
+        for chunk in iter_chunks(result.cidrs(), 10000):
+            task.emit(chunk)
+        diff.seconds = time.perf_counter() - started
+        return result, diff, prefix_set
+
+    # 有界压缩（在后台线程中运行）：不经过增量汇总，增量汇总的状态随之清空；
+    # limits 为 {"max_prefixes": ..} 或 {"max_overcover": ..}
+    def compress_subnets_in_background(self, task, pending_subnets, limits):
+        self.calculator.clear_aggregation()
+        if isinstance(pending_subnets, list):
+            result = self.calculator.compress_subnets(task.track(pending_subnets, len(pending_subnets)), **limits)
+        elif is_prefix_set_file(pending_subnets):
+            with self.calculator.open_prefix_set(pending_subnets) as prefix_set:
+                task.report(0, len(prefix_set))
+                result = self.calculator.compress_prefix_set(prefix_set, **limits)
+        else:
+            result = self.calculator.compress_subnets(task.track(iter_prefix_file(pending_subnets)), **limits)
+        for chunk in iter_chunks(result.cidrs(), 10000):
+            task.emit(chunk)
+        return result
+
+    # 触发汇总子网功能
+    def on_click_aggregate_subnet_btn(self, *args):
+        # 先检查后台任务，避免任务未启动却已清空输出
+        if self.current_task is not None and self.current_task.running:
+            messagebox.showwarning("告警", "已有任务正在运行，请等待完成或先取消！")
+            return
+        # 保留空行，使无效行的行号与输入框一致；已导入文件时直接读取文件
+        if self.imported_file:
+            pending_lines = self.imported_file
+            pending_subnets = [self.imported_file]
+        else:
+            pending_lines = self.pending_text.get("1.0", END).splitlines()
+            pending_subnets = [line for line in pending_lines if line.strip()]
+        mode = AGGREGATION_MODES.get(self.aggregate_mode_combobox.get())
+        if mode is not None:
+            self.compress_pending_subnets(pending_lines, pending_subnets, mode)
+            return
+        new_prefixlen = self.read_intger_from_entry_weight(
+            entry_weight=self.expect_mask_entry)
+        # IPv6 的期望掩码未填写时与 IPv4 相同
+        new_prefixlen6 = new_prefixlen
+        if self.read_non_empty_value_from_entry_weight(self.expect_mask6_entry):
+            new_prefixlen6 = self.read_intger_from_entry_weight(
+                entry_weight=self.expect_mask6_entry)
+        if pending_subnets == []:
+            messagebox.showwarning("告警", f"未填写有效子网：{pending_subnets}")
+            self.force_weight_to_focus(weight=self.pending_text)
+        elif new_prefixlen == None or new_prefixlen < 1:
+            messagebox.showwarning("告警", f"未填写有效子网掩码：{new_prefixlen}")
+            self.force_weight_to_focus(weight=self.expect_mask_entry)
+        elif new_prefixlen6 == None or new_prefixlen6 < 1:
+            messagebox.showwarning("告警", f"未填写有效 IPv6 子网掩码：{new_prefixlen6}")
+            self.force_weight_to_focus(weight=self.expect_mask6_entry)
+        else:
+            new_prefixlen = {4: new_prefixlen, 6: new_prefixlen6}
+            # 期望掩码改变（或首次汇总）与导入文件时全量汇总，结果分批显示；否则只显示变化
+            full = self.calculator.aggregator.needs_rebuild(new_prefixlen) or self.imported_file
+            if full:
+                self.success_frame.config(text="汇总完成")
+                self.show_info_in_text_weight(info=[], text_weight=self.success_text)
+
+            def on_batch(chunk):
+                self.append_lines_to_text_weight(chunk, self.success_text)
+
+            def on_done(value):
+                result, diff, prefix_set = value
+                # 保留计算结果，导出时直接使用；无效行附带行号
+                self.aggregated_subnets = result
+                self.hold_prefix_set("aggregation", prefix_set)
+                self.invalid_subnets = [
+                    f"第 {lineno} 行: {line}" for lineno, line in result.invalid_lines]
+                self.show_info_in_text_weight(
+                    info=self.invalid_subnets, text_weight=self.failed_text)
+                if not diff.full:
+                    self.show_aggregation_diff(diff)
+                self.status_label.config(text=f"汇总完成：{diff.summary()}")
+
+            # 全量汇总被取消或失败时输出已不完整，重置汇总状态，下次重新全量汇总
+            def on_cancel(value):
+                if full:
+                    self.calculator.clear_aggregation()
+
+            def on_error(error):
+                on_cancel(error)
+                messagebox.showerror("错误", f"汇总子网失败！\n{error}")
+
+            self.run_task("汇总子网", self.aggregate_subnets_in_background, pending_lines, new_prefixlen,
+                          on_batch=on_batch, on_done=on_done, on_error=on_error, on_cancel=on_cancel)
+
+    # 有界压缩：前缀数量上限为正整数，多覆盖比例为非负的百分数
+    def compress_pending_subnets(self, pending_lines, pending_subnets, mode):
+        limit_text = self.compress_limit_entry.get().strip()
+        try:
+            limit = int(limit_text) if mode == "max_prefixes" else float(limit_text)
+        except ValueError:
+            limit = None
+        if pending_subnets == []:
+            messagebox.showwarning("告警", f"未填写有效子网：{pending_subnets}")
+            self.force_weight_to_focus(weight=self.pending_text)
+            return
+        if limit is None or limit < (1 if mode == "max_prefixes" else 0):
+            messagebox.showwarning("告警", f"未填写有效压缩上限：{limit_text}")
+            self.force_weight_to_focus(weight=self.compress_limit_entry)
+            return
+        self.success_frame.config(text="压缩完成")
+        self.show_info_in_text_weight(info=[], text_weight=self.success_text)
+        # 汇总结果已被清空，下次汇总时全量显示
+        self.calculator.clear_aggregation()
+
+        def on_batch(chunk):
+            self.append_lines_to_text_weight(chunk, self.success_text)
+
+        def on_done(result):
+            self.aggregated_subnets = result
+            self.hold_prefix_set("aggregation", None)
+            self.invalid_subnets = [
+                f"第 {lineno} 行: {line}" for lineno, line in result.invalid_lines]
+            self.show_info_in_text_weight(
+                info=self.invalid_subnets, text_weight=self.failed_text)
+            self.status_label.config(text=f"压缩完成：{result.summary()}")
+
+        self.run_task("压缩前缀", self.compress_subnets_in_background, pending_lines, {mode: limit},
+                      on_batch=on_batch, on_done=on_done)
+
+    # 增量汇总后只显示结果的变化：+ 新增的子网，- 移除的子网；完整结果可导出
+    def show_aggregation_diff(self, diff):
+        lines = [f"+ {subnet}" for subnet in diff.networks("added")]
+        lines += [f"- {subnet}" for subnet in diff.networks("removed")]
+        self.show_info_in_text_weight(info=lines, text_weight=self.success_text)
+        if diff:
+            self.success_frame.config(text=f"汇总结果变化（共 {diff.total} 个，导出可获得完整结果）")
+        else:
+            self.success_frame.config(text=f"汇总结果无变化（共 {diff.total} 个，导出可获得完整结果）")
+
+    # 触发导入文件功能：只在输入框中预览前若干行，汇总时直接流式读取文件
+    def on_click_import_file_btn(self):
+        file_path = filedialog.askopenfilename(filetypes=PREFIX_FILETYPES)
+        if not file_path:
+            return
+        try:
+            preview = preview_prefix_file(file_path)
+        except OSError as e:
+            messagebox.showerror("错误", f"无法读取文件 {file_path} ！\n{e}")
+            return
+        self.imported_file = file_path
+        self.pending_text.config(state='normal')
+        self.pending_text.delete('1.0', END)
+        self.append_lines_to_text_weight(preview, self.pending_text)
+        self.pending_text.config(state='disabled')
+        self.pending_list_frame.config(
+            text=f"等待汇总子网列表（文件预览：{os.path.basename(file_path)}，前 {len(preview)} 行）")
+
+    # 触发清除信息功能
+    def on_click_clear_info_btn(self):
+        # 后台任务可能正在读取汇总结果（例如导出），清空时会关闭其中的前缀集
+        if self.current_task is not None and self.current_task.running:
+            messagebox.showwarning("告警", "已有任务正在运行，请等待完成或先取消！")
+            return
+        self.imported_file = None
+        self.pending_list_frame.config(text="等待汇总子网列表")
+        self.pending_text.config(state='normal')
+        self.pending_text.delete('1.0', END)
+
+        self.success_text.config(state='normal')
+        self.success_text.delete('1.0', END)
+        self.success_text.config(state='disabled')
+
+        self.failed_text.config(state='normal')
+        self.failed_text.delete('1.0', END)
+        self.failed_text.config(state='disabled')
+
+        self.aggregated_subnets = AggregationResult()
+        self.hold_prefix_set("aggregation", None)
+        self.invalid_subnets = []
+        self.success_frame.config(text="汇总完成")
+        self.calculator.clear_aggregation()
+
+    # 触发导出结果功能
+    def on_click_export_result_btn(self):
+        # 选择文件保存路径
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=EXPORT_FILETYPES + PREFIX_SET_FILETYPES)
+        if file_path and is_prefix_set_path(file_path):
+            # 二进制前缀集只保存汇总完成的子网
+            self.save_prefix_set_in_background(file_path, self.aggregated_subnets, len(self.aggregated_subnets))
+        elif file_path:
+            # 以行数多的为准，较短的一列补空
+            total = max(len(self.aggregated_subnets), len(self.invalid_subnets))
+            rows = zip_longest(self.aggregated_subnets.cidrs(),
+                               self.invalid_subnets, fillvalue='')
+            self.export_in_background(file_path, ('aggregated', 'failed'), iter_chunks(rows, 8192),
+                                      total, header=['汇总完成', '汇总失败'])
+        else:
+            messagebox.showwarning("告警", "未选择保存文件路径！")
+
+    # =================== 事件4——地址查询 =================== #
+    # 加载前缀表并编译（在后台线程中运行）
+    # source 为导入文件的路径，或划分、汇总的结果
+    def load_prefix_table_in_background(self, task, source):
+        if isinstance(source, str) and is_prefix_set_file(source):
+            # 二进制前缀集内存映射后直接查找，前缀互相重叠时才编译
+            task.report(0, 0)
+            prefix_set = self.calculator.open_prefix_set(source)
+            table = prefix_set.lookup_table()
+            # 前缀互相重叠时已编译为独立的 PrefixTable，不再需要内存映射
+            if table is not prefix_set:
+                prefix_set.close()
+        elif isinstance(source, str):
+            table = self.calculator.load_prefix_table(task.track(iter_prefix_file(source)))
+        else:
+            task.report(0, 0)
+            table = self.calculator.build_prefix_table(source)
+        table.compile()
+        return table
+
+    # 加载完成：保存前缀表并显示来源与数量
+    def set_prefix_table(self, table, source_name):
+        self.prefix_table = table
+        self.hold_prefix_set("lookup", table if isinstance(table, PrefixSet) else None)
+        text = f"已加载 {source_name}：{len(table)} 条前缀"
+        if table.invalid:
+            text += f"，无效 {len(table.invalid)} 行"
+        self.prefix_table_label.config(text=text)
+
+    def load_prefix_table_from(self, source, source_name):
+        self.run_task("加载前缀表", self.load_prefix_table_in_background, source,
+                      on_done=lambda table: self.set_prefix_table(table, source_name))
+
+    # 触发导入前缀文件
+    def on_click_load_table_file_btn(self, *args):
+        file_path = filedialog.askopenfilename(filetypes=PREFIX_FILETYPES)
+        if file_path:
+            self.load_prefix_table_from(file_path, os.path.basename(file_path))
+
+    # 触发使用子网划分的结果作为前缀表
+    def on_click_use_division_result_btn(self, *args):
+        if not self.subnet_view.total:
+            messagebox.showwarning("告警", "请先在“子网划分”页面划分子网！")
+            return
+        self.load_prefix_table_from(self.subnet_view.source, "划分结果")
+
+    # 触发使用子网汇总的结果作为前缀表
+    def on_click_use_aggregation_result_btn(self, *args):
+        if not self.aggregated_subnets:
+            messagebox.showwarning("告警", "请先在“子网汇总”页面汇总子网！")
+            return
+        self.load_prefix_table_from(self.aggregated_subnets, "汇总结果")
+
+    # 查询输入框中的地址（在后台线程中运行），返回结果行与无效行
+    def lookup_addresses_in_background(self, task, table, lines):
+        invalid = []
+        rows = list(table.lookup_lines(task.track(lines, len(lines)), invalid))
+        return rows, invalid
+
+    # 检查是否已加载前缀表
+    def check_prefix_table(self):
+        if self.prefix_table is None or not self.prefix_table:
+            messagebox.showwarning("告警", "请先加载前缀表！")
+            return False
+        return True
+
+    # 触发查询地址
+    def on_click_lookup_btn(self, *args):
+        lines = self.lookup_text.get("1.0", END).splitlines()
+        if not self.check_prefix_table():
+            return
+        if not any(line.strip() for line in lines):
+            messagebox.showwarning("告警", "未填写待查询的地址！")
+            self.force_weight_to_focus(weight=self.lookup_text)
+            return
+
+        def on_done(value):
+            rows, invalid = value
+            self.lookup_rows = rows
+            self.lookup_view.set_source(rows)
+            if invalid:
+                messagebox.showwarning("告警", "以下地址不合规：\n" + "\n".join(
+                    f"第 {lineno} 行: {line}" for lineno, line in invalid[:20]))
+
+        self.run_task("查询地址", self.lookup_addresses_in_background, self.prefix_table, lines,
+                      on_done=on_done)
+
+    # 批量查询文件：逐行读取地址文件，查询结果直接写入输出文件
+    def lookup_file_in_background(self, task, table, input_path, output_path):
+        invalid = []
+        rows = table.lookup_lines(task.track(iter_prefix_file(input_path)), invalid)
+        written = export_chunks(output_path, ('address', 'network'), iter_chunks(rows, 8192),
+                                header=['地址', '所属子网'], plain=True)
+        return written, invalid
+
+    # 触发批量查询文件
+    def on_click_lookup_file_btn(self, *args):
+        if not self.check_prefix_table():
+            return
+        input_path = filedialog.askopenfilename(filetypes=PREFIX_FILETYPES)
+        if not input_path:
+            return
+        output_path = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=EXPORT_FILETYPES)
+        if not output_path:
+            messagebox.showwarning("告警", "未选择保存文件路径！")
+            return
+
+        def on_done(value):
+            written, invalid = value
+            message = f"成功将 {written} 行查询结果导出到 {output_path} ！"
+            if invalid:
+                message += f"\n另有 {len(invalid)} 行不是合规的 IP 地址。"
+            messagebox.showinfo("查询完成", message)
+
+        def on_error(e):
+            self.remove_partial_file(output_path)
+            messagebox.showerror("错误", f"批量查询失败！\n{e}")
+
+        self.run_task("批量查询", self.lookup_file_in_background, self.prefix_table, input_path, output_path,
+                      on_done=on_done, on_error=on_error,
+                      on_cancel=lambda _: self.remove_partial_file(output_path))
+
+    # 触发导出查询结果
+    def on_click_export_lookup_btn(self, *args):
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=EXPORT_FILETYPES)
+        if file_path:
+            self.export_in_background(file_path, ('address', 'network'), iter_chunks(self.lookup_rows, 8192),
+                                      len(self.lookup_rows), header=['地址', '所属子网'], plain=True)
+        else:
+            messagebox.showwarning("告警", "未选择保存文件路径！")
+
+    # =================== 事件5——集合运算 =================== #
+    # 集合运算（在后台线程中运行）；两侧为文本行列表，或导入文件的路径
+    def set_operation_in_background(self, task, operation, left, right):
+        task.report(0, 0)
+        sources = [side if isinstance(side, list) else iter_prefix_file(side) for side in (left, right)]
+        result = self.calculator.subnet_set_operation(operation, *sources)
+        return result, list(result.rows())
+
+    # 读取一侧的输入：已导入文件时返回文件路径，否则返回输入框中的行（保留空行，行号与输入框一致）
+    def read_set_operation_side(self, side):
+        if self.setop_files[side]:
+            return self.setop_files[side]
+        lines = self.setop_texts[side].get("1.0", END).splitlines()
+        return lines if any(line.strip() for line in lines) else None
+
+    # 触发集合运算
+    def on_click_set_operation_btn(self, *args):
+        method = self.setop_combobox.get()
+        operation = SET_OPERATION_METHODS.get(method)
+        left = self.read_set_operation_side("A")
+        right = self.read_set_operation_side("B")
+        if operation is None:
+            messagebox.showwarning("告警", "请选择运算方式！")
+            return
+        if left is None or right is None:
+            side = "A" if left is None else "B"
+            messagebox.showwarning("告警", f"未填写集合 {side} 的子网！")
+            self.force_weight_to_focus(weight=self.setop_texts[side])
+            return
+
+        def on_done(value):
+            result, rows = value
+            self.setop_rows = rows
+            self.setop_headings = (['A 中的子网', 'B 中的子网'] if operation == "overlap"
+                                   else [f'{method} 的子网', '地址数量'])
+            for column, heading in zip(('first', 'second'), self.setop_headings):
+                self.setop_view.tree.heading(column, text=heading)
+            self.setop_view.set_source(rows)
+            self.status_label.config(text=f"{method}完成：{result.summary()}")
+            invalid = [f"集合 {side} 第 {lineno} 行: {line}"
+                       for side in ("A", "B") for lineno, line in result.invalid_lines[side]]
+            if invalid:
+                more = f"\n…… 共 {len(invalid)} 行" if len(invalid) > 20 else ""
+                messagebox.showwarning("告警", "以下子网不合规，已忽略：\n" + "\n".join(invalid[:20]) + more)
+
+        self.run_task(method, self.set_operation_in_background, operation, left, right,
+                      on_done=on_done)
+
+    # 触发导入集合 A / B 的文件：输入框只显示预览，运算时直接流式读取文件
+    def on_click_import_set_file_btn(self, side):
+        file_path = filedialog.askopenfilename(filetypes=PREFIX_FILETYPES)
+        if not file_path:
+            return
+        try:
+            preview = preview_prefix_file(file_path)
+        except OSError as e:
+            messagebox.showerror("错误", f"无法读取文件 {file_path} ！\n{e}")
+            return
+        self.setop_files[side] = file_path
+        text_weight = self.setop_texts[side]
+        text_weight.config(state='normal')
+        text_weight.delete('1.0', END)
+        self.append_lines_to_text_weight(preview, text_weight)
+        text_weight.config(state='disabled')
+        self.setop_frames[side].config(
+            text=f"子网集合 {side}（文件预览：{os.path.basename(file_path)}，前 {len(preview)} 行）")
+
+    # 触发清除集合运算的输入与结果
+    def on_click_clear_set_operation_btn(self):
+        for side in ("A", "B"):
+            self.setop_files[side] = None
+            self.setop_frames[side].config(text=f"子网集合 {side}")
+            self.setop_texts[side].config(state='normal')
+            self.setop_texts[side].delete('1.0', END)
+        self.setop_rows = []
+        self.setop_view.set_source([])
+
+    # 触发导出集合运算结果
+    def on_click_export_set_operation_btn(self):
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=EXPORT_FILETYPES)
+        if file_path:
+            self.export_in_background(file_path, ('first', 'second'), iter_chunks(self.setop_rows, 8192),
+                                      len(self.setop_rows), header=self.setop_headings)
+        else:
+            messagebox.showwarning("告警", "未选择保存文件路径！")
+
+    # =================== 事件6——空间利用 =================== #
+    # 分析地址空间利用率（在后台线程中运行）；已分配前缀为文本行列表，或导入文件的路径
+    def utilization_in_background(self, task, network, source):
+        if isinstance(source, list):
+            lines = task.track(source, len(source))
+        else:
+            lines = task.track(iter_prefix_file(source))
+        report = self.calculator.analyze_utilization(network, lines)
+        return report, report.report_lines()
+
+    # 触发分析空间利用率
+    def on_click_analyze_utilization_btn(self, *args):
+        network = self.read_non_empty_value_from_entry_weight(self.util_network_entry)
+        if network is None:
+            messagebox.showwarning("告警", "请输入父网络！")
+            self.force_weight_to_focus(weight=self.util_network_entry)
+            return
+        try:
+            network = ip_network(network, strict=False)
+        except (TypeError, ValueError) as e:
+            messagebox.showwarning("告警", f"[ {network} ] 不是一个合规的网络！\n{e}")
+            self.force_weight_to_focus(weight=self.util_network_entry)
+            return
+        if self.util_file:
+            source = self.util_file
+        else:
+            source = self.util_text.get("1.0", END).splitlines()
+
+        def on_done(value):
+            report, lines = value
+            self.util_report = report
+            self.show_info_in_text_weight(info=lines, text_weight=self.util_report_text)
+            self.status_label.config(text=f"分析完成：{report.summary()}")
+            self.util_view = (report.start, report.network.prefixlen)
+            self.draw_utilization_map()
+            if report.invalid_lines:
+                invalid = [f"第 {lineno} 行: {line}" for lineno, line in report.invalid_lines]
+                more = f"\n…… 共 {len(invalid)} 行" if len(invalid) > 20 else ""
+                messagebox.showwarning("告警", "以下子网不合规，已忽略：\n" + "\n".join(invalid[:20]) + more)
+
+        self.run_task("分析空间利用", self.utilization_in_background, network, source, on_done=on_done)
+
+    # 按当前视图重绘热力图：格子数固定，视图越大每个格子聚合的地址越多
+    def draw_utilization_map(self):
+        report = self.util_report
+        if report is None:
+            for cell in self.util_cells:
+                self.util_canvas.itemconfig(cell, fill=UTILIZATION_COLORS[0])
+            self.util_view_label.config(text="")
+            return
+        base, prefixlen = self.util_view
+        cell_size, fractions = report.grid(base, prefixlen)
+        self.util_cell_size = cell_size
+        for i, cell in enumerate(self.util_cells):
+            if i < len(fractions):
+                fraction = fractions[i]
+                color = UTILIZATION_COLORS[0] if fraction == 0 else UTILIZATION_COLORS[max(1, round(fraction * 100))]
+                self.util_canvas.itemconfig(cell, fill=color, state='normal')
+            else:
+                self.util_canvas.itemconfig(cell, state='hidden')
+        view = f"{format_address(report.version, base)}/{prefixlen}"
+        used = report.used_between(base, base + (cell_size * len(fractions)))
+        self.util_view_label.config(
+            text=f"视图 {view}：利用率 {used / (cell_size * len(fractions)):.2%}，每格 {cell_size} 个地址"
+                 f"（左键放大，右键缩小）")
+
+    # 鼠标位置对应的格子序号
+    def utilization_cell_at(self, event):
+        column = event.x // UTILIZATION_CELL_PIXELS
+        row = event.y // UTILIZATION_CELL_PIXELS
+        if not (0 <= column < GRID_COLUMNS and 0 <= row < GRID_COLUMNS):
+            return None
+        index = row * GRID_COLUMNS + column
+        report = self.util_report
+        if report is None or index * self.util_cell_size >= 1 << (report.max_prefixlen - self.util_view[1]):
+            return None
+        return index
+
+    # 左键放大：进入所点击位置所在的 1/16（前缀长度加 4），格子仍按地址顺序逐行排列
+    def on_click_utilization_map(self, event):
+        index = self.utilization_cell_at(event)
+        if index is None:
+            return
+        report = self.util_report
+        base, prefixlen = self.util_view
+        new_prefixlen = min(prefixlen + 4, report.max_prefixlen)
+        block = 1 << (report.max_prefixlen - new_prefixlen)
+        address = base + index * self.util_cell_size
+        self.util_view = (address - (address - base) % block, new_prefixlen)
+        self.draw_utilization_map()
+
+    # 右键缩小：回到上一级视图，不超出父网络
+    def on_right_click_utilization_map(self, event):
+        report = self.util_report
+        if report is None:
+            return
+        base, prefixlen = self.util_view
+        new_prefixlen = max(prefixlen - 4, report.network.prefixlen)
+        block = 1 << (report.max_prefixlen - new_prefixlen)
+        self.util_view = (report.start + (base - report.start) // block * block, new_prefixlen)
+        self.draw_utilization_map()
+
+    # 鼠标悬停时显示格子对应的地址范围与利用率
+    def on_motion_utilization_map(self, event):
+        index = self.utilization_cell_at(event)
+        if index is None:
+            self.util_cell_label.config(text="")
+            return
+        report = self.util_report
+        start = self.util_view[0] + index * self.util_cell_size
+        end = start + self.util_cell_size - 1
+        used = report.used_between(start, end + 1)
+        self.util_cell_label.config(
+            text=f"{format_address(report.version, start)} - {format_address(report.version, end)}："
+                 f"已分配 {used} / {self.util_cell_size}")
+
+    # 触发导入已分配前缀文件：输入框只显示预览，分析时直接流式读取文件
+    def on_click_import_allocated_file_btn(self):
+        file_path = filedialog.askopenfilename(filetypes=PREFIX_FILETYPES)
+        if not file_path:
+            return
+        try:
+            preview = preview_prefix_file(file_path)
+        except OSError as e:
+            messagebox.showerror("错误", f"无法读取文件 {file_path} ！\n{e}")
+            return
+        self.util_file = file_path
+        self.util_text.config(state='normal')
+        self.util_text.delete('1.0', END)
+        self.append_lines_to_text_weight(preview, self.util_text)
+        self.util_text.config(state='disabled')
+        self.util_list_frame.config(
+            text=f"已分配前缀（文件预览：{os.path.basename(file_path)}，前 {len(preview)} 行）")
+
+    # 触发清除空间利用的输入与结果
+    def on_click_clear_utilization_btn(self):
+        self.util_file = None
+        self.util_report = None
+        self.util_list_frame.config(text="已分配前缀")
+        self.util_text.config(state='normal')
+        self.util_text.delete('1.0', END)
+        self.show_info_in_text_weight(info=[], text_weight=self.util_report_text)
+        self.util_cell_label.config(text="")
+        self.draw_utilization_map()
+
+    # 触发导出空闲块
+    def on_click_export_free_blocks_btn(self):
+        if self.util_report is None:
+            messagebox.showwarning("告警", "请先分析空间利用率！")
+            return
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=EXPORT_FILETYPES)
+        if file_path:
+            rows = ((cidr,) for cidr in self.util_report.free_cidrs())
+            self.export_in_background(file_path, ('network',), iter_chunks(rows, 8192),
+                                      len(self.util_report.free_blocks), header=['空闲块'], plain=True)
+        else:
+            messagebox.showwarning("告警", "未选择保存文件路径！")
+
+    # =================== 事件7——调试面板 =================== #
+    # 在调试面板中显示最近一次剖析的各阶段用时、次数、数量与内存峰值
+    def show_profile(self):
+        if self.debug_window is None or self.last_profile is None:
+            return
+        self.show_info_in_text_weight(info=self.last_profile.summary_lines(), text_weight=self.profile_text)
+
+    # 触发打开调试面板（已打开时移到最前）
+    def on_click_debug_btn(self, *args):
+        if self.debug_window is not None:
+            self.debug_window.lift()
+            return
+        self.draw_debug_panel(self.root)
+        self.show_profile()
+
+    def on_close_debug_panel(self):
+        self.debug_window.destroy()
+        self.debug_window = None
+
+    # 触发保存剖析结果：JSON 跟踪，可在 chrome://tracing 或 Perfetto 中查看
+    def on_click_save_profile_btn(self):
+        if self.last_profile is None:
+            messagebox.showwarning("告警", "请先启用剖析并运行一次任务！")
+            return
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("JSON Files", "*.json")])
+        if not file_path:
+            messagebox.showwarning("告警", "未选择保存文件路径！")
+            return
+        try:
+            self.last_profile.write_json(file_path)
+        except OSError as e:
+            messagebox.showerror("错误", f"保存失败！\n{e}")
+
+
+class Page(Event):
+    def __init__(self, root, calculator=None):
+        super().__init__(calculator)
+        # 初始化主窗口属性
+        self.root = root
+        self.root.title("Simple CIDR Tool")
+        window_width = 800
+        window_height = 800
+        self.font_style = ('Microsoft YaHei UI', 10)
+        # 获取当前显示器尺寸信息
+        screen_width = self.root.winfo_screenwidth()
+        screen_height = self.root.winfo_screenheight()
+        # 设置程序主窗口弹出位置（水平居中）
+        x = (screen_width / 2) - (window_width / 2)
+        y = (screen_height / 2) - (window_height / 2)
+        self.root.geometry(f'{window_width}x{window_height}+{int(x)}+{int(y)}')
+        # 绘制窗口
+        self.draw_main_window_layout(self.root)
+
+    # 绘制主窗口框架布局
+    def draw_main_window_layout(self, root):
+        # 底部状态栏（先放置，避免被选项卡挤出窗口）
+        self.draw_status_bar(root)
+        # 创建选项卡
+        self.notebook = ttk.Notebook(root)
+        self.notebook.pack(expand=True, fill='both', padx=5, pady=5)
+        # 创建Frame
+        self.info_frame = ttk.Frame(self.notebook)
+        self.division_frame = ttk.Frame(self.notebook)
+        self.aggregation_frame = ttk.Frame(self.notebook)
+        self.lookup_frame = ttk.Frame(self.notebook)
+        self.setop_frame = ttk.Frame(self.notebook)
+        self.utilization_frame = ttk.Frame(self.notebook)
+        # 将Frame添加至选项卡
+        self.notebook.add(self.info_frame, text='子网信息')
+        self.notebook.add(self.division_frame, text='子网划分')
+        self.notebook.add(self.aggregation_frame, text='子网汇总')
+        self.notebook.add(self.lookup_frame, text='地址查询')
+        self.notebook.add(self.setop_frame, text='集合运算')
+        self.notebook.add(self.utilization_frame, text='空间利用')
+        # 分别在各选项卡下初始化页面
+        self.draw_subnet_info_page(self.info_frame)
+        self.draw_subnet_division_page(self.division_frame)
+        self.draw_subnet_aggregation_page(self.aggregation_frame)
+        self.draw_address_lookup_page(self.lookup_frame)
+        self.draw_set_operation_page(self.setop_frame)
+        self.draw_utilization_page(self.utilization_frame)
+
+    # 绘制底部状态栏：状态文字、进度条与取消按钮
+    def draw_status_bar(self, root):
+        status_frame = ttk.Frame(root)
+        status_frame.pack(side='bottom', fill='x', padx=10, pady=5)
+        self.status_label = ttk.Label(
+            status_frame, text="就绪", font=self.font_style)
+        self.status_label.pack(side=LEFT)
+        self.cancel_btn = ttk.Button(
+            status_frame, text="取消", command=self.on_click_cancel_btn, state='disabled')
+        self.cancel_btn.pack(side='right', padx=5)
+        ttk.Button(status_frame, text="调试", command=self.on_click_debug_btn).pack(side='right', padx=5)
+        self.progress_bar = ttk.Progressbar(
+            status_frame, mode='determinate', length=200, maximum=100)
+        self.progress_bar.pack(side='right')
+        self.cache_label = ttk.Label(
+            status_frame, text=self.calculator.cache_summary(), font=self.font_style)
+        self.cache_label.pack(side='right', padx=10)
+        self.current_task = None
+        # 各页面正在使用的内存映射前缀集（划分结果表格、汇总结果、查找表），替换时关闭原来的
+        self.prefix_sets = {}
+        # 剖析开关在调试面板中设置，关闭面板后仍然生效
+        self.profile_enabled = BooleanVar(value=False)
+        self.profile_memory = BooleanVar(value=False)
+        self.last_profile = None
+        self.debug_window = None
+
+    # =================== 页面1——子网信息 =================== #
+    # 绘制子网信息页面
+    def draw_subnet_info_page(self, tab_frame):
+        # 第一行：基本信息 LabelFrame
+        basic_info_frame = self.create_LabelFrame_with_pack(
+            frame=tab_frame, text="基本信息")
+
+        ttk.Label(basic_info_frame, text="网络地址:", font=self.font_style).grid(
+            row=0, column=0, padx=5, sticky='e')
+        self.address_entry = self.create_Entry_with_grid(
+            frame=basic_info_frame, event=self.on_click_get_info_btn, row=0, column=1)
+        self.address_entry.focus_force()
+
+        ttk.Label(basic_info_frame, text="子网掩码:", font=self.font_style).grid(
+            row=0, column=2, padx=5, sticky='e')
+        self.mask_entry = self.create_Entry_with_grid(
+            frame=basic_info_frame, event=self.on_click_get_info_btn, row=0, column=3)
+
+        self.get_info_btn = ttk.Button(
+            basic_info_frame, text="获取信息", command=self.on_click_get_info_btn).grid(row=0, column=4, padx=5)
+
+        # 第二行：详细信息 LabelFrame
+        detail_info_frame = self.create_LabelFrame_with_pack(
+            frame=tab_frame, text="详细信息", expand=True)
+        self.detail_info = Text(detail_info_frame, height=18, state='disabled',
+                                font=self.font_style, spacing1=4, spacing3=4, relief="flat", padx=10, pady=5)
+        self.detail_info.pack(expand=True, fill='both')
+
+    # =================== 页面2——子网划分 =================== #
+    # 绘制子网划分页面
+    def draw_subnet_division_page(self, tab_frame):
+        # 第1行：待规划网络信息 LabelFrame
+        info_frame = self.create_LabelFrame_with_pack(
+            frame=tab_frame, text="待规划网络信息")
+
+        ttk.Label(info_frame, text="网络地址:", font=self.font_style).grid(
+            row=0, column=0, padx=5, sticky='e')
+        self.prepare_address_entry = self.create_Entry_with_grid(
+            frame=info_frame, event=self.on_click_division_btn, row=0, column=1)
+        self.prepare_address_entry.focus_force()
+
+        mask_label = ttk.Label(info_frame, text="子网掩码:", font=self.font_style).grid(
+            row=0, column=2, padx=5, sticky='e')
+        self.current_mask_entry = self.create_Entry_with_grid(
+            frame=info_frame, event=self.on_click_division_btn, row=0, column=3)
+
+        # 第2行：子网规划方式 LabelFrame
+        method_frame = self.create_LabelFrame_with_pack(
+            frame=tab_frame, text="子网规划方式")
+
+        self.method_combobox_var = StringVar()
+        ttk.Label(method_frame, text="规划方式:", font=self.font_style).grid(
+            row=0, column=0, padx=5, sticky='e')
+        self.method_combobox = ttk.Combobox(method_frame, textvariable=self.method_combobox_var, values=[
+                                            "1. 指定新子网的子网掩码", "2. 指定新子网的子网数量", "3. 指定新子网的地址数量",
+                                            "4. 按需求分配子网(VLSM)"])
+        self.method_combobox.grid(row=0, column=1, padx=5, pady=5)
+        self.method_combobox.current(0)
+        self.method_combobox_var.trace('w', self.on_change_division_method)
+
+        self.method_label = ttk.Label(
+            method_frame, text="子网掩码:", font=self.font_style)
+        self.method_label.grid(row=0, column=2, padx=5, sticky='e')
+        self.new_subnets_entry = self.create_Entry_with_grid(
+            frame=method_frame, event=self.on_click_division_btn, width=5, row=0, column=3)
+
+        ttk.Button(method_frame, text="划分子网", command=self.on_click_division_btn).grid(
+            row=0, column=4, padx=5)
+        ttk.Button(method_frame, text="导出信息", command=self.on_click_export_btn).grid(
+            row=0, column=5, padx=5)
+        ttk.Button(method_frame, text="打开前缀集", command=self.on_click_open_prefix_set_btn).grid(
+            row=0, column=6, padx=5)
+
+        # 第3行：详细信息 LabelFrame，顶部为筛选栏
+        subnets_info_frame = self.create_LabelFrame_with_pack(
+            frame=tab_frame, text="规划完成的子网信息", expand=True)
+        filter_frame = ttk.Frame(subnets_info_frame)
+        filter_frame.pack(side='top', fill='x', pady=(0, 5))
+        ttk.Label(filter_frame, text="筛选:", font=self.font_style).pack(side=LEFT, padx=5)
+        self.division_filter_var = StringVar()
+        self.division_filter_var.trace('w', self.on_change_division_filter)
+        ttk.Entry(filter_frame, textvariable=self.division_filter_var, width=24).pack(side=LEFT, padx=5)
+        self.division_filter_mode = ttk.Combobox(
+            filter_frame, values=list(DIVISION_FILTER_MODES), width=6, state='readonly')
+        self.division_filter_mode.current(0)
+        self.division_filter_mode.bind('<<ComboboxSelected>>', self.on_change_division_filter)
+        self.division_filter_mode.pack(side=LEFT, padx=5)
+        self.division_view_label = ttk.Label(filter_frame, text="", font=self.font_style)
+        self.division_view_label.pack(side=LEFT, padx=10)
+        self.division_filter_job = None
+        self.division_sort = None
+        self.division_index = None
+        # show="headings" 隐藏Treeview的`#0`列
+        self.subnet_view = VirtualTreeview(subnets_info_frame, columns=tuple(DIVISION_HEADINGS), height=18,
+            row_builder=self.calculator.get_multiple_subnet_info)
+        self.subnet_info_tree = self.subnet_view.tree
+        # 点击列标题排序
+        for column, text in DIVISION_HEADINGS.items():
+            self.subnet_info_tree.heading(
+                column, text=text, command=lambda column=column: self.on_click_division_heading(column))
+        self.subnet_info_tree.column('network', width=150, anchor=CENTER)
+        self.subnet_info_tree.column('netmask', width=150, anchor=CENTER)
+        self.subnet_info_tree.column('first', width=100, anchor=CENTER)
+        self.subnet_info_tree.column('last', width=100, anchor=CENTER)
+        self.subnet_info_tree.column('broadcast', width=100, anchor=CENTER)
+        self.subnet_info_tree.column('name', width=100, anchor=CENTER)
+        self.subnet_info_tree.configure(displaycolumns=division_columns(None))
+
+    # =================== 页面3——子网汇总 =================== #
+    # 绘制子网汇总页面
+    def draw_subnet_aggregation_page(self, tab_frame):
+        # 外层上下两个 Frame
+        outer_frame = self.create_Frame_with_pack(frame=tab_frame)
+        outer_frame.rowconfigure(0, weight=9)
+        outer_frame.rowconfigure(1, weight=1)
+        outer_frame.columnconfigure(0, weight=1)
+
+        upper_frame = self.create_Frame_with_grid(
+            frame=outer_frame, row=0, column=0)
+        lower_frame = self.create_Frame_with_grid(
+            frame=outer_frame, row=1, column=0)
+
+        # 上面的 Frame 分为左右两列
+        upper_frame.columnconfigure(0, weight=1)
+        upper_frame.columnconfigure(1, weight=1)
+        upper_frame.rowconfigure(0, weight=1)
+
+        upper_left_frame = self.create_Frame_with_grid(
+            frame=upper_frame, row=0, column=0)
+
+        # 上面左列的 Frame 内容
+        # 等待汇总子网列表
+        self.pending_list_frame = self.create_LabelFrame_with_grid(
+            frame=upper_left_frame, text="等待汇总子网列表", row=0, column=0, sticky="nsew", row_weight=1, column_weight=1)
+        upper_left_frame.rowconfigure(0, weight=1)
+        upper_left_frame.columnconfigure(0, weight=1)
+        self.pending_text = self.create_Text_with_pack(
+            frame=self.pending_list_frame, state='normal')
+        self.imported_file = None
+        self.aggregated_subnets = AggregationResult()
+        self.invalid_subnets = []
+
+        # 上面右列的 Frame 内容
+        # 汇总完成和汇总失败的 LabelFrame
+        upper_right_frame = self.create_Frame_with_grid(
+            frame=upper_frame, row=0, column=1)
+        upper_right_frame.rowconfigure(0, weight=3)
+        upper_right_frame.rowconfigure(1, weight=7)
+        upper_right_frame.columnconfigure(0, weight=1)
+
+        self.success_frame = self.create_LabelFrame_with_grid(
+            frame=upper_right_frame, text="汇总完成", row=0, column=0)
+        self.success_text = self.create_Text_with_pack(
+            frame=self.success_frame, state='disabled')
+
+        failed_frame = self.create_LabelFrame_with_grid(
+            frame=upper_right_frame, text="汇总失败", row=1, column=0)
+        self.failed_text = self.create_Text_with_pack(
+            frame=failed_frame, state='disabled')
+
+        # 下面的 Frame 内容
+        button_frame = ttk.Frame(lower_frame)
+        button_frame.pack(anchor=CENTER)
+
+        # 汇总方式与有界压缩的上限（前缀数量或多覆盖百分比，按协议版本分别限制）
+        aggregate_mode_label = ttk.Label(button_frame, text="汇总方式:")
+        aggregate_mode_label.pack(side=LEFT, padx=5, pady=10)
+
+        self.aggregate_mode_combobox = ttk.Combobox(
+            button_frame, values=list(AGGREGATION_MODES), state='readonly', width=16)
+        self.aggregate_mode_combobox.current(0)
+        self.aggregate_mode_combobox.pack(side=LEFT, padx=5, pady=10)
+
+        compress_limit_label = ttk.Label(button_frame, text="压缩上限:")
+        compress_limit_label.pack(side=LEFT, padx=5, pady=10)
+
+        self.compress_limit_entry = ttk.Entry(button_frame, width=8)
+        self.compress_limit_entry.pack(
+            side=LEFT, padx=5, pady=10, expand=True, fill='both')
+        self.compress_limit_entry.bind(
+            '<Return>', self.on_click_aggregate_subnet_btn)
+
+        # 期望汇总后的子网掩码（IPv4 与 IPv6 分别指定，IPv6 留空时与 IPv4 相同）
+        expect_mask_label = ttk.Label(button_frame, text="期望汇总后的子网掩码 IPv4:")
+        expect_mask_label.pack(side=LEFT, padx=5, pady=10)
+
+        self.expect_mask_entry = ttk.Entry(button_frame, width=5)
+        self.expect_mask_entry.pack(
+            side=LEFT, padx=5, pady=10, expand=True, fill='both')
+        self.expect_mask_entry.bind(
+            '<Return>', self.on_click_aggregate_subnet_btn)
+
+        expect_mask6_label = ttk.Label(button_frame, text="IPv6:")
+        expect_mask6_label.pack(side=LEFT, padx=5, pady=10)
+
+        self.expect_mask6_entry = ttk.Entry(button_frame, width=5)
+        self.expect_mask6_entry.pack(
+            side=LEFT, padx=5, pady=10, expand=True, fill='both')
+        self.expect_mask6_entry.bind(
+            '<Return>', self.on_click_aggregate_subnet_btn)
+
+        # 导入文件按钮
+        self.create_Button_with_pack(
+            frame=button_frame, text="导入文件", command=self.on_click_import_file_btn)
+        # 汇总子网按钮
+        aggregate_button = self.create_Button_with_pack(
+            frame=button_frame, text="汇总子网", command=self.on_click_aggregate_subnet_btn)
+        # 清除信息按钮
+        clear_button = self.create_Button_with_pack(
+            frame=button_frame, text="清除信息", command=self.on_click_clear_info_btn)
+        # 导出结果按钮
+        export_button = self.create_Button_with_pack(
+            frame=button_frame, text="导出结果", command=self.on_click_export_result_btn)
+
+    # =================== 页面4——地址查询 =================== #
+    # 绘制地址查询页面
+    def draw_address_lookup_page(self, tab_frame):
+        self.prefix_table = None
+        self.lookup_rows = []
+
+        # 第1行：前缀表 LabelFrame
+        table_frame = self.create_LabelFrame_with_pack(
+            frame=tab_frame, text="前缀表")
+        ttk.Button(table_frame, text="导入前缀文件", command=self.on_click_load_table_file_btn).grid(
+            row=0, column=0, padx=5)
+        ttk.Button(table_frame, text="使用划分结果", command=self.on_click_use_division_result_btn).grid(
+            row=0, column=1, padx=5)
+        ttk.Button(table_frame, text="使用汇总结果", command=self.on_click_use_aggregation_result_btn).grid(
+            row=0, column=2, padx=5)
+        self.prefix_table_label = ttk.Label(
+            table_frame, text="未加载", font=self.font_style)
+        self.prefix_table_label.grid(row=0, column=3, padx=5, sticky='w')
+
+        # 第2行：待查询地址 LabelFrame
+        address_frame = self.create_LabelFrame_with_pack(
+            frame=tab_frame, text="待查询地址（每行一个）")
+        self.lookup_text = Text(address_frame, height=6, relief="flat", padx=10, pady=5)
+        self.lookup_text.pack(expand=True, fill='both')
+        button_frame = ttk.Frame(address_frame)
+        button_frame.pack(anchor=CENTER)
+        self.create_Button_with_pack(
+            frame=button_frame, text="查询", command=self.on_click_lookup_btn)
+        self.create_Button_with_pack(
+            frame=button_frame, text="批量查询文件", command=self.on_click_lookup_file_btn)
+        self.create_Button_with_pack(
+            frame=button_frame, text="导出结果", command=self.on_click_export_lookup_btn)
+
+        # 第3行：查询结果 LabelFrame
+        result_frame = self.create_LabelFrame_with_pack(
+            frame=tab_frame, text="查询结果", expand=True)
+        self.lookup_view = VirtualTreeview(result_frame, columns=(
+            'address', 'network'), height=12, row_builder=list)
+        self.lookup_view.tree.heading('address', text='地址')
+        self.lookup_view.tree.heading('network', text='所属子网（最长匹配）')
+        self.lookup_view.tree.column('address', width=250, anchor=CENTER)
+        self.lookup_view.tree.column('network', width=250, anchor=CENTER)
+
+    # =================== 页面5——集合运算 =================== #
+    # 绘制集合运算页面
+    def draw_set_operation_page(self, tab_frame):
+        self.setop_files = {"A": None, "B": None}
+        self.setop_rows = []
+        self.setop_headings = ['子网', '地址数量']
+
+        # 第1行：左右两个子网集合
+        sets_frame = ttk.Frame(tab_frame)
+        sets_frame.pack(fill='both', padx=10, pady=5)
+        sets_frame.columnconfigure(0, weight=1)
+        sets_frame.columnconfigure(1, weight=1)
+        self.setop_frames = {}
+        self.setop_texts = {}
+        for column, side in enumerate(("A", "B")):
+            self.setop_frames[side] = self.create_LabelFrame_with_grid(
+                frame=sets_frame, text=f"子网集合 {side}", row=0, column=column)
+            self.setop_texts[side] = Text(self.setop_frames[side], height=10, relief="flat", padx=10, pady=5)
+            self.setop_texts[side].pack(expand=True, fill='both')
+
+        # 第2行：运算方式与按钮
+        button_frame = ttk.Frame(tab_frame)
+        button_frame.pack(anchor=CENTER)
+        ttk.Label(button_frame, text="运算方式:", font=self.font_style).pack(side=LEFT, padx=5)
+        self.setop_combobox = ttk.Combobox(
+            button_frame, values=list(SET_OPERATION_METHODS), state='readonly', width=12)
+        self.setop_combobox.pack(side=LEFT, padx=5)
+        self.setop_combobox.current(0)
+        ttk.Button(button_frame, text="导入 A", command=lambda: self.on_click_import_set_file_btn("A")).pack(
+            side=LEFT, padx=5, pady=10)
+        ttk.Button(button_frame, text="导入 B", command=lambda: self.on_click_import_set_file_btn("B")).pack(
+            side=LEFT, padx=5, pady=10)
+        ttk.Button(button_frame, text="计算", command=self.on_click_set_operation_btn).pack(
+            side=LEFT, padx=5, pady=10)
+        ttk.Button(button_frame, text="清除信息", command=self.on_click_clear_set_operation_btn).pack(
+            side=LEFT, padx=5, pady=10)
+        ttk.Button(button_frame, text="导出结果", command=self.on_click_export_set_operation_btn).pack(
+            side=LEFT, padx=5, pady=10)
+
+        # 第3行：运算结果
+        result_frame = self.create_LabelFrame_with_pack(
+            frame=tab_frame, text="运算结果", expand=True)
+        self.setop_view = VirtualTreeview(result_frame, columns=(
+            'first', 'second'), height=12, row_builder=list)
+        for column, heading in zip(('first', 'second'), self.setop_headings):
+            self.setop_view.tree.heading(column, text=heading)
+            self.setop_view.tree.column(column, width=250, anchor=CENTER)
+
+    # =================== 页面6——空间利用 =================== #
+    # 绘制空间利用页面
+    def draw_utilization_page(self, tab_frame):
+        self.util_file = None
+        self.util_report = None
+        self.util_view = None
+        self.util_cell_size = 1
+
+        # 第1行：父网络与按钮
+        button_frame = ttk.Frame(tab_frame)
+        button_frame.pack(anchor=CENTER)
+        ttk.Label(button_frame, text="父网络:", font=self.font_style).pack(side=LEFT, padx=5)
+        self.util_network_entry = ttk.Entry(button_frame, width=24)
+        self.util_network_entry.pack(side=LEFT, padx=5, pady=10)
+        self.util_network_entry.bind('<Return>', self.on_click_analyze_utilization_btn)
+        ttk.Button(button_frame, text="导入文件", command=self.on_click_import_allocated_file_btn).pack(
+            side=LEFT, padx=5, pady=10)
+        ttk.Button(button_frame, text="分析", command=self.on_click_analyze_utilization_btn).pack(
+            side=LEFT, padx=5, pady=10)
+        ttk.Button(button_frame, text="清除信息", command=self.on_click_clear_utilization_btn).pack(
+            side=LEFT, padx=5, pady=10)
+        ttk.Button(button_frame, text="导出空闲块", command=self.on_click_export_free_blocks_btn).pack(
+            side=LEFT, padx=5, pady=10)
+
+        # 第2行：已分配前缀与利用率报告
+        upper_frame = ttk.Frame(tab_frame)
+        upper_frame.pack(fill='both', padx=10, pady=5)
+        upper_frame.columnconfigure(0, weight=1)
+        upper_frame.columnconfigure(1, weight=1)
+        self.util_list_frame = self.create_LabelFrame_with_grid(
+            frame=upper_frame, text="已分配前缀", row=0, column=0)
+        self.util_text = Text(self.util_list_frame, height=8, relief="flat", padx=10, pady=5)
+        self.util_text.pack(expand=True, fill='both')
+        report_frame = self.create_LabelFrame_with_grid(
+            frame=upper_frame, text="利用率报告", row=0, column=1)
+        self.util_report_text = Text(report_frame, height=8, relief="flat", padx=10, pady=5, state='disabled')
+        self.util_report_text.pack(expand=True, fill='both')
+
+        # 第3行：热力图，格子按地址顺序逐行排列，颜色表示该格子内已分配地址的比例
+        map_frame = self.create_LabelFrame_with_pack(
+            frame=tab_frame, text="地址空间热力图", expand=True)
+        size = GRID_COLUMNS * UTILIZATION_CELL_PIXELS
+        self.util_canvas = Canvas(map_frame, width=size, height=size, highlightthickness=0)
+        self.util_canvas.pack(side=LEFT, padx=10)
+        self.util_cells = [
+            self.util_canvas.create_rectangle(
+                column * UTILIZATION_CELL_PIXELS, row * UTILIZATION_CELL_PIXELS,
+                (column + 1) * UTILIZATION_CELL_PIXELS, (row + 1) * UTILIZATION_CELL_PIXELS,
+                fill=UTILIZATION_COLORS[0], width=0)
+            for row in range(GRID_COLUMNS) for column in range(GRID_COLUMNS)]
+        self.util_canvas.bind('<Button-1>', self.on_click_utilization_map)
+        self.util_canvas.bind('<Button-3>', self.on_right_click_utilization_map)
+        self.util_canvas.bind('<Button-2>', self.on_right_click_utilization_map)
+        self.util_canvas.bind('<Motion>', self.on_motion_utilization_map)
+        info_frame = ttk.Frame(map_frame)
+        info_frame.pack(side=LEFT, fill='both', expand=True, padx=10)
+        self.util_view_label = ttk.Label(info_frame, text="", font=self.font_style, wraplength=300)
+        self.util_view_label.pack(anchor='w', pady=5)
+        self.util_cell_label = ttk.Label(info_frame, text="", font=self.font_style, wraplength=300)
+        self.util_cell_label.pack(anchor='w', pady=5)
+
+    # =================== 页面7——调试面板 =================== #
+    # 绘制调试面板（独立窗口）：剖析开关与最近一次任务的阶段统计
+    def draw_debug_panel(self, root):
+        self.debug_window = Toplevel(root)
+        self.debug_window.title("调试面板")
+        self.debug_window.geometry("560x360")
+        self.debug_window.protocol("WM_DELETE_WINDOW", self.on_close_debug_panel)
+        option_frame = ttk.Frame(self.debug_window)
+        option_frame.pack(anchor=CENTER)
+        ttk.Checkbutton(option_frame, text="启用剖析", variable=self.profile_enabled).pack(
+            side=LEFT, padx=5, pady=10)
+        ttk.Checkbutton(option_frame, text="记录内存峰值（计算会变慢）", variable=self.profile_memory).pack(
+            side=LEFT, padx=5, pady=10)
+        ttk.Button(option_frame, text="保存 JSON 跟踪", command=self.on_click_save_profile_btn).pack(
+            side=LEFT, padx=5, pady=10)
+        profile_frame = self.create_LabelFrame_with_pack(
+            frame=self.debug_window, text="最近一次任务的阶段统计", expand=True)
+        self.profile_text = Text(profile_frame, height=12, relief="flat", padx=10, pady=5, state='disabled')
+        self.profile_text.pack(expand=True, fill='both')
+
+    def create_Frame_with_pack(self, frame, expand=True, fill='both', padx=10, pady=10):
+        new_frame_weight = ttk.Frame(frame)
+        new_frame_weight.pack(expand=expand, fill=fill, padx=padx, pady=pady)
+        return new_frame_weight
+
+    def create_Frame_with_grid(self, frame, row=0, column=0, sticky="nsew"):
+        new_frame_weight = ttk.Frame(frame)
+        new_frame_weight.grid(row=row, column=column, sticky=sticky)
+        return new_frame_weight
+
+    def create_Entry_with_grid(self, frame, event, row, column, width=20, padx=5):
+        new_entry_weight = ttk.Entry(frame, width=width, font=self.font_style)
+        new_entry_weight.grid(row=row, column=column, padx=padx)
+        new_entry_weight.bind('<Return>', event)
+        return new_entry_weight
+
+    def create_Text_with_pack(self, frame, state='normal', relief="flat", padx=10, pady=5, expand=True, fill='both'):
+        new_text_weight = Text(
+            frame, state=state, relief=relief, padx=padx, pady=pady)
+        new_text_weight.pack(expand=expand, fill=fill)
+        return new_text_weight
+
+    def create_LabelFrame_with_pack(self, frame, text, padding=10, borderwidth=2, relief="flat", padx=10, pady=10, fill='both', expand=False):
+        new_labelframe_weight = ttk.LabelFrame(
+            frame, text=text, padding=padding, borderwidth=borderwidth, relief=relief)
+        new_labelframe_weight.pack(
+            padx=padx, pady=pady, fill=fill, expand=expand)
+        return new_labelframe_weight
+
+    def create_LabelFrame_with_grid(self, frame, text, padding=10, borderwidth=2, relief="flat", row=0, column=0, sticky="nsew", row_weight=1, column_weight=1):
+        new_labelframe_weight = ttk.LabelFrame(
+            frame, text=text, padding=padding, borderwidth=borderwidth, relief=relief)
+        new_labelframe_weight.grid(row=row, column=column, sticky=sticky)
+        new_labelframe_weight.rowconfigure(0, weight=row_weight)
+        new_labelframe_weight.columnconfigure(0, weight=column_weight)
+        return new_labelframe_weight
+
+    def create_Button_with_pack(self, frame, text, command, side=LEFT, padx=20, pady=10):
+        return ttk.Button(frame, text=text, command=command).pack(side=LEFT, padx=20, pady=10)
+
+
+# 仅在启动界面时设置 Tcl/Tk 库目录，不覆盖已有的环境变量
+def configure_tcl_tk_libraries():
+    for name, path in TCL_TK_LIBRARIES.items():
+        if name not in os.environ and os.path.isdir(path):
+            os.environ[name] = path
+
+
+def main():
+    configure_tcl_tk_libraries()
+    root = Tk()
+    Page(root)
+    root.mainloop()
+
+
+if __name__ == '__main__':
+    main()
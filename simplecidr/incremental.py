@@ -0,0 +1,255 @@
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from itertools import chain, repeat
+
+from .aggregation import MAX_PREFIXLEN, NETWORK_CLASS, AggregationResult, range_to_cidrs, target_prefixlen
+from .parser import parse_lines
+from .profiling import stage
+
+# 一次变化的前缀超过现有前缀的该比例时，直接重建整个协议版本，比逐个插入删除更快
+REBUILD_RATIO = 0.125
+
+
+# 将有序的整数键 (网络地址 << 8 | 前缀长度) 合并为有序不相交、不相邻的区间
+def merge_keys(keys, max_prefixlen):
+    starts = []
+    ends = []
+    current_start = current_end = -2
+    for key in keys:
+        start = key >> 8
+        end = start + (1 << (max_prefixlen - (key & 0xFF))) - 1
+        if start <= current_end + 1:
+            if end > current_end:
+                current_end = end
+            continue
+        if current_start >= 0:
+            starts.append(current_start)
+            ends.append(current_end)
+        current_start, current_end = start, end
+    if current_start >= 0:
+        starts.append(current_start)
+        ends.append(current_end)
+    return starts, ends
+
+
+def intervals_to_cidrs(starts, ends, max_prefixlen):
+    cidrs = []
+    for start, end in zip(starts, ends):
+        cidrs.extend(range_to_cidrs(start, end, max_prefixlen))
+    return cidrs
+
+
+# 比较两次输入的行计数，返回 (新增的行计数, 删除的行计数)；比 Counter 相减快得多
+def diff_counts(old, new):
+    old_get = old.get
+    new_get = new.get
+    added = {line: count - old_get(line, 0) for line, count in new.items() if old_get(line, 0) < count}
+    removed = {line: count - new_get(line, 0) for line, count in old.items() if new_get(line, 0) < count}
+    return added, removed
+
+
+# 单个协议版本的汇总状态：前缀（已按目标长度取超网）的计数、有序的不重复前缀与合并后的区间
+class FamilyState:
+    def __init__(self, max_prefixlen, new_prefixlen=None):
+        self.max_prefixlen = max_prefixlen
+        self.new_prefixlen = new_prefixlen
+        self.counts = Counter()
+        self.keys = []
+        self.starts = []
+        self.ends = []
+        # 汇总结果中的 CIDR 数量
+        self.cidr_count = 0
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+    def to_key(self, base, prefixlen):
+        new_prefixlen = self.new_prefixlen
+        if new_prefixlen is not None and prefixlen > new_prefixlen:
+            base &= ((1 << new_prefixlen) - 1) << (self.max_prefixlen - new_prefixlen)
+            prefixlen = new_prefixlen
+        return base << 8 | prefixlen
+
+    def cidrs(self):
+        return intervals_to_cidrs(self.starts, self.ends, self.max_prefixlen)
+
+    # 加入与移除前缀 (网络地址, 前缀长度)，返回汇总结果中移除与新增的 CIDR
+    def apply(self, added, removed):
+        delta = Counter(self.to_key(base, prefixlen) for base, prefixlen in added)
+        delta.subtract(self.to_key(base, prefixlen) for base, prefixlen in removed)
+        counts = self.counts
+        changed = []
+        for key, change in delta.items():
+            if not change:
+                continue
+            before = counts[key]
+            after = before + change
+            if after > 0:
+                counts[key] = after
+            else:
+                del counts[key]
+            if (before > 0) != (after > 0):
+                changed.append(key)
+        if not changed:
+            return [], []
+        if len(changed) > REBUILD_RATIO * len(self.keys):
+            return self.rebuild()
+        keys = self.keys
+        for key in changed:
+            if key in counts:
+                insort(keys, key)
+            else:
+                del keys[bisect_left(keys, key)]
+        removed_cidrs = []
+        added_cidrs = []
+        # 从后往前替换受影响的区间，前面区间的下标不受影响
+        for start, end, lo, hi in reversed(self.affected_regions(sorted(changed))):
+            old = intervals_to_cidrs(self.starts[lo:hi], self.ends[lo:hi], self.max_prefixlen)
+            region_keys = keys[bisect_left(keys, start << 8):bisect_right(keys, end << 8 | 0xFF)]
+            starts, ends = merge_keys(region_keys, self.max_prefixlen)
+            self.starts[lo:hi] = starts
+            self.ends[lo:hi] = ends
+            new = intervals_to_cidrs(starts, ends, self.max_prefixlen)
+            old_set = set(old)
+            new_set = set(new)
+            removed_cidrs.extend(cidr for cidr in old if cidr not in new_set)
+            added_cidrs.extend(cidr for cidr in new if cidr not in old_set)
+        removed_cidrs.sort()
+        added_cidrs.sort()
+        self.cidr_count += len(added_cidrs) - len(removed_cidrs)
+        return removed_cidrs, added_cidrs
+
+    # 受影响的区域：变化的前缀，连同与之重叠或相邻的原有区间；
+    # 返回 [(起始, 结束, 原区间下标起点, 原区间下标终点), ...]，区域之间互不重叠、不相邻
+    def affected_regions(self, changed_keys):
+        starts = self.starts
+        ends = self.ends
+        regions = []
+        for key in changed_keys:
+            start = key >> 8
+            end = start + (1 << (self.max_prefixlen - (key & 0xFF))) - 1
+            hi = bisect_right(starts, end + 1)
+            lo = hi
+            while lo > 0 and ends[lo - 1] >= start - 1:
+                lo -= 1
+            if lo < hi:
+                start = min(start, starts[lo])
+                end = max(end, ends[hi - 1])
+            if regions and start <= regions[-1][1] + 1:
+                last_start, last_end, last_lo, last_hi = regions[-1]
+                regions[-1] = (min(last_start, start), max(last_end, end), min(last_lo, lo), max(last_hi, hi))
+            else:
+                regions.append((start, end, lo, hi))
+        return regions
+
+    # 重建全部区间，返回与原结果相比移除与新增的 CIDR
+    def rebuild(self):
+        old = self.cidrs()
+        self.keys = sorted(self.counts)
+        self.starts, self.ends = merge_keys(self.keys, self.max_prefixlen)
+        new = self.cidrs()
+        self.cidr_count = len(new)
+        if not old:
+            return [], new
+        old_set = set(old)
+        new_set = set(new)
+        return [cidr for cidr in old if cidr not in new_set], [cidr for cidr in new if cidr not in old_set]
+
+
+# 一次更新带来的变化：输入新增/删除的行数，汇总结果中移除与新增的前缀
+class AggregationDiff:
+    def __init__(self):
+        self.lines_added = 0
+        self.lines_removed = 0
+        self.removed = {4: [], 6: []}
+        self.added = {4: [], 6: []}
+        self.total = 0
+        self.full = False
+        self.seconds = 0.0
+
+    def __bool__(self):
+        return any(self.removed.values()) or any(self.added.values())
+
+    def networks(self, kind):
+        prefixes = self.added if kind == "added" else self.removed
+        return [NETWORK_CLASS[version]((base, prefixlen))
+                for version in (4, 6) for base, prefixlen in prefixes[version]]
+
+    def summary(self):
+        removed = len(self.removed[4]) + len(self.removed[6])
+        added = len(self.added[4]) + len(self.added[6])
+        mode = "全量" if self.full else "增量"
+        return f"输入新增 {self.lines_added} 行、删除 {self.lines_removed} 行；" \
+               f"汇总结果新增 {added} 个、移除 {removed} 个，共 {self.total} 个（{mode}，用时 {self.seconds:.3f} 秒）"
+
+
+# 增量汇总：记住上一次的输入行与汇总状态，再次汇总时只解析变化的行、只重新合并受影响的区间；
+# 目标前缀长度改变时全量重建
+class IncrementalAggregator:
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.new_prefixlen = None
+        self.lines = Counter()
+        self.invalid = Counter()
+        self.invalid_lines = []
+        self.families = {}
+
+    # 目标前缀长度与上一次不同（或尚未汇总过）时需要全量重建
+    def needs_rebuild(self, new_prefixlen):
+        return {version: target_prefixlen(new_prefixlen, version) for version in (4, 6)} != self.new_prefixlen
+
+    def update(self, lines, new_prefixlen):
+        started = time.perf_counter()
+        for version in (4, 6):
+            family_prefixlen = target_prefixlen(new_prefixlen, version)
+            if family_prefixlen is not None and family_prefixlen < 0:
+                raise ValueError(f"期望汇总后的子网掩码不能为负数：{family_prefixlen}")
+        # 先读完输入再修改状态，读取途中取消时状态保持不变
+        lines = list(lines)
+        counts = Counter(lines)
+        diff = AggregationDiff()
+        if self.needs_rebuild(new_prefixlen):
+            prefixlens = {version: target_prefixlen(new_prefixlen, version) for version in (4, 6)}
+            self.clear()
+            self.new_prefixlen = prefixlens
+            self.families = {version: FamilyState(MAX_PREFIXLEN[version], prefixlens[version])
+                             for version in (4, 6)}
+            diff.full = True
+        with stage("比较输入") as record:
+            added, removed = diff_counts(self.lines, counts)
+            record.add(len(lines))
+        diff.lines_added = sum(added.values())
+        diff.lines_removed = sum(removed.values())
+        parsed_added = parse_lines(chain.from_iterable(repeat(line, n) for line, n in added.items()))
+        parsed_removed = parse_lines(chain.from_iterable(repeat(line, n) for line, n in removed.items()))
+        with stage("合并前缀") as record:
+            for version in (4, 6):
+                diff.removed[version], diff.added[version] = self.families[version].apply(
+                    parsed_added.prefixes[version], parsed_removed.prefixes[version])
+                diff.total += self.families[version].cidr_count
+            record.add(len(parsed_added) + len(parsed_removed))
+        self.invalid.update(line for _, line in parsed_added.invalid)
+        self.invalid.subtract(line for _, line in parsed_removed.invalid)
+        self.invalid = +self.invalid
+        self.lines = counts
+        # 无效行的行号以本次输入为准
+        self.invalid_lines = [(lineno, line) for lineno, line in enumerate(lines, 1) if line in self.invalid] \
+            if self.invalid else []
+        diff.seconds = time.perf_counter() - started
+        return diff
+
+    # 当前的完整汇总结果
+    def result(self):
+        result = AggregationResult()
+        for version, family in self.families.items():
+            result.prefixes[version] = family.cidrs()
+            result.input_count[version] = len(family)
+        result.invalid_lines = self.invalid_lines
+        result.invalid = list(dict.fromkeys(line for _, line in self.invalid_lines))
+        result.out_of_range = any(family.counts and family.new_prefixlen is not None
+                                  and family.new_prefixlen > family.max_prefixlen
+                                  for family in self.families.values())
+        return result
@@ -0,0 +1,253 @@
+import heapq
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+from socket import AF_INET, AF_INET6, inet_pton
+
+from .aggregation import MAX_PREFIXLEN
+from .division import SubnetRange
+from .parser import parse_lines
+from .subnetinfo import format_address
+
+# 第一级索引最多按地址高 20 位分桶（IPv4 约 4MB），桶数随区间数量增长
+MAX_INDEX_BITS = 20
+# 匹配结果格式化缓存的上限，超过后清空
+FORMAT_CACHE_SIZE = 65536
+
+
+# 解析单个 IP 地址，返回 (协议版本, 整数地址)，不合法时抛出 ValueError
+def parse_address(text):
+    text = text.strip()
+    try:
+        if ":" in text:
+            return 6, int.from_bytes(inet_pton(AF_INET6, text), "big")
+        return 4, int.from_bytes(inet_pton(AF_INET, text), "big")
+    except OSError:
+        raise ValueError(f"{text!r} 不是一个合规的 IP 地址") from None
+
+
+# 将区间 (起始, 前缀长度, 结束) 编译为互不重叠的有序区间表：
+# starts[i] 起的地址最长匹配的前缀长度为 prefixlens[i]，-1 表示没有匹配
+def compile_intervals(intervals):
+    intervals = sorted(intervals)
+    compiled = _compile_nested(intervals)
+    if compiled is None:
+        compiled = _compile_overlapping(intervals)
+    return compiled
+
+
+# 追加一个边界：与上一个边界位置相同时覆盖，前缀长度与上一段相同时合并
+def _append_boundary(starts, prefixlens, position, prefixlen):
+    if starts and starts[-1] == position:
+        starts.pop()
+        prefixlens.pop()
+    if prefixlens and prefixlens[-1] == prefixlen:
+        return
+    starts.append(position)
+    prefixlens.append(prefixlen)
+
+
+# 区间之间只有包含或不相交（CIDR 前缀总是如此）时用栈扫描一遍完成；
+# 出现部分重叠（例如子网序列的一段与其他前缀交叉）时返回 None
+def _compile_nested(intervals):
+    starts = []
+    prefixlens = []
+    stack = []
+    for start, prefixlen, end in intervals:
+        while stack and stack[-1][0] < start:
+            closed_end = stack.pop()[0]
+            _append_boundary(starts, prefixlens, closed_end + 1, stack[-1][1] if stack else -1)
+        if stack:
+            if stack[-1][0] < end:
+                return None
+            prefixlen = max(prefixlen, stack[-1][1])
+        _append_boundary(starts, prefixlens, start, prefixlen)
+        stack.append((end, prefixlen))
+    while stack:
+        closed_end = stack.pop()[0]
+        _append_boundary(starts, prefixlens, closed_end + 1, stack[-1][1] if stack else -1)
+    return starts, prefixlens
+
+
+# 通用扫描：在每个边界处用大顶堆（延迟删除）取覆盖该位置的最长前缀
+def _compile_overlapping(intervals):
+    positions = sorted({start for start, _, _ in intervals} | {end + 1 for _, _, end in intervals})
+    starts = []
+    prefixlens = []
+    active = []
+    i = 0
+    for position in positions:
+        while i < len(intervals) and intervals[i][0] == position:
+            start, prefixlen, end = intervals[i]
+            heapq.heappush(active, (-prefixlen, end))
+            i += 1
+        while active and active[0][1] < position:
+            heapq.heappop(active)
+        _append_boundary(starts, prefixlens, position, -active[0][0] if active else -1)
+    return starts, prefixlens
+
+
+# 编译后的单个协议版本：有序区间表加按高位分桶的第一级索引（多比特 trie 的第一层），
+# 查找时只在所属桶内二分，访问范围小、缓存友好
+class CompiledFamily:
+    def __init__(self, version, intervals):
+        self.max_prefixlen = MAX_PREFIXLEN[version]
+        starts, prefixlens = compile_intervals(intervals)
+        # IPv4 的边界用连续的 64 位数组保存；IPv6 超出范围，仍用列表
+        self.starts = array('Q', starts) if version == 4 else starts
+        self.prefixlens = array('h', prefixlens)
+        bits = min(MAX_INDEX_BITS, max(4, len(starts).bit_length()))
+        self.shift = self.max_prefixlen - bits
+        # index[k] 为高位小于 k 的边界数量；最后一个边界可能等于地址空间上限，多留一个桶
+        counts = [0] * ((1 << bits) + 2)
+        shift = self.shift
+        for start in starts:
+            counts[(start >> shift) + 1] += 1
+        self.index = array('I', accumulate(counts))
+
+    def __len__(self):
+        return len(self.starts)
+
+    # 查找整数地址，返回最长匹配的前缀长度，没有匹配时返回 -1
+    def match(self, address):
+        k = address >> self.shift
+        i = bisect_right(self.starts, address, self.index[k], self.index[k + 1]) - 1
+        return self.prefixlens[i] if i >= 0 else -1
+
+
+# 最长前缀匹配表：加载前缀后编译为有序区间表，用二分查找回答地址属于哪个子网
+class PrefixTable:
+    def __init__(self):
+        self.intervals = {4: [], 6: []}
+        self.invalid = []
+        self.count = 0
+        self._compiled = None
+        self._format_cache = {}
+
+    # 从文本行加载（例如导入的文件），不合法的行记录在 invalid 中
+    @classmethod
+    def from_lines(cls, lines, parallel=True):
+        table = cls()
+        parsed = parse_lines(lines, parallel=parallel)
+        for version in (4, 6):
+            table.extend(version, parsed.prefixes[version])
+        table.invalid = parsed.invalid
+        return table
+
+    # 从划分或汇总结果加载：SubnetRange、SubnetInfo 序列、ip_network 序列
+    # 或 AggregationResult（带 prefixes 属性）
+    @classmethod
+    def from_subnets(cls, subnets):
+        table = cls()
+        if isinstance(getattr(subnets, "prefixes", None), dict):
+            for version in (4, 6):
+                table.extend(version, subnets.prefixes[version])
+        elif isinstance(subnets, SubnetRange):
+            table.add_range(subnets)
+        else:
+            for subnet in subnets:
+                if hasattr(subnet, "base"):
+                    table.add(subnet.version, subnet.base, subnet.prefixlen)
+                else:
+                    table.add(subnet.version, int(subnet.network_address), subnet.prefixlen)
+        return table
+
+    def add(self, version, base, prefixlen):
+        self.intervals[version].append(
+            (base, prefixlen, base + (1 << (MAX_PREFIXLEN[version] - prefixlen)) - 1))
+        self.count += 1
+        self._compiled = None
+
+    # 批量添加同一协议版本的 (网络地址, 前缀长度)
+    def extend(self, version, prefixes):
+        max_prefixlen = MAX_PREFIXLEN[version]
+        intervals = self.intervals[version]
+        before = len(intervals)
+        intervals.extend((base, prefixlen, base + (1 << (max_prefixlen - prefixlen)) - 1)
+                         for base, prefixlen in prefixes)
+        self.count += len(intervals) - before
+        self._compiled = None
+
+    # 等长连续子网作为一个区间加入，不逐个展开
+    def add_range(self, subnet_range):
+        if subnet_range.count:
+            end = subnet_range.base + subnet_range.count * subnet_range.step - 1
+            self.intervals[subnet_range.version].append(
+                (subnet_range.base, subnet_range.new_prefixlen, end))
+            self.count += subnet_range.count
+            self._compiled = None
+
+    def __len__(self):
+        return self.count
+
+    def __bool__(self):
+        return self.count > 0
+
+    def compile(self):
+        if self._compiled is None:
+            self._compiled = {version: CompiledFamily(version, self.intervals[version])
+                              for version in (4, 6)}
+            self._format_cache = {}
+        return self._compiled
+
+    # 查找整数地址，返回匹配的 (网络地址, 前缀长度)，没有匹配时返回 None
+    def lookup_int(self, version, address):
+        prefixlen = self.compile()[version].match(address)
+        if prefixlen < 0:
+            return None
+        host_bits = MAX_PREFIXLEN[version] - prefixlen
+        return address >> host_bits << host_bits, prefixlen
+
+    # 查找地址文本，返回匹配的子网文本，没有匹配时返回 None；地址不合法时抛出 ValueError
+    def lookup(self, text):
+        version, address = parse_address(text)
+        match = self.lookup_int(version, address)
+        if match is None:
+            return None
+        return self._format(version, *match)
+
+    def _format(self, version, base, prefixlen):
+        key = (version, base, prefixlen)
+        text = self._format_cache.get(key)
+        if text is None:
+            if len(self._format_cache) >= FORMAT_CACHE_SIZE:
+                self._format_cache.clear()
+            text = self._format_cache[key] = f"{format_address(version, base)}/{prefixlen}"
+        return text
+
+    # 批量查找地址文本行，产出 [地址, 匹配的子网]（没有匹配时为空字符串）；
+    # 空白行跳过，不合法的地址以 (行号, 内容) 追加到 invalid
+    def lookup_lines(self, lines, invalid=None):
+        families = self.compile()
+        cache = self._format_cache
+        fmt = self._format
+        # 热循环中直接使用局部变量，避免属性查找
+        tables = {version: (family.starts, family.prefixlens, family.index, family.shift, family.max_prefixlen)
+                  for version, family in families.items()}
+        for lineno, line in enumerate(lines, 1):
+            text = line.strip()
+            if not text:
+                continue
+            try:
+                if ":" in text:
+                    version = 6
+                    address = int.from_bytes(inet_pton(AF_INET6, text), "big")
+                else:
+                    version = 4
+                    address = int.from_bytes(inet_pton(AF_INET, text), "big")
+            except OSError:
+                if invalid is not None:
+                    invalid.append((lineno, line))
+                continue
+            starts, prefixlens, index, shift, max_prefixlen = tables[version]
+            k = address >> shift
+            i = bisect_right(starts, address, index[k], index[k + 1]) - 1
+            if i < 0 or prefixlens[i] < 0:
+                yield [text, ""]
+                continue
+            host_bits = max_prefixlen - prefixlens[i]
+            key = (version, address >> host_bits << host_bits, prefixlens[i])
+            network = cache.get(key)
+            if network is None:
+                network = fmt(*key)
+            yield [text, network]
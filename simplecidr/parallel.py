@@ -0,0 +1,61 @@
+import os
+
+# concurrent.futures 与 multiprocessing 在首次创建进程池时才导入，导入本模块保持轻量；
+# BrokenProcessPool 是 RuntimeError 的子类，捕获 RuntimeError 即可覆盖
+# 进程池按需创建并复用，避免每次计算都重新启动子进程
+_pool = None
+_pool_workers = 0
+
+
+# 可用的 CPU 数量（考虑进程的 CPU 亲和性）
+def available_cpus():
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def default_workers():
+    return max(1, min(8, available_cpus()))
+
+
+# 获取共享的进程池；使用 spawn 方式启动，可在 GUI 的后台线程中安全调用
+def process_pool(max_workers=None):
+    global _pool, _pool_workers
+    max_workers = max_workers or default_workers()
+    if _pool is None or _pool_workers < max_workers:
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import get_context
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=get_context("spawn"))
+        _pool_workers = max_workers
+    return _pool
+
+
+def shutdown_pool():
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+    _pool = None
+    _pool_workers = 0
+
+
+# 在进程池中并行执行 func(*args)；第一个任务在当前进程中执行，
+# 只有一个 CPU 或进程池不可用时（受限环境、打包程序等）退回到顺序执行
+def run_parallel(func, args_list, max_workers=None):
+    args_list = list(args_list)
+    if len(args_list) <= 1 or available_cpus() < 2:
+        return [func(*args) for args in args_list]
+    try:
+        pool = process_pool(max_workers or min(len(args_list) - 1, default_workers()))
+        futures = [pool.submit(func, *args) for args in args_list[1:]]
+    except (OSError, RuntimeError, NotImplementedError):
+        shutdown_pool()
+        return [func(*args) for args in args_list]
+    results = [func(*args_list[0])]
+    try:
+        results.extend(future.result() for future in futures)
+    except RuntimeError:
+        shutdown_pool()
+        results.extend(func(*args) for args in args_list[len(results):])
+    return results
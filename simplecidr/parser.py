@@ -0,0 +1,163 @@
+import time
+from ipaddress import ip_network
+from itertools import chain, islice
+from socket import AF_INET6, inet_pton
+
+from .parallel import available_cpus, default_workers, process_pool, shutdown_pool
+from .profiling import iter_stage, stage
+
+# 输入行数超过该值且有多个 CPU 时才使用进程池分块解析
+PARALLEL_THRESHOLD = 200000
+CHUNK_SIZE = 50000
+_DIGITS = frozenset("0123456789")
+_HEX_DIGITS = frozenset("0123456789abcdefABCDEF:")
+
+
+# 解析十进制数字串：只接受不带前导零的 ASCII 数字，否则返回 None
+def _parse_decimal(text, max_len):
+    if not text or len(text) > max_len or not _DIGITS.issuperset(text):
+        return None
+    if len(text) > 1 and text[0] == "0":
+        return None
+    return int(text)
+
+
+# 快速解析常见格式（点分十进制/前缀长度、常见 IPv6 格式），主机位清零；
+# 遇到少见格式返回 None，由 ipaddress 决定是否合法，保证结果与 ip_network(strict=False) 一致
+def parse_prefix_fast(text):
+    address, slash, prefix = text.partition("/")
+    if ":" in address:
+        if not _HEX_DIGITS.issuperset(address):
+            return None
+        max_prefixlen = 128
+        prefixlen = _parse_decimal(prefix, 3) if slash else 128
+        if prefixlen is None or prefixlen > 128:
+            return None
+        try:
+            base = int.from_bytes(inet_pton(AF_INET6, address), "big")
+        except OSError:
+            return None
+        version = 6
+    else:
+        octets = address.split(".")
+        if len(octets) != 4:
+            return None
+        base = 0
+        for octet in octets:
+            value = _parse_decimal(octet, 3)
+            if value is None or value > 255:
+                return None
+            base = base << 8 | value
+        max_prefixlen = 32
+        prefixlen = _parse_decimal(prefix, 2) if slash else 32
+        if prefixlen is None or prefixlen > 32:
+            return None
+        version = 4
+    host_bits = max_prefixlen - prefixlen
+    return version, base >> host_bits << host_bits, prefixlen
+
+
+# 解析一行网络文本，返回 (协议版本, 网络地址, 前缀长度)，不合法时抛出 ValueError
+def parse_prefix(text):
+    parsed = parse_prefix_fast(text)
+    if parsed is not None:
+        return parsed
+    network = ip_network(text, strict=False)
+    return network.version, int(network.network_address), network.prefixlen
+
+
+# 解析结果：按协议版本保存 (网络地址, 前缀长度)，以及不合法的 (行号, 内容)
+class ParseResult:
+    def __init__(self):
+        self.prefixes = {4: [], 6: []}
+        self.invalid = []
+        self.seconds = 0.0
+
+    def __len__(self):
+        return len(self.prefixes[4]) + len(self.prefixes[6])
+
+    def extend(self, chunk_result):
+        prefixes4, prefixes6, invalid = chunk_result
+        self.prefixes[4].extend(prefixes4)
+        self.prefixes[6].extend(prefixes6)
+        self.invalid.extend(invalid)
+
+
+# 解析一块文本行（可在子进程中执行），空白行跳过，行号从 first_lineno 开始
+def parse_chunk(lines, first_lineno=1):
+    prefixes = {4: [], 6: []}
+    invalid = []
+    fast = parse_prefix_fast
+    for lineno, line in enumerate(lines, first_lineno):
+        parsed = fast(line)
+        if parsed is None:
+            if not line.strip():
+                continue
+            try:
+                network = ip_network(line, strict=False)
+            except ValueError:
+                invalid.append((lineno, line))
+                continue
+            parsed = network.version, int(network.network_address), network.prefixlen
+        prefixes[parsed[0]].append((parsed[1], parsed[2]))
+    return prefixes[4], prefixes[6], invalid
+
+
+# 按块读取文本行，返回 (块, 首行行号)
+def iter_line_chunks(lines, chunk_size=CHUNK_SIZE):
+    lines = iter(lines)
+    lineno = 1
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            return
+        yield chunk, lineno
+        lineno += len(chunk)
+
+
+# 批量解析文本行：数据量大且有多个 CPU 时分块交给进程池，否则在当前进程中解析
+def parse_lines(lines, parallel=True, chunk_size=CHUNK_SIZE):
+    started = time.perf_counter()
+    result = ParseResult()
+    with stage("解析") as record:
+        # 读取输入（例如流式读取文件）的时间单独计入“读取输入”
+        chunks = iter_stage("读取输入", iter_line_chunks(lines, chunk_size), lambda item: len(item[0]))
+        if parallel and available_cpus() > 1:
+            # 先读取到阈值，数据量小时不值得启动子进程
+            head = list(islice(chunks, PARALLEL_THRESHOLD // chunk_size))
+            if len(head) * chunk_size >= PARALLEL_THRESHOLD:
+                _parse_chunks_in_pool(result, head, chunks)
+            else:
+                for chunk, lineno in head:
+                    result.extend(parse_chunk(chunk, lineno))
+        else:
+            for chunk, lineno in chunks:
+                result.extend(parse_chunk(chunk, lineno))
+        record.add(len(result) + len(result.invalid))
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+# 在进程池中解析，同时在途的块数量有限，结果按原顺序合并；进程池不可用时退回当前进程
+def _parse_chunks_in_pool(result, head, chunks):
+    max_pending = 2 * default_workers()
+    source = chain(head, chunks)
+    pending = []
+    try:
+        pool = process_pool()
+        for chunk, lineno in source:
+            # 先记入在途列表再提交，提交失败（例如进程池已损坏）时这一块也会退回当前进程解析
+            pending.append([None, chunk, lineno])
+            pending[-1][0] = pool.submit(parse_chunk, chunk, lineno)
+            if len(pending) >= max_pending:
+                result.extend(pending[0][0].result())
+                pending.pop(0)
+        while pending:
+            result.extend(pending[0][0].result())
+            pending.pop(0)
+    except (OSError, RuntimeError):
+        shutdown_pool()
+        for _, chunk, lineno in pending:
+            result.extend(parse_chunk(chunk, lineno))
+        for chunk, lineno in source:
+            result.extend(parse_chunk(chunk, lineno))
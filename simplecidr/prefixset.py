@@ -0,0 +1,529 @@
+import mmap
+import os
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from socket import AF_INET, AF_INET6, inet_pton
+from struct import Struct
+
+from .aggregation import (MAX_PREFIXLEN, NETWORK_CLASS, AggregationResult, collapse_sorted_prefixes,
+                          target_prefixlen)
+from .division import SubnetRange
+from .lookup import FORMAT_CACHE_SIZE, PrefixTable, parse_address
+from .parser import parse_prefix
+from .profiling import stage
+from .subnetinfo import SubnetInfo, format_address, ipv4_array
+
+# 二进制前缀集（.cidrset）：64 字节文件头，随后每个协议版本一节按 (网络地址, 前缀长度) 排序的定宽记录。
+# 文件头：魔数、格式版本、节数、保留字段，之后是 IPv4 与 IPv6 两个节描述
+# （协议版本、标志、最小/最大前缀长度、记录数、数据偏移）；整数均为小端序。
+# 节内按列存放：IPv4 为 uint32 网络地址数组与 uint8 前缀长度数组，
+# IPv6 为网络地址高 64 位、低 64 位两个 uint64 数组与 uint8 前缀长度数组。
+# 读取时内存映射整个文件，各列用 memoryview.cast 直接作为整数序列使用，不复制、不解析
+MAGIC = b"SCIDRSET"
+FORMAT_VERSION = 1
+HEADER = Struct("<8sHHI")
+SECTION = Struct("<BBBBIQQ")
+HEADER_SIZE = HEADER.size + 2 * SECTION.size
+# 节的起始偏移按 8 字节对齐，uint64 列可以直接 cast
+SECTION_ALIGN = 8
+# 节标志：记录互不重叠（可直接二分查找最长匹配）；已是最少 CIDR（汇总结果，可直接作为汇总输出）
+FLAG_DISJOINT = 1
+FLAG_COLLAPSED = 2
+# 单个协议版本的记录数上限，超大的 IPv6 划分无法保存
+MAX_RECORDS = 1 << 32
+MASK64 = (1 << 64) - 1
+U32 = ipv4_array().typecode
+LITTLE_ENDIAN = sys.byteorder == "little"
+PREFIX_SET_SUFFIX = ".cidrset"
+PREFIX_SET_FILETYPES = [("Prefix Set Files", "*.cidrset")]
+
+
+def is_prefix_set_path(path):
+    return str(path).lower().endswith(PREFIX_SET_SUFFIX)
+
+
+# 按魔数判断文件是否为二进制前缀集
+def is_prefix_set_file(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+# IPv6 网络地址序列：由高 64 位、低 64 位两列组合成 128 位整数，支持下标、切片与迭代
+class LaneBases:
+    def __init__(self, high, low):
+        self.high = high
+        self.low = low
+
+    def __len__(self):
+        return len(self.high)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return LaneBases(self.high[i], self.low[i])
+        return self.high[i] << 64 | self.low[i]
+
+    def __iter__(self):
+        return (high << 64 | low for high, low in zip(self.high, self.low))
+
+
+# 前缀集中的一个协议版本：(网络地址, 前缀长度) 的有序序列，切片不复制数据；
+# 具有 version / bases / prefixlens 属性，可直接用于 brief_rows 生成表格行
+class FamilyView:
+    def __init__(self, version, bases, prefixlens, flags=0, min_prefixlen=0, max_prefixlen=0):
+        self.version = version
+        self.bases = bases
+        self.prefixlens = prefixlens
+        self.flags = flags
+        # 整个节的前缀长度范围（切片沿用，作为上下界）
+        self.min_prefixlen = min_prefixlen
+        self.max_prefixlen = max_prefixlen
+
+    @property
+    def count(self):
+        return len(self.prefixlens)
+
+    @property
+    def disjoint(self):
+        return bool(self.flags & FLAG_DISJOINT)
+
+    @property
+    def collapsed(self):
+        return bool(self.flags & FLAG_COLLAPSED)
+
+    def __len__(self):
+        return len(self.prefixlens)
+
+    def __bool__(self):
+        return len(self.prefixlens) > 0
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            if i.step not in (None, 1):
+                raise ValueError("前缀集仅支持步长为 1 的切片")
+            return FamilyView(self.version, self.bases[i], self.prefixlens[i], self.flags,
+                              self.min_prefixlen, self.max_prefixlen)
+        return self.bases[i], self.prefixlens[i]
+
+    def __iter__(self):
+        return zip(self.bases, self.prefixlens)
+
+    # 网络地址不大于 address 的最后一条记录的下标，没有时返回 -1；
+    # IPv6 先在高 64 位列上确定范围，再在低 64 位列上二分，都是对 memoryview 的 C 级二分
+    def find(self, address):
+        if self.version == 4:
+            return bisect_right(self.bases, address) - 1
+        high, low = address >> 64, address & MASK64
+        lo = bisect_left(self.bases.high, high)
+        hi = bisect_right(self.bases.high, high, lo)
+        i = bisect_right(self.bases.low, low, lo, hi) - 1
+        return i if i >= lo else lo - 1
+
+    # 最长前缀匹配（要求记录互不重叠），返回 (网络地址, 前缀长度)，没有匹配时返回 None
+    def match(self, address):
+        i = self.find(address)
+        if i < 0:
+            return None
+        base, prefixlen = self.bases[i], self.prefixlens[i]
+        if address - base >> (MAX_PREFIXLEN[self.version] - prefixlen):
+            return None
+        return base, prefixlen
+
+
+# 内存映射打开的二进制前缀集：prefixes 与 AggregationResult 一样按协议版本保存 (网络地址, 前缀长度)，
+# 可作为汇总结果、划分结果表格的数据源，记录互不重叠时也可以直接作为最长前缀匹配表
+class PrefixSet:
+    def __init__(self, prefixes, path=None, mapped=None):
+        self.prefixes = prefixes
+        self.path = path
+        self.invalid = []
+        self._mmap = mapped
+        self._format_cache = {}
+
+    # 打开文件：先校验文件头，再映射各列的内存
+    @classmethod
+    def open(cls, path):
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            sections = read_header(f.read(HEADER_SIZE), size, path)
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapped)
+        prefixes = {4: FamilyView(4, ipv4_array(), array('B')),
+                    6: FamilyView(6, LaneBases(array('Q'), array('Q')), array('B'))}
+        for section in sections:
+            prefixes[section[0]] = map_family(view, *section)
+        return cls(prefixes, path, mapped)
+
+    # 关闭内存映射；之后不能再访问各列（包括引用了它们的汇总结果）
+    def close(self):
+        if self._mmap is not None:
+            for family in self.prefixes.values():
+                release_family(family)
+            try:
+                self._mmap.close()
+            except BufferError:
+                # 仍有切片引用映射的内存，等它们释放后由垃圾回收关闭
+                pass
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    @property
+    def count(self):
+        return len(self.prefixes[4]) + len(self.prefixes[6])
+
+    # 只有一个协议版本时的版本号，两个版本都有（或为空）时为 None
+    @property
+    def version(self):
+        versions = [version for version in (4, 6) if self.prefixes[version]]
+        return versions[0] if len(versions) == 1 else None
+
+    @property
+    def disjoint(self):
+        return all(family.disjoint or not family for family in self.prefixes.values())
+
+    def __len__(self):
+        return self.count
+
+    def __bool__(self):
+        return self.count > 0
+
+    # 按 IPv4 在前、IPv6 在后的顺序编号；切片落在同一协议版本内时返回 FamilyView（不复制），
+    # 跨越两个版本时返回 SubnetInfo 列表
+    def __getitem__(self, item):
+        count4 = len(self.prefixes[4])
+        if isinstance(item, slice):
+            start, stop, stride = item.indices(self.count)
+            if stride != 1:
+                raise ValueError("前缀集仅支持步长为 1 的切片")
+            stop = max(start, stop)
+            if stop <= count4:
+                return self.prefixes[4][start:stop]
+            if start >= count4:
+                return self.prefixes[6][start - count4:stop - count4]
+            return [self[i] for i in range(start, stop)]
+        if item < 0:
+            item += self.count
+        if not 0 <= item < self.count:
+            raise IndexError("前缀下标超出范围")
+        version = 4 if item < count4 else 6
+        base, prefixlen = self.prefixes[version][item if version == 4 else item - count4]
+        return SubnetInfo(version, base, prefixlen)
+
+    def __iter__(self):
+        for version in (4, 6):
+            for base, prefixlen in self.prefixes[version]:
+                yield SubnetInfo(version, base, prefixlen)
+
+    def networks(self, version=None):
+        versions = (4, 6) if version is None else (version,)
+        return [NETWORK_CLASS[v]((base, prefixlen))
+                for v in versions for base, prefixlen in self.prefixes[v]]
+
+    def cidrs(self):
+        for version in (4, 6):
+            for base, prefixlen in self.prefixes[version]:
+                yield f"{format_address(version, base)}/{prefixlen}"
+
+    def summary(self):
+        name = os.path.basename(self.path) if self.path else "前缀集"
+        return f"{name}：IPv4 {len(self.prefixes[4])} 条，IPv6 {len(self.prefixes[6])} 条"
+
+    # 最长前缀匹配表：记录互不重叠时直接在映射的数组上二分查找，否则编译为 PrefixTable
+    def lookup_table(self):
+        if self.disjoint:
+            return self
+        table = PrefixTable.from_subnets(self)
+        table.compile()
+        return table
+
+    # 与 PrefixTable 相同的查找接口（记录互不重叠时可用），无需编译
+    def compile(self):
+        return self.prefixes
+
+    def lookup_int(self, version, address):
+        return self.prefixes[version].match(address)
+
+    def lookup(self, text):
+        version, address = parse_address(text)
+        match = self.lookup_int(version, address)
+        if match is None:
+            return None
+        return self._format(version, *match)
+
+    def _format(self, version, base, prefixlen):
+        key = (version, base, prefixlen)
+        text = self._format_cache.get(key)
+        if text is None:
+            if len(self._format_cache) >= FORMAT_CACHE_SIZE:
+                self._format_cache.clear()
+            text = self._format_cache[key] = f"{format_address(version, base)}/{prefixlen}"
+        return text
+
+    # 批量查找地址文本行，产出 [地址, 匹配的子网]，与 PrefixTable.lookup_lines 相同
+    def lookup_lines(self, lines, invalid=None):
+        families = self.prefixes
+        fmt = self._format
+        for lineno, line in enumerate(lines, 1):
+            text = line.strip()
+            if not text:
+                continue
+            try:
+                if ":" in text:
+                    version = 6
+                    address = int.from_bytes(inet_pton(AF_INET6, text), "big")
+                else:
+                    version = 4
+                    address = int.from_bytes(inet_pton(AF_INET, text), "big")
+            except OSError:
+                if invalid is not None:
+                    invalid.append((lineno, line))
+                continue
+            match = families[version].match(address)
+            yield [text, "" if match is None else fmt(version, *match)]
+
+
+# 解析并校验文件头，返回各节的 (协议版本, 标志, 最小前缀长度, 最大前缀长度, 记录数, 数据偏移)
+def read_header(data, size, path=None):
+    if len(data) < HEADER_SIZE or data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} 不是有效的前缀集文件")
+    _, format_version, count, _ = HEADER.unpack_from(data, 0)
+    if format_version != FORMAT_VERSION:
+        raise ValueError(f"不支持的前缀集格式版本：{format_version}")
+    sections = []
+    for k in range(min(count, 2)):
+        version, flags, min_prefixlen, max_prefixlen, _, records, offset = \
+            SECTION.unpack_from(data, HEADER.size + k * SECTION.size)
+        if version not in (4, 6) or offset % SECTION_ALIGN or offset + section_size(version, records) > size:
+            raise ValueError(f"{path} 已损坏：第 {k + 1} 节超出文件范围")
+        sections.append((version, flags, min_prefixlen, max_prefixlen, records, offset))
+    return sections
+
+
+def map_family(view, version, flags, min_prefixlen, max_prefixlen, count, offset):
+    if version == 4:
+        bases = cast_column(view, offset, count, U32)
+        offset += 4 * count
+    else:
+        bases = LaneBases(cast_column(view, offset, count, 'Q'),
+                          cast_column(view, offset + 8 * count, count, 'Q'))
+        offset += 16 * count
+    prefixlens = view[offset:offset + count]
+    return FamilyView(version, bases, prefixlens, flags, min_prefixlen, max_prefixlen)
+
+
+# 取文件中的一列整数：小端序机器上直接 cast，不复制；大端序机器上复制后交换字节序
+def cast_column(view, offset, count, typecode):
+    data = view[offset:offset + 8 * count if typecode == 'Q' else offset + 4 * count]
+    if LITTLE_ENDIAN:
+        return data.cast(typecode)
+    column = array(typecode)
+    column.frombytes(data)
+    column.byteswap()
+    return column
+
+
+def release_family(family):
+    bases = family.bases
+    columns = (bases.high, bases.low) if isinstance(bases, LaneBases) else (bases,)
+    for column in columns + (family.prefixlens,):
+        if isinstance(column, memoryview):
+            column.release()
+
+
+def section_size(version, count):
+    return (5 if version == 4 else 17) * count
+
+
+def open_prefix_set(path):
+    return PrefixSet.open(path)
+
+
+# 构建前缀集：依次加入划分结果、汇总结果或其他前缀，写入时排序、去重并计算节标志
+class PrefixSetWriter:
+    def __init__(self):
+        # IPv6 的网络地址先放在整数列表中，写入时拆分为两个 uint64 列
+        self.bases = {4: ipv4_array(), 6: []}
+        self.prefixlens = {4: array('B'), 6: array('B')}
+        # 已知的性质：sorted（有序且不重复）与节标志；同一版本加入多个来源后需要重新检查
+        self.known = {4: None, 6: None}
+
+    def __len__(self):
+        return len(self.prefixlens[4]) + len(self.prefixlens[6])
+
+    # 加入一个来源：AggregationResult 或 PrefixSet（按协议版本的 prefixes）、SubnetRange、
+    # VLSM 分配结果、SubnetInfo / ip_network / 前缀文本的可迭代对象
+    def add(self, source):
+        if isinstance(getattr(source, "prefixes", None), dict):
+            for version in (4, 6):
+                family = source.prefixes[version]
+                flags = getattr(family, "flags", FLAG_DISJOINT | FLAG_COLLAPSED)
+                self.extend(version, family, (True, flags))
+        elif isinstance(source, SubnetRange):
+            self.add_range(source)
+        elif hasattr(source, "unallocated"):
+            # VLSM 分配的子网互不重叠，但按分配顺序排列
+            self.extend(source.version, [(subnet.base, subnet.prefixlen) for subnet in source.subnets],
+                        (False, FLAG_DISJOINT))
+        else:
+            self.add_subnets(source)
+
+    # 等长连续子网：IPv4 直接由 range 填充数组
+    def add_range(self, subnet_range):
+        version = subnet_range.version
+        if not subnet_range.count:
+            return
+        if len(self.prefixlens[version]) + subnet_range.count > MAX_RECORDS:
+            raise ValueError(f"前缀数量 {subnet_range.count} 超过前缀集的上限 {MAX_RECORDS}")
+        base, step = subnet_range.base, subnet_range.step
+        self.extend(version, None, (True, FLAG_DISJOINT),
+                    bases=range(base, base + step * subnet_range.count, step),
+                    prefixlens=array('B', [subnet_range.new_prefixlen]) * subnet_range.count)
+
+    def add_subnets(self, subnets):
+        prefixes = {4: [], 6: []}
+        for subnet in subnets:
+            if isinstance(subnet, SubnetInfo):
+                prefixes[subnet.version].append((subnet.base, subnet.prefixlen))
+            elif isinstance(subnet, str):
+                version, base, prefixlen = parse_prefix(subnet)
+                prefixes[version].append((base, prefixlen))
+            else:
+                prefixes[subnet.version].append((int(subnet.network_address), subnet.prefixlen))
+        for version in (4, 6):
+            self.extend(version, prefixes[version], (False, 0))
+
+    def extend(self, version, prefixes, known, bases=None, prefixlens=None):
+        if prefixes is not None:
+            bases = [base for base, _ in prefixes]
+            prefixlens = array('B', [prefixlen for _, prefixlen in prefixes])
+        if not prefixlens:
+            return
+        if len(self.prefixlens[version]) + len(prefixlens) > MAX_RECORDS:
+            raise ValueError(f"前缀数量超过前缀集的上限 {MAX_RECORDS}")
+        # 第一个来源的性质可以沿用，之后加入的来源需要写入时重新排序、检查
+        if self.prefixlens[version]:
+            self.known[version] = (False, 0)
+        else:
+            self.known[version] = known
+        self.bases[version].extend(bases)
+        self.prefixlens[version].extend(prefixlens)
+
+    # 排序去重，返回 (网络地址序列, 前缀长度数组, 节标志)
+    def finish_family(self, version):
+        bases, prefixlens = self.bases[version], self.prefixlens[version]
+        ordered, flags = self.known[version] or (True, 0)
+        if not ordered:
+            keys = sorted({base << 8 | prefixlen for base, prefixlen in zip(bases, prefixlens)})
+            bases = ipv4_array() if version == 4 else []
+            bases.extend(key >> 8 for key in keys)
+            prefixlens = array('B', [key & 0xFF for key in keys])
+        if not flags & FLAG_DISJOINT and is_disjoint(bases, prefixlens, MAX_PREFIXLEN[version]):
+            flags |= FLAG_DISJOINT
+        return bases, prefixlens, flags
+
+    # 先写入同目录下的临时文件再替换，已打开（内存映射中）的旧文件不受影响；
+    # progress(已写入记录数) 抛出异常（例如任务取消）时删除临时文件
+    def write(self, path, progress=None):
+        families = {}
+        with stage("整理前缀集") as record:
+            for version in (4, 6):
+                families[version] = self.finish_family(version)
+                record.add(len(families[version][1]))
+        temp_path = f"{path}.tmp"
+        written = 0
+        try:
+            with stage("写入前缀集") as record, open(temp_path, "wb") as f:
+                offsets = {}
+                offset = HEADER_SIZE
+                for version in (4, 6):
+                    offset = -(-offset // SECTION_ALIGN) * SECTION_ALIGN
+                    offsets[version] = offset
+                    offset += section_size(version, len(families[version][1]))
+                f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 2, 0))
+                for version in (4, 6):
+                    _, prefixlens, flags = families[version]
+                    f.write(SECTION.pack(version, flags, min(prefixlens, default=0), max(prefixlens, default=0),
+                                         0, len(prefixlens), offsets[version]))
+                for version in (4, 6):
+                    bases, prefixlens, _ = families[version]
+                    f.write(b"\0" * (offsets[version] - f.tell()))
+                    if version == 4:
+                        write_column(f, bases)
+                    else:
+                        write_column(f, array('Q', [base >> 64 for base in bases]))
+                        write_column(f, array('Q', [base & MASK64 for base in bases]))
+                    f.write(prefixlens)
+                    written += len(prefixlens)
+                    record.add(len(prefixlens))
+                    if progress is not None:
+                        progress(written)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        return written
+
+
+# 按小端序写出一列整数
+def write_column(f, column):
+    if not LITTLE_ENDIAN:
+        column = array(column.typecode, column)
+        column.byteswap()
+    f.write(column)
+
+
+# 有序记录是否互不重叠（每条记录都在下一条的网络地址之前结束）
+def is_disjoint(bases, prefixlens, max_prefixlen):
+    previous_end = -1
+    for base, prefixlen in zip(bases, prefixlens):
+        if base <= previous_end:
+            return False
+        previous_end = base + (1 << (max_prefixlen - prefixlen)) - 1
+    return True
+
+
+# 保存划分或汇总的结果为二进制前缀集，返回写入的记录数
+def save_prefix_set(path, subnets, progress=None):
+    writer = PrefixSetWriter()
+    writer.add(subnets)
+    return writer.write(path, progress)
+
+
+# 汇总前缀集：记录已经有序，无需解析与排序，一遍扫描合并；
+# 本身就是汇总结果且不需要取超网时直接引用映射的数据，不做任何计算
+def aggregate_prefix_set(prefix_set, new_prefixlen):
+    for version in (4, 6):
+        family_prefixlen = target_prefixlen(new_prefixlen, version)
+        if family_prefixlen is not None and family_prefixlen < 0:
+            raise ValueError(f"期望汇总后的子网掩码不能为负数：{family_prefixlen}")
+    result = AggregationResult()
+    result.timings['parse'] = 0.0
+    with stage("合并前缀") as record:
+        for version in (4, 6):
+            started = time.perf_counter()
+            family = prefix_set.prefixes[version]
+            max_prefixlen = MAX_PREFIXLEN[version]
+            family_prefixlen = target_prefixlen(new_prefixlen, version)
+            if family and family_prefixlen is not None and max_prefixlen < family_prefixlen:
+                result.out_of_range = True
+            if family.collapsed and (family_prefixlen is None or family_prefixlen >= family.max_prefixlen):
+                result.prefixes[version] = family
+            else:
+                result.prefixes[version] = collapse_sorted_prefixes(family, max_prefixlen, family_prefixlen)
+            result.input_count[version] = len(family)
+            result.timings[version] = time.perf_counter() - started
+            record.add(len(family))
+    return result
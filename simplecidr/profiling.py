@@ -0,0 +1,246 @@
+import cProfile
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+# 当前启用的剖析器；同一时间只剖析一个任务，未启用时各阶段只多一次全局变量判断
+_active = None
+# 保存到 JSON 跟踪中的阶段事件上限，超过后只累计统计
+MAX_TRACE_EVENTS = 100000
+
+
+# 单个阶段的累计统计：耗时、进入次数、处理数量与内存峰值（字节）
+class StageStats:
+    def __init__(self, name, depth):
+        self.name = name
+        self.depth = depth
+        self.seconds = 0.0
+        self.calls = 0
+        self.count = 0
+        self.peak = 0
+
+    def to_dict(self):
+        return {"name": self.name, "depth": self.depth, "seconds": self.seconds,
+                "calls": self.calls, "count": self.count, "peak_bytes": self.peak}
+
+
+# 一次阶段计时，用作 with 语句；add() 累计本阶段处理的数量
+class Stage:
+    __slots__ = ("profiler", "name", "count", "started", "stack")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.count = 0
+
+    def add(self, count):
+        self.count += count
+
+    def __enter__(self):
+        self.stack = self.profiler.thread_stack()
+        self.profiler.register(self.name, len(self.stack))
+        self.stack.append(self)
+        if self.profiler.memory:
+            tracemalloc.reset_peak()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        finished = time.perf_counter()
+        self.stack.pop()
+        self.profiler.record(self, self.started, finished, len(self.stack))
+        return False
+
+
+# 未启用剖析时使用的空阶段
+class NullStage:
+    __slots__ = ()
+
+    def add(self, count):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_STAGE = NullStage()
+
+
+# 剖析器：按阶段累计耗时、数量与内存峰值，可选同时运行 cProfile；
+# 阶段嵌套时外层的耗时包含内层，内存峰值取其中的最大值
+# 多个线程同时处于阶段中时，内存峰值为近似值（tracemalloc 的峰值是全局的）
+class Profiler:
+    def __init__(self, name="", memory=False, cprofile=False):
+        self.name = name
+        self.memory = memory
+        self.cprofile = cProfile.Profile() if cprofile else None
+        self.stages = {}
+        self.events = []
+        self.dropped_events = 0
+        self.peak = 0
+        self.started = None
+        self.seconds = 0.0
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.started_tracemalloc = False
+
+    def thread_stack(self):
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+
+    def stage(self, name):
+        return Stage(self, name)
+
+    # 阶段按首次进入的顺序排列，外层阶段在内层之前
+    def register(self, name, depth):
+        if name not in self.stages:
+            with self.lock:
+                if name not in self.stages:
+                    self.stages[name] = StageStats(name, depth)
+
+    def record(self, stage, started, finished, depth):
+        peak = tracemalloc.get_traced_memory()[1] if self.memory else 0
+        with self.lock:
+            stats = self.stages[stage.name]
+            stats.seconds += finished - started
+            stats.calls += 1
+            stats.count += stage.count
+            if peak > stats.peak:
+                stats.peak = peak
+            if peak > self.peak:
+                self.peak = peak
+            if len(self.events) < MAX_TRACE_EVENTS:
+                self.events.append((stage.name, started, finished - started, threading.get_ident(), stage.count))
+            else:
+                self.dropped_events += 1
+        # 内层阶段重置过峰值，把它计入仍在进行的外层阶段
+        if self.memory and stage.stack:
+            tracemalloc.reset_peak()
+            for outer in stage.stack:
+                outer_stats = self.stages[outer.name]
+                if peak > outer_stats.peak:
+                    outer_stats.peak = peak
+
+    def start(self):
+        self.started = time.perf_counter()
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracemalloc = True
+        if self.cprofile is not None:
+            self.cprofile.enable()
+
+    def stop(self):
+        if self.cprofile is not None:
+            self.cprofile.disable()
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+            self.started_tracemalloc = False
+        if self.started is not None:
+            self.seconds = time.perf_counter() - self.started
+
+    def records(self):
+        with self.lock:
+            return [stats.to_dict() for stats in self.stages.values()]
+
+    # 文字摘要：每个阶段一行，嵌套的阶段缩进显示
+    def summary_lines(self):
+        lines = [f"{self.name}：总用时 {self.seconds:.3f} 秒" +
+                 (f"，内存峰值 {format_bytes(self.peak)}" if self.memory else "")]
+        lines.append("阶段\t用时(秒)\t次数\t数量\t内存峰值")
+        for stats in self.records():
+            peak = format_bytes(stats["peak_bytes"]) if self.memory else "-"
+            lines.append(f"{'  ' * stats['depth']}{stats['name']}\t{stats['seconds']:.3f}\t"
+                         f"{stats['calls']}\t{stats['count']}\t{peak}")
+        return lines
+
+    # JSON 跟踪：阶段统计，以及可在 chrome://tracing 或 Perfetto 中查看的 traceEvents
+    def to_dict(self):
+        with self.lock:
+            events = list(self.events)
+        origin = self.started if self.started is not None else (events[0][1] if events else 0.0)
+        pid = os.getpid()
+        return {
+            "name": self.name,
+            "seconds": self.seconds,
+            "peak_bytes": self.peak if self.memory else None,
+            "stages": self.records(),
+            "dropped_events": self.dropped_events,
+            "displayTimeUnit": "ms",
+            "traceEvents": [
+                {"name": name, "ph": "X", "ts": (started - origin) * 1e6, "dur": seconds * 1e6,
+                 "pid": pid, "tid": tid, "args": {"count": count}}
+                for name, started, seconds, tid, count in events],
+        }
+
+    def write_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=1)
+
+    # 保存 cProfile 数据，可用 pstats 或 snakeviz 等工具分析
+    def dump_stats(self, path):
+        if self.cprofile is None:
+            raise ValueError("未启用 cProfile")
+        self.cprofile.dump_stats(path)
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def active_profiler():
+    return _active
+
+
+# 启用剖析器：此后各线程中的 stage() 都记录到该剖析器，直到 deactivate()
+def activate(profiler):
+    global _active
+    _active = profiler
+    profiler.start()
+    return profiler
+
+
+def deactivate(profiler):
+    global _active
+    if _active is profiler:
+        _active = None
+    profiler.stop()
+    return profiler
+
+
+# 阶段计时：with stage("解析") as record: ...; record.add(数量)
+def stage(name):
+    profiler = _active
+    if profiler is None:
+        return NULL_STAGE
+    return profiler.stage(name)
+
+
+# 包装可迭代对象，累计取出每个元素所用的时间（惰性生成的结果在这里计算）；
+# size 为计数函数，例如按块迭代时传入 len
+def iter_stage(name, iterable, size=None):
+    if _active is None:
+        return iterable
+    return _iter_stage(_active, name, iterable, size)
+
+
+def _iter_stage(profiler, name, iterable, size):
+    iterator = iter(iterable)
+    while True:
+        with profiler.stage(name) as record:
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            record.add(size(item) if size is not None else 1)
+        yield item
@@ -0,0 +1,520 @@
+import asyncio
+import io
+import json
+import sys
+import time
+from collections import deque
+from http import HTTPStatus
+from ipaddress import ip_network
+from urllib.parse import parse_qsl, urlsplit
+
+from .aggregation import aggregate_subnets
+from .calculator import Calculator
+from .export import RowWriter, iter_division_chunks
+from .parallel import default_workers, process_pool, shutdown_pool
+
+DIVISION_COLUMNS = ("network", "netmask", "first", "last", "broadcast")
+VLSM_COLUMNS = DIVISION_COLUMNS + ("name",)
+DIVISION_METHODS = ("prefix", "subnets", "addresses", "vlsm")
+# 请求体上限（字节）与空闲连接的保持时间（秒）
+MAX_BODY_SIZE = 64 << 20
+KEEPALIVE_TIMEOUT = 15
+# 分页查询划分结果时的默认与最大条数；流式输出时每块的行数
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 100000
+STREAM_CHUNK_SIZE = 4096
+# 流式输出时每次交给进程池生成的行数（分为若干块写出）
+STREAM_BATCH_SIZE = 16 * STREAM_CHUNK_SIZE
+MAX_BATCH_SIZE = 1000
+# 工作量（行数）达到该值时交给进程池计算，较小的请求直接在事件循环中完成，避免进程间通信开销
+OFFLOAD_THRESHOLD = 5000
+# 每个接口保留最近多少次请求的耗时用于计算分位数
+LATENCY_WINDOW = 4096
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(status, message)
+        self.status = status
+        self.message = message
+
+
+# 响应头发出后的出错：无法再返回错误响应，只能中止输出并关闭连接
+class StreamAborted(Exception):
+    pass
+
+
+# 每个进程一个计算实例（含缓存）：服务进程与进程池的子进程各自创建
+_calculator = None
+
+
+def worker_calculator():
+    global _calculator
+    if _calculator is None:
+        _calculator = Calculator()
+    return _calculator
+
+
+# ---- 参数读取：查询字符串与 JSON 请求体合并，重复的查询参数合并为列表 ----
+
+def merge_query(query):
+    params = {}
+    for name, value in parse_qsl(query, keep_blank_values=True):
+        if name in params:
+            if not isinstance(params[name], list):
+                params[name] = [params[name]]
+            params[name].append(value)
+        else:
+            params[name] = value
+    return params
+
+
+def int_param(params, name, default=None, minimum=None, maximum=None):
+    value = params.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise HttpError(400, f"参数 {name} 必须是整数：{value}")
+    if minimum is not None and value < minimum or maximum is not None and value > maximum:
+        raise HttpError(400, f"参数 {name} 超出范围：{value}")
+    return value
+
+
+# 子网列表：JSON 数组，或以换行/逗号分隔的文本
+def lines_param(params, name):
+    value = params.get(name)
+    if value is None:
+        raise HttpError(400, f"缺少参数 {name}")
+    if isinstance(value, str):
+        return [line for line in value.replace(",", "\n").splitlines() if line.strip()]
+    if isinstance(value, list):
+        return [str(line) for line in value]
+    raise HttpError(400, f"参数 {name} 必须是数组或文本")
+
+
+def bool_param(params, name):
+    return str(params.get(name, "")).lower() in ("1", "true", "yes")
+
+
+def parse_network(text):
+    try:
+        return ip_network(str(text), strict=False)
+    except ValueError as e:
+        raise HttpError(400, f"[ {text} ] 不是一个合规的网络！\n{e}")
+
+
+# ---- 计算函数：只接收与返回可序列化的数据，可在进程池的子进程中执行 ----
+
+def info_result(subnets):
+    calculator = worker_calculator()
+    results = []
+    for subnet in subnets:
+        info = calculator.get_single_subnet_info(subnet)
+        results.append({"error": info} if isinstance(info, str) else info)
+    return results
+
+
+# 按参数划分子网，返回 (网络, 惰性子网序列)
+def divide_subnets(params):
+    methods = [method for method in DIVISION_METHODS if params.get(method) not in (None, "")]
+    if len(methods) != 1:
+        raise HttpError(400, "请指定且只指定一种划分方式：prefix / subnets / addresses / vlsm")
+    method = methods[0]
+    network = parse_network(params.get("network", ""))
+    calculator = worker_calculator()
+    if method == "vlsm":
+        try:
+            return network, calculator.calculate_subnets_by_requirements(network, str(params["vlsm"]))
+        except ValueError as e:
+            raise HttpError(400, f"分配需求有误：{e}")
+    value = int_param(params, method, minimum=0 if method == "prefix" else 1)
+    if method == "prefix":
+        return network, calculator.calculate_subnets_by_new_prefix(network, value)
+    if method == "subnets":
+        return network, calculator.calculate_subnets_by_num_subnets(network, value)
+    return network, calculator.calculate_subnets_by_num_address(network, value)
+
+
+def divide_page(params):
+    network, subnets = divide_subnets(params)
+    if not subnets:
+        raise HttpError(400, f"[ {network} ] 划分参数超出最大范围！")
+    offset = int_param(params, "offset", 0, minimum=0)
+    limit = int_param(params, "limit", DEFAULT_PAGE_SIZE, minimum=0, maximum=MAX_PAGE_SIZE)
+    stop = min(offset + limit, subnets.count)
+    rows = []
+    for chunk in iter_division_chunks(worker_calculator(), subnets, STREAM_CHUNK_SIZE, offset, stop):
+        rows.extend(chunk)
+    page = {"network": network.with_prefixlen, "count": subnets.count, "offset": offset,
+            "columns": VLSM_COLUMNS if params.get("vlsm") else DIVISION_COLUMNS, "rows": rows,
+            "next_offset": stop if stop < subnets.count else None}
+    if params.get("vlsm"):
+        page["unallocated"] = subnets.unallocated
+    return page
+
+
+# 流式输出前先划分，返回 (网络, 子网数量)；划分结果缓存在执行它的进程中，生成各段时直接使用
+def divide_count(params):
+    network, subnets = divide_subnets(params)
+    if not subnets:
+        raise HttpError(400, f"[ {network} ] 划分参数超出最大范围！")
+    return network.with_prefixlen, subnets.count
+
+
+# 生成划分结果 [start, stop) 的流式输出，每 STREAM_CHUNK_SIZE 行编码为一段字节；header 为 False 时不写 CSV 表头
+def stream_rows(params, fmt, start, stop, header):
+    _, subnets = divide_subnets(params)
+    buffer = io.StringIO()
+    # VLSM 的需求名称是用户输入的文本，需要转义，不能直接拼接
+    vlsm = bool(params.get("vlsm"))
+    out = RowWriter(buffer, fmt, VLSM_COLUMNS if vlsm else DIVISION_COLUMNS, plain=not vlsm)
+    if not header:
+        buffer.seek(0)
+        buffer.truncate()
+    pieces = []
+    for chunk in iter_division_chunks(worker_calculator(), subnets, STREAM_CHUNK_SIZE, start, stop):
+        out.writerows(chunk)
+        pieces.append(buffer.getvalue().encode("utf-8"))
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        pieces.append(buffer.getvalue().encode("utf-8"))
+    return pieces
+
+
+def aggregate_result(params):
+    subnets = lines_param(params, "subnets")
+    default = int_param(params, "prefix", minimum=0)
+    new_prefixlen = {4: int_param(params, "prefix4", default, minimum=0),
+                     6: int_param(params, "prefix6", default, minimum=0)}
+    if new_prefixlen[4] is None and new_prefixlen[6] is None:
+        raise HttpError(400, "请使用 prefix、prefix4 或 prefix6 指定期望汇总后的子网掩码")
+    # 已在服务的进程池中执行，不再嵌套启动进程池
+    result = aggregate_subnets(subnets, new_prefixlen, parallel=False)
+    return {"aggregated": [subnet.with_prefixlen for subnet in result.networks()],
+            "invalid": result.invalid_lines, "out_of_range": result.out_of_range,
+            "summary": result.summary()}
+
+
+# 请求的工作量估计（行数），用于决定是否交给进程池
+def divide_weight(params):
+    if params.get("vlsm"):
+        return OFFLOAD_THRESHOLD
+    return int_param(params, "limit", DEFAULT_PAGE_SIZE, minimum=0, maximum=MAX_PAGE_SIZE)
+
+
+def aggregate_weight(params):
+    subnets = params.get("subnets")
+    return len(subnets) if isinstance(subnets, list) else len(str(subnets or "")) // 16
+
+
+# ---- 请求耗时统计 ----
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.time()
+        self.endpoints = {}
+        self.connections = 0
+        self.in_flight = 0
+
+    def record(self, path, status, seconds):
+        endpoint = self.endpoints.get(path)
+        if endpoint is None:
+            endpoint = self.endpoints[path] = {
+                "count": 0, "errors": 0, "total": 0.0, "max": 0.0, "latencies": deque(maxlen=LATENCY_WINDOW)}
+        endpoint["count"] += 1
+        endpoint["errors"] += status >= 400
+        endpoint["total"] += seconds
+        endpoint["max"] = max(endpoint["max"], seconds)
+        endpoint["latencies"].append(seconds)
+
+    def snapshot(self):
+        endpoints = {}
+        for path, endpoint in sorted(self.endpoints.items()):
+            latencies = sorted(endpoint["latencies"])
+
+            def percentile(p):
+                return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 3)
+            endpoints[path] = {
+                "count": endpoint["count"], "errors": endpoint["errors"],
+                "latency_ms": {"avg": round(endpoint["total"] / endpoint["count"] * 1000, 3),
+                               "p50": percentile(0.5), "p90": percentile(0.9), "p99": percentile(0.99),
+                               "max": round(endpoint["max"] * 1000, 3)}}
+        return {"uptime": round(time.time() - self.started, 3), "connections": self.connections,
+                "in_flight": self.in_flight, "cache": worker_calculator().cache_summary(),
+                "endpoints": endpoints}
+
+
+# ---- HTTP/1.1：持久连接，流式结果使用分块传输编码 ----
+
+# 解析分块大小或 Content-Length；格式错误时流的位置无法确定，由调用方返回 400 并关闭连接
+def body_size(text, base, name):
+    try:
+        size = int(text, base)
+    except ValueError:
+        size = -1
+    if size < 0:
+        raise HttpError(400, f"{name}格式错误：{text!r}")
+    return size
+
+
+async def read_body(reader, headers):
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        body = bytearray()
+        while True:
+            line = (await reader.readline()).split(b";")[0].strip()
+            size = body_size(line.decode("latin-1") or "0", 16, "分块大小")
+            if size == 0:
+                await reader.readuntil(b"\r\n")
+                return bytes(body)
+            if len(body) + size > MAX_BODY_SIZE:
+                raise HttpError(413, "请求体过大")
+            body += await reader.readexactly(size)
+            await reader.readexactly(2)
+    length = body_size(headers.get("content-length") or "0", 10, "Content-Length ")
+    if length > MAX_BODY_SIZE:
+        raise HttpError(413, "请求体过大")
+    return await reader.readexactly(length) if length else b""
+
+
+# 读取一个请求，连接已关闭时返回 None
+async def read_request(reader):
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if e.partial.strip():
+            raise HttpError(400, "请求不完整")
+        return None
+    except asyncio.LimitOverrunError:
+        raise HttpError(431, "请求头过大")
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ")
+    except ValueError:
+        raise HttpError(400, "请求行格式错误")
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        if name:
+            headers[name.strip().lower()] = value.strip()
+    body = await read_body(reader, headers)
+    return method.upper(), target, version, headers, body
+
+
+def keep_alive_requested(version, headers):
+    connection = headers.get("connection", "").lower()
+    if version == "HTTP/1.0":
+        return connection == "keep-alive"
+    return connection != "close"
+
+
+def response_head(status, headers, keep_alive):
+    lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+    lines.extend(f"{name}: {value}" for name, value in headers)
+    lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+def json_response(status, payload, keep_alive):
+    body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+    return response_head(status, [("Content-Type", "application/json; charset=utf-8"),
+                                  ("Content-Length", len(body))], keep_alive) + body
+
+
+# 本地 HTTP/JSON 服务：/info、/divide、/aggregate、/batch 与 /metrics
+# workers 为进程池大小，0 表示全部在服务进程中计算
+class CalculatorServer:
+    def __init__(self, workers=None):
+        self.workers = default_workers() if workers is None else workers
+        self.metrics = RequestMetrics()
+        # 限制同时交给进程池的请求数，其余请求在事件循环中排队，不占用额外内存
+        self.pool_slots = asyncio.Semaphore(max(1, 2 * self.workers))
+        self.routes = {
+            "/info": self.handle_info,
+            "/divide": self.handle_divide,
+            "/aggregate": self.handle_aggregate,
+            "/batch": self.handle_batch,
+            "/metrics": self.handle_metrics,
+        }
+
+    async def start(self, host="127.0.0.1", port=8080):
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    # 计算量大的请求交给进程池；进程池不可用时退回当前进程
+    async def run_cpu(self, weight, func, *args):
+        if not self.workers or weight < OFFLOAD_THRESHOLD:
+            return func(*args)
+        async with self.pool_slots:
+            try:
+                pool = process_pool(self.workers)
+                return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+            except (OSError, RuntimeError, NotImplementedError):
+                shutdown_pool()
+                self.workers = 0
+                return func(*args)
+
+    async def handle_connection(self, reader, writer):
+        self.metrics.connections += 1
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    request = await asyncio.wait_for(read_request(reader), KEEPALIVE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                except HttpError as e:
+                    writer.write(json_response(e.status, {"error": e.message}, False))
+                    break
+                if request is None:
+                    break
+                method, target, version, headers, body = request
+                keep_alive = keep_alive_requested(version, headers)
+                if not await self.handle_request(writer, method, target, body, keep_alive):
+                    break
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.metrics.connections -= 1
+            writer.close()
+
+    # 处理一个请求，返回连接能否继续使用
+    async def handle_request(self, writer, method, target, body, keep_alive):
+        started = time.perf_counter()
+        url = urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+        handler = self.routes.get(path)
+        self.metrics.in_flight += 1
+        status = 200
+        aborted = False
+        try:
+            if handler is None:
+                raise HttpError(404, f"未知的接口：{path}")
+            if method not in ("GET", "POST"):
+                raise HttpError(405, f"不支持的请求方法：{method}")
+            params = merge_query(url.query)
+            if body:
+                try:
+                    payload = json.loads(body)
+                except ValueError:
+                    raise HttpError(400, "请求体不是合法的 JSON")
+                if path == "/batch" and isinstance(payload, list):
+                    payload = {"requests": payload}
+                if not isinstance(payload, dict):
+                    raise HttpError(400, "请求体必须是 JSON 对象")
+                params.update(payload)
+            status = await handler(writer, params, keep_alive)
+        except HttpError as e:
+            status = e.status
+            writer.write(json_response(status, {"error": e.message}, keep_alive))
+        except StreamAborted as e:
+            # 不写结束块，客户端据此得知结果不完整；连接随后关闭，不会被后续请求误读
+            status = 500
+            aborted = True
+            print(f"{method} {target} 流式输出中断：{e.__cause__!r}", file=sys.stderr)
+        except ConnectionError:
+            raise
+        except Exception as e:
+            status = 500
+            print(f"{method} {target} 处理失败：{e!r}", file=sys.stderr)
+            writer.write(json_response(status, {"error": "服务器内部错误"}, keep_alive))
+        finally:
+            self.metrics.in_flight -= 1
+        await writer.drain()
+        self.metrics.record(path if handler else "other", status, time.perf_counter() - started)
+        return not aborted
+
+    # 处理单个接口调用，返回 (状态码, 结果)；供普通请求与批量请求共用
+    async def dispatch(self, path, params):
+        try:
+            if path == "/info":
+                if "subnets" in params:
+                    subnets = lines_param(params, "subnets")
+                    return 200, {"results": await self.run_cpu(len(subnets), info_result, subnets)}
+                result = info_result([params.get("subnet", "")])[0]
+                return (400 if "error" in result else 200), result
+            if path == "/divide":
+                return 200, await self.run_cpu(divide_weight(params), divide_page, params)
+            if path == "/aggregate":
+                return 200, await self.run_cpu(aggregate_weight(params), aggregate_result, params)
+            raise HttpError(404, f"未知的接口：{path}")
+        except HttpError as e:
+            return e.status, {"error": e.message}
+
+    async def handle_info(self, writer, params, keep_alive):
+        status, payload = await self.dispatch("/info", params)
+        writer.write(json_response(status, payload, keep_alive))
+        return status
+
+    # 默认分页返回；stream=1 时以分块传输流式输出全部结果（JSON Lines 或 CSV）；
+    # 划分（VLSM 分配）与生成各段输出和分页请求一样交给进程池，不阻塞其他连接
+    async def handle_divide(self, writer, params, keep_alive):
+        if not bool_param(params, "stream"):
+            status, payload = await self.dispatch("/divide", params)
+            writer.write(json_response(status, payload, keep_alive))
+            return status
+        fmt = params.get("format", "jsonl")
+        if fmt not in ("jsonl", "csv"):
+            raise HttpError(400, f"不支持的输出格式：{fmt}")
+        offset = int_param(params, "offset", 0, minimum=0)
+        limit = int_param(params, "limit", minimum=0)
+        # 只有 VLSM 需要先分配，其余方式的划分结果是惰性序列
+        _, count = await self.run_cpu(OFFLOAD_THRESHOLD if params.get("vlsm") else 0, divide_count, params)
+        stop = count if limit is None else min(offset + limit, count)
+        content_type = "application/x-ndjson" if fmt == "jsonl" else "text/csv"
+        writer.write(response_head(200, [("Content-Type", f"{content_type}; charset=utf-8"),
+                                         ("Transfer-Encoding", "chunked"),
+                                         ("X-Total-Count", count)], keep_alive))
+        try:
+            for start in range(offset, max(stop, offset + 1), STREAM_BATCH_SIZE):
+                end = min(start + STREAM_BATCH_SIZE, stop)
+                pieces = await self.run_cpu(end - start, stream_rows, params, fmt, start, end, start == offset)
+                for data in pieces:
+                    writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+                    # 等待客户端读取，慢速客户端不会让结果在内存中堆积
+                    await writer.drain()
+        except ConnectionError:
+            raise
+        except Exception as e:
+            raise StreamAborted() from e
+        writer.write(b"0\r\n\r\n")
+        return 200
+
+    async def handle_aggregate(self, writer, params, keep_alive):
+        status, payload = await self.dispatch("/aggregate", params)
+        writer.write(json_response(status, payload, keep_alive))
+        return status
+
+    # 批量请求：{"requests": [{"path": "/info", "params": {...}}, ...]}，各项并发执行，结果按顺序返回
+    async def handle_batch(self, writer, params, keep_alive):
+        requests = params.get("requests")
+        if not isinstance(requests, list):
+            raise HttpError(400, "缺少参数 requests（数组）")
+        if len(requests) > MAX_BATCH_SIZE:
+            raise HttpError(413, f"批量请求最多 {MAX_BATCH_SIZE} 项")
+        calls = []
+        for item in requests:
+            if not isinstance(item, dict) or not isinstance(item.get("params", {}), dict):
+                raise HttpError(400, "批量请求的每一项必须是 {\"path\": ..., \"params\": {...}}")
+            calls.append(self.dispatch(str(item.get("path", "")).rstrip("/"), item.get("params", {})))
+        results = await asyncio.gather(*calls)
+        payload = {"results": [{"status": status, "body": body} for status, body in results]}
+        writer.write(json_response(200, payload, keep_alive))
+        return 200
+
+    async def handle_metrics(self, writer, params, keep_alive):
+        writer.write(json_response(200, self.metrics.snapshot(), keep_alive))
+        return 200
+
+
+async def serve(host="127.0.0.1", port=8080, workers=None):
+    server = await CalculatorServer(workers).start(host, port)
+    addresses = ", ".join(f"http://{sock.getsockname()[0]}:{sock.getsockname()[1]}" for sock in server.sockets)
+    print(f"服务已启动：{addresses}", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        shutdown_pool()
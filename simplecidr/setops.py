@@ -0,0 +1,197 @@
+import time
+
+from .aggregation import MAX_PREFIXLEN, NETWORK_CLASS, range_to_cidrs
+from .parser import parse_lines
+from .subnetinfo import format_address
+
+OVERLAP = "overlap"
+
+
+# 将 (网络地址, 前缀长度) 转换为合并后的有序不相交区间 [(起始, 结束), ...]
+def merge_intervals(prefixes, max_prefixlen):
+    # 网络地址与前缀长度编码为一个整数，排序整数比排序元组更快；重复项不影响合并
+    keys = sorted([base << 8 | prefixlen for base, prefixlen in prefixes])
+    merged = []
+    current_start = current_end = -2
+    for key in keys:
+        start = key >> 8
+        end = start + (1 << (max_prefixlen - (key & 0xFF))) - 1
+        if start <= current_end + 1:
+            if end > current_end:
+                current_end = end
+            continue
+        if current_start >= 0:
+            merged.append((current_start, current_end))
+        current_start, current_end = start, end
+    if current_start >= 0:
+        merged.append((current_start, current_end))
+    return merged
+
+
+# 以下运算的输入均为有序、不相交且不相邻的区间列表 [(起始, 结束), ...]，双指针线性归并，
+# 结果保持同样的性质
+
+# 并集：按起点归并后合并重叠与相邻的区间
+def union_intervals(left, right):
+    result = []
+    i = j = 0
+    while i < len(left) or j < len(right):
+        if j >= len(right) or i < len(left) and left[i][0] <= right[j][0]:
+            start, end = left[i]
+            i += 1
+        else:
+            start, end = right[j]
+            j += 1
+        if result and start <= result[-1][1] + 1:
+            if end > result[-1][1]:
+                result[-1] = (result[-1][0], end)
+        else:
+            result.append((start, end))
+    return result
+
+
+# 交集：两侧区间的重叠部分，结束得早的一侧前进
+def intersect_intervals(left, right):
+    result = []
+    i = j = 0
+    while i < len(left) and j < len(right):
+        left_start, left_end = left[i]
+        right_start, right_end = right[j]
+        start = left_start if left_start > right_start else right_start
+        end = left_end if left_end < right_end else right_end
+        if start <= end:
+            result.append((start, end))
+        if left_end < right_end:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+# 差集：从左侧每个区间中依次扣除与之重叠的右侧区间
+def difference_intervals(left, right):
+    result = []
+    j = 0
+    for start, end in left:
+        while j < len(right) and right[j][1] < start:
+            j += 1
+        k = j
+        while k < len(right) and right[k][0] <= end:
+            if right[k][0] > start:
+                result.append((start, right[k][0] - 1))
+            start = right[k][1] + 1
+            if start > end:
+                break
+            k += 1
+        if start <= end:
+            result.append((start, end))
+    return result
+
+
+# 对称差：并集减去交集
+def symmetric_difference_intervals(left, right):
+    return difference_intervals(union_intervals(left, right), intersect_intervals(left, right))
+
+
+OPERATIONS = {
+    "union": union_intervals,
+    "intersect": intersect_intervals,
+    "difference": difference_intervals,
+    "symdiff": symmetric_difference_intervals,
+}
+
+
+# 区间转换为最少的 CIDR 前缀
+def intervals_to_prefixes(intervals, max_prefixlen):
+    prefixes = []
+    for start, end in intervals:
+        prefixes.extend(range_to_cidrs(start, end, max_prefixlen))
+    return prefixes
+
+
+# 重叠检测：找出两侧相互包含的前缀对 ((网络地址, 前缀长度), (网络地址, 前缀长度))；
+# CIDR 前缀之间只有包含或不相交，按起点扫描时仍在栈中的对侧前缀必然包含当前前缀
+def find_overlaps(left, right, max_prefixlen):
+    # 事件编码为整数 (网络地址, 前缀长度, 来源)，同一起点时短前缀（外层）在前
+    events = sorted({base << 9 | prefixlen << 1 for base, prefixlen in left} |
+                    {base << 9 | prefixlen << 1 | 1 for base, prefixlen in right})
+    stacks = ([], [])
+    overlaps = []
+    for event in events:
+        base = event >> 9
+        prefixlen = event >> 1 & 0xFF
+        side = event & 1
+        for stack in stacks:
+            while stack and stack[-1][1] < base:
+                stack.pop()
+        prefix = (base, prefixlen)
+        for other, _ in stacks[1 - side]:
+            overlaps.append((prefix, other) if side == 0 else (other, prefix))
+        stacks[side].append((prefix, base + (1 << (max_prefixlen - prefixlen)) - 1))
+    return overlaps
+
+
+# 集合运算结果：按协议版本保存结果前缀（或重叠的前缀对），以及两侧无法解析的行
+class SetOperationResult:
+    def __init__(self, operation):
+        self.operation = operation
+        self.prefixes = {4: [], 6: []}
+        self.overlaps = {4: [], 6: []}
+        self.invalid_lines = {"A": [], "B": []}
+        self.input_count = {"A": 0, "B": 0}
+        self.seconds = 0.0
+
+    def __len__(self):
+        if self.operation == OVERLAP:
+            return len(self.overlaps[4]) + len(self.overlaps[6])
+        return len(self.prefixes[4]) + len(self.prefixes[6])
+
+    # 转换为 ip_network 对象列表，IPv4 在前、IPv6 在后
+    def networks(self):
+        return [NETWORK_CLASS[version]((base, prefixlen))
+                for version in (4, 6) for base, prefixlen in self.prefixes[version]]
+
+    # 结果行：集合运算为 (子网, 地址数量)，重叠检测为 (A 中的子网, B 中的子网)
+    def rows(self):
+        for version in (4, 6):
+            max_prefixlen = MAX_PREFIXLEN[version]
+            if self.operation == OVERLAP:
+                for (left_base, left_prefixlen), (right_base, right_prefixlen) in self.overlaps[version]:
+                    yield (f"{format_address(version, left_base)}/{left_prefixlen}",
+                           f"{format_address(version, right_base)}/{right_prefixlen}")
+            else:
+                for base, prefixlen in self.prefixes[version]:
+                    yield (f"{format_address(version, base)}/{prefixlen}",
+                           1 << (max_prefixlen - prefixlen))
+
+    def summary(self):
+        text = f"A: {self.input_count['A']} 个前缀，B: {self.input_count['B']} 个前缀 -> {len(self)} 项，" \
+               f"用时 {self.seconds:.3f} 秒"
+        invalid = len(self.invalid_lines["A"]) + len(self.invalid_lines["B"])
+        if invalid:
+            text += f"；无效 {invalid} 行"
+        return text
+
+
+# 对两组子网文本做集合运算：union / intersect / difference / symdiff / overlap，
+# 结果为最少的 CIDR 集合（重叠检测返回相互包含的前缀对）
+def set_operation(operation, left_lines, right_lines, parallel=True):
+    if operation != OVERLAP and operation not in OPERATIONS:
+        raise ValueError(f"不支持的集合运算：{operation}")
+    started = time.perf_counter()
+    result = SetOperationResult(operation)
+    left = parse_lines(left_lines, parallel=parallel)
+    right = parse_lines(right_lines, parallel=parallel)
+    result.invalid_lines = {"A": left.invalid, "B": right.invalid}
+    result.input_count = {"A": len(left), "B": len(right)}
+    for version in (4, 6):
+        max_prefixlen = MAX_PREFIXLEN[version]
+        if operation == OVERLAP:
+            result.overlaps[version] = find_overlaps(
+                left.prefixes[version], right.prefixes[version], max_prefixlen)
+            continue
+        intervals = OPERATIONS[operation](merge_intervals(left.prefixes[version], max_prefixlen),
+                                          merge_intervals(right.prefixes[version], max_prefixlen))
+        result.prefixes[version] = intervals_to_prefixes(intervals, max_prefixlen)
+    result.seconds = time.perf_counter() - started
+    return result
@@ -0,0 +1,99 @@
+import gzip
+import mmap
+import os
+from csv import reader
+from itertools import islice
+
+from .prefixset import PrefixSet, is_prefix_set_file
+
+# 每次从内存映射中解码的块大小
+BLOCK_SIZE = 4 << 20
+PREVIEW_LINES = 200
+PREFIX_FILETYPES = [
+    ("Prefix Files", "*.txt *.csv *.gz *.cidrset"),
+    ("Text Files", "*.txt"),
+    ("CSV Files", "*.csv"),
+    ("Gzip Files", "*.gz"),
+    ("Prefix Set Files", "*.cidrset"),
+    ("All Files", "*.*"),
+]
+
+
+def is_gzip_file(path):
+    with open(path, "rb") as f:
+        return f.read(2) == b"\x1f\x8b"
+
+
+def is_csv_file(path):
+    name = str(path).lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    return name.endswith(".csv")
+
+
+# 逐行读取前缀文件：纯文本使用内存映射分块解码，gzip 流式解压，CSV 取指定列，
+# 二进制前缀集按记录产出 CIDR 文本；每个物理行对应产出一行（CSV 表头产出空行），行号与文件保持一致
+def iter_prefix_file(path, column=0):
+    if is_prefix_set_file(path):
+        with PrefixSet.open(path) as prefix_set:
+            yield from prefix_set.cidrs()
+        return
+    if is_gzip_file(path):
+        stream = gzip.open(path, mode="rt", encoding="utf-8-sig", errors="replace", newline="")
+        lines = (line.rstrip("\r\n") for line in stream)
+    else:
+        stream = None
+        lines = iter_mapped_lines(path)
+    try:
+        if is_csv_file(path):
+            yield from iter_csv_column(lines, column)
+        else:
+            yield from lines
+    finally:
+        if stream is not None:
+            stream.close()
+
+
+# 通过内存映射按块读取文本文件，避免逐行系统调用与整文件复制
+def iter_mapped_lines(path, block_size=BLOCK_SIZE):
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = 0
+            while pos < size:
+                end = min(pos + block_size, size)
+                if end < size:
+                    # 在块内最后一个换行处截断，超长行则向后找到行尾
+                    newline = mm.rfind(b"\n", pos, end)
+                    if newline < 0:
+                        newline = mm.find(b"\n", end)
+                    end = size if newline < 0 else newline + 1
+                block = mm[pos:end].decode("utf-8", "replace")
+                if pos == 0 and block.startswith("\ufeff"):
+                    block = block[1:]
+                pos = end
+                lines = block.split("\n")
+                if lines[-1] == "":
+                    lines.pop()
+                for line in lines:
+                    yield line.rstrip("\r")
+
+
+# 取 CSV 的某一列；第一行不含数字时视为表头
+def iter_csv_column(lines, column=0):
+    first = True
+    for row in reader(lines):
+        cell = row[column] if len(row) > column else ""
+        if first:
+            first = False
+            if cell and not any(ch.isdigit() for ch in cell):
+                yield ""
+                continue
+        yield cell
+
+
+# 预览文件的前 n 行
+def preview_prefix_file(path, n=PREVIEW_LINES):
+    return list(islice(iter_prefix_file(path), n))
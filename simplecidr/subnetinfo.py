@@ -0,0 +1,235 @@
+from array import array
+from itertools import repeat
+from struct import Struct
+from ipaddress import IPv6Address, ip_network
+
+IPV4_MAX = 0xFFFFFFFF
+IPV6_MAX = (1 << 128) - 1
+_OCTETS = [str(i) for i in range(256)]
+# 连续零段，从长到短查找，保证与 ipaddress 一样压缩第一个最长的零段
+_ZERO_RUNS = [":" + "0:" * n for n in range(8, 1, -1)]
+_HEXTETS = Struct(">8H")
+
+
+# 整数格式化为 IPv4 点分十进制字符串
+def format_ipv4(value):
+    return f"{value >> 24}.{(value >> 16) & 255}.{(value >> 8) & 255}.{value & 255}"
+
+
+# 整数格式化为 IPv6 字符串（压缩格式与 ipaddress 保持一致）
+def format_ipv6(value):
+    # IPv4 映射地址的显示格式随 Python 版本变化，交给 ipaddress 处理
+    if value >> 32 == 0xFFFF:
+        return str(IPv6Address(value))
+    text = ":%x:%x:%x:%x:%x:%x:%x:%x:" % _HEXTETS.unpack(value.to_bytes(16, "big"))
+    if ":0:0:" in text:
+        for run in _ZERO_RUNS:
+            i = text.find(run)
+            if i >= 0:
+                text = text[:i] + "::" + text[i + len(run):]
+                break
+    if not text.startswith("::"):
+        text = text[1:]
+    if not text.endswith("::"):
+        text = text[:-1]
+    return text
+
+
+def format_address(version, value):
+    return format_ipv4(value) if version == 4 else format_ipv6(value)
+
+
+# 32 位无符号整数数组，用于存放 IPv4 地址
+def ipv4_array(values=()):
+    return array('I' if array('I').itemsize == 4 else 'L', values)
+
+
+def max_prefixlen_of(version):
+    return 32 if version == 4 else 128
+
+
+# 由前缀长度计算子网掩码（整数）
+def netmask_of(version, prefixlen):
+    bits = max_prefixlen_of(version)
+    return ((1 << prefixlen) - 1) << (bits - prefixlen)
+
+
+# 计算子网的首个可用地址、最后可用地址和广播地址（整数）
+# /31 与 /32（IPv6 为 /127 与 /128）按 get_single_subnet_info 的规则处理
+def host_range_of(version, base, prefixlen):
+    host_bits = max_prefixlen_of(version) - prefixlen
+    broadcast = base | ((1 << host_bits) - 1)
+    if host_bits == 1:
+        return base, broadcast, broadcast
+    if host_bits == 0:
+        return base, base, broadcast
+    return base + 1, broadcast - 1, broadcast
+
+
+# 单个子网的紧凑记录，只保存整数，显示时才格式化
+class SubnetInfo:
+    __slots__ = ('version', 'base', 'prefixlen')
+
+    def __init__(self, version, base, prefixlen):
+        self.version = version
+        self.base = base
+        self.prefixlen = prefixlen
+
+    @classmethod
+    def from_network(cls, network):
+        return cls(network.version, int(network.network_address), network.prefixlen)
+
+    @property
+    def max_prefixlen(self):
+        return max_prefixlen_of(self.version)
+
+    @property
+    def netmask(self):
+        return netmask_of(self.version, self.prefixlen)
+
+    @property
+    def hostmask(self):
+        return (1 << (self.max_prefixlen - self.prefixlen)) - 1
+
+    @property
+    def broadcast(self):
+        return self.base | self.hostmask
+
+    @property
+    def num_addresses(self):
+        return 1 << (self.max_prefixlen - self.prefixlen)
+
+    @property
+    def host_addresses(self):
+        host_bits = self.max_prefixlen - self.prefixlen
+        if host_bits <= 1:
+            return 1 << host_bits
+        return (1 << host_bits) - 2
+
+    # 与 get_multiple_subnet_info 相同的五元组：子网、掩码、首个可用、最后可用、广播
+    def brief(self):
+        return next(iter_brief_rows(self.version, (self.base,), (self.prefixlen,)))
+
+    def __repr__(self):
+        return f"SubnetInfo({format_address(self.version, self.base)}/{self.prefixlen})"
+
+
+# 批量子网记录：网络地址与前缀长度分别存放在数组中，按需格式化为行
+class SubnetInfoBlock:
+    def __init__(self, version):
+        self.version = version
+        # IPv4 地址可放入 32 位无符号数组，IPv6 只能使用整数列表
+        self.bases = ipv4_array() if version == 4 else []
+        self.prefixlens = array('B')
+
+    @classmethod
+    def from_subnet_range(cls, subnet_range):
+        block = cls(subnet_range.version)
+        if subnet_range.count:
+            base, step = subnet_range.base, subnet_range.step
+            block.bases.extend(range(base, base + step * subnet_range.count, step))
+            block.prefixlens = array('B', [subnet_range.new_prefixlen]) * subnet_range.count
+        return block
+
+    def append(self, base, prefixlen):
+        self.bases.append(base)
+        self.prefixlens.append(prefixlen)
+
+    def __len__(self):
+        return len(self.bases)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return SubnetInfo(self.version, self.bases[i], self.prefixlens[i]).brief()
+
+    def __iter__(self):
+        return iter_brief_rows(self.version, self.bases, self.prefixlens)
+
+
+# 批量生成五元组行；同一前缀长度的掩码只格式化一次
+def iter_brief_rows(version, bases, prefixlens):
+    if version == 4:
+        return _iter_ipv4_brief_rows(bases, prefixlens)
+    return _iter_ipv6_brief_rows(bases, prefixlens)
+
+
+# IPv4 专用：复用同一 /24 内地址的前三段字符串，避免逐个格式化
+def _iter_ipv4_brief_rows(bases, prefixlens):
+    octets = _OCTETS
+    head_key = -1
+    head = ""
+    last_prefixlen = None
+    for base, prefixlen in zip(bases, prefixlens):
+        if prefixlen != last_prefixlen:
+            last_prefixlen = prefixlen
+            netmask = format_ipv4(netmask_of(4, prefixlen))
+            host_bits = 32 - prefixlen
+            hostmask = (1 << host_bits) - 1
+            suffix = f"/{prefixlen}"
+        if base >> 8 != head_key:
+            head_key = base >> 8
+            head = f"{head_key >> 16}.{(head_key >> 8) & 255}.{head_key & 255}."
+        network = head + octets[base & 255]
+        broadcast = base | hostmask
+        if host_bits > 1:
+            # 网络地址按至少 2 位对齐，首个可用地址一定与其位于同一 /24
+            first = head + octets[(base + 1) & 255]
+            if broadcast >> 8 == head_key:
+                yield (network + suffix, netmask, first,
+                       head + octets[(broadcast - 1) & 255], head + octets[broadcast & 255])
+            else:
+                yield (network + suffix, netmask, first,
+                       format_ipv4(broadcast - 1), format_ipv4(broadcast))
+        elif host_bits == 1:
+            broadcast = head + octets[broadcast & 255]
+            yield (network + suffix, netmask, network, broadcast, broadcast)
+        else:
+            yield (network + suffix, netmask, network, network, network)
+
+
+def _iter_ipv6_brief_rows(bases, prefixlens):
+    fmt = format_ipv6
+    max_prefixlen = 128
+    last_prefixlen = None
+    for base, prefixlen in zip(bases, prefixlens):
+        if prefixlen != last_prefixlen:
+            last_prefixlen = prefixlen
+            netmask = fmt(netmask_of(6, prefixlen))
+            host_bits = max_prefixlen - prefixlen
+            hostmask = (1 << host_bits) - 1
+            suffix = f"/{prefixlen}"
+        network = fmt(base)
+        broadcast = base | hostmask
+        if host_bits > 1:
+            yield (network + suffix, netmask, fmt(base + 1), fmt(broadcast - 1), fmt(broadcast))
+        elif host_bits == 1:
+            broadcast = fmt(broadcast)
+            yield (network + suffix, netmask, network, broadcast, broadcast)
+        else:
+            yield (network + suffix, netmask, network, network, network)
+
+
+# 将子网序列（惰性子网序列、SubnetInfo 或 ip_network）转换为五元组行
+def brief_rows(subnets):
+    # 惰性子网序列直接按步长计算网络地址
+    if hasattr(subnets, 'step') and hasattr(subnets, 'new_prefixlen'):
+        if not subnets.count:
+            return []
+        base, step = subnets.base, subnets.step
+        bases = range(base, base + step * subnets.count, step)
+        prefixlens = repeat(subnets.new_prefixlen, subnets.count)
+        return list(iter_brief_rows(subnets.version, bases, prefixlens))
+    # 按列存放的批量记录（例如前缀集的一段）
+    if hasattr(subnets, 'bases') and hasattr(subnets, 'prefixlens'):
+        return list(iter_brief_rows(subnets.version, subnets.bases, subnets.prefixlens))
+    rows = []
+    for subnet in subnets:
+        if isinstance(subnet, SubnetInfo):
+            rows.append(subnet.brief())
+        else:
+            if isinstance(subnet, str):
+                subnet = ip_network(subnet, strict=False)
+            rows.extend(iter_brief_rows(
+                subnet.version, (int(subnet.network_address),), (subnet.prefixlen,)))
+    return rows
@@ -0,0 +1,113 @@
+from bisect import bisect_left, bisect_right
+
+from .parser import parse_prefix
+
+# 排序与筛选需要把所有行放进内存，超过该行数时不建立索引（请导出后处理）
+MAX_INDEX_ROWS = 500000
+FILTER_MODES = ("substring", "prefix")
+
+
+# 排序键：地址与网络按 (协议版本, 整数地址, 前缀长度) 比较，其他内容按文本比较
+def sort_key(value):
+    try:
+        return (0,) + parse_prefix(value)
+    except ValueError:
+        return (1, 0, 0, 0, value)
+
+
+# 表格行的内存索引：排序与筛选都在这里完成，不读取界面组件；
+# 子串筛选在所有行拼接成的一个字符串上查找，前缀筛选在各列的有序值上二分查找
+class TableIndex:
+    def __init__(self, columns, rows):
+        self.columns = tuple(columns)
+        self.rows = rows
+        # 每行一段 "列1\t列2\t...\n"，line_starts[i] 为第 i 行的起始偏移
+        lines = ["\t".join(row).lower() for row in rows]
+        self.text = "\n".join(lines) + "\n"
+        self.line_starts = []
+        offset = 0
+        for line in lines:
+            self.line_starts.append(offset)
+            offset += len(line) + 1
+        self.sorted_values = {}
+        self.ranks = {}
+
+    @classmethod
+    def from_chunks(cls, columns, chunks, progress=None):
+        rows = []
+        for chunk in chunks:
+            rows.extend(chunk)
+            if progress is not None:
+                progress(len(rows))
+        return cls(columns, rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    # 预先建立各列的有序值（可在后台线程中调用），之后的前缀筛选只需二分查找
+    def prepare(self):
+        for column in range(len(self.columns)):
+            self.column_values(column)
+        return self
+
+    # 包含 text 的行号（按原顺序），不区分大小写
+    def find_substring(self, text):
+        text = text.lower()
+        if not text:
+            return list(range(len(self.rows)))
+        haystack = self.text
+        line_starts = self.line_starts
+        matches = []
+        find = haystack.find
+        position = find(text)
+        while position >= 0:
+            row = bisect_right(line_starts, position) - 1
+            matches.append(row)
+            # 同一行只记一次，从下一行开头继续查找
+            next_start = line_starts[row + 1] if row + 1 < len(line_starts) else len(haystack)
+            position = find(text, next_start)
+        return matches
+
+    # 任一列以 text 开头的行号（按原顺序）
+    def find_prefix(self, text):
+        text = text.lower()
+        if not text:
+            return list(range(len(self.rows)))
+        matches = set()
+        for column in range(len(self.columns)):
+            values, rows = self.column_values(column)
+            lo = bisect_left(values, text)
+            hi = bisect_left(values, text + "\uffff", lo)
+            matches.update(rows[lo:hi])
+        return sorted(matches)
+
+    # 某一列的 (有序的小写值, 对应行号)，首次使用时建立
+    def column_values(self, column):
+        cached = self.sorted_values.get(column)
+        if cached is None:
+            pairs = sorted((row[column].lower(), i) for i, row in enumerate(self.rows))
+            cached = self.sorted_values[column] = ([value for value, _ in pairs], [i for _, i in pairs])
+        return cached
+
+    # 某一列每行的名次，按名次排序比每次重新比较排序键快
+    def column_ranks(self, column):
+        ranks = self.ranks.get(column)
+        if ranks is None:
+            order = sorted(range(len(self.rows)), key=lambda i: sort_key(self.rows[i][column]))
+            ranks = [0] * len(order)
+            for rank, i in enumerate(order):
+                ranks[i] = rank
+            self.ranks[column] = ranks
+        return ranks
+
+    # 当前视图：先筛选再排序，返回行号列表
+    def view(self, text="", mode="substring", sort_column=None, reverse=False):
+        if mode == "prefix":
+            order = self.find_prefix(text)
+        else:
+            order = self.find_substring(text)
+        if sort_column is not None:
+            order.sort(key=self.column_ranks(self.columns.index(sort_column)).__getitem__, reverse=reverse)
+        elif reverse:
+            order.reverse()
+        return order
@@ -0,0 +1,101 @@
+import threading
+import time
+from queue import Empty, Queue
+
+
+# 任务被用户取消
+class TaskCancelled(Exception):
+    pass
+
+
+# 在后台线程中运行耗时计算；结果与进度通过队列交回调用方（例如 Tk 的 after 轮询）
+# func 的第一个参数为任务本身，可调用 report() 汇报进度、emit() 分批返回结果
+class BackgroundTask:
+    def __init__(self, func, *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.events = Queue()
+        self.cancel_event = threading.Event()
+        self.done = 0
+        self.total = 0
+        self.started_at = None
+        self.finished_at = None
+        self.thread = None
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def _run(self):
+        try:
+            result = self.func(self, *self.args, **self.kwargs)
+            self.events.put(("done", result))
+        except TaskCancelled:
+            self.events.put(("cancelled", None))
+        except Exception as e:
+            self.events.put(("error", e))
+        finally:
+            self.finished_at = time.perf_counter()
+
+    # 请求取消，计算函数在下一次 report() / emit() 时退出
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise TaskCancelled()
+
+    # 汇报进度（已处理数量与总数，总数未知时为 0）
+    def report(self, done, total=None):
+        self.check_cancelled()
+        self.done = done
+        if total is not None:
+            self.total = total
+
+    # 分批返回结果
+    def emit(self, batch):
+        self.check_cancelled()
+        self.events.put(("batch", batch))
+
+    # 包装可迭代对象，每处理 step 个元素汇报一次进度
+    def track(self, iterable, total=0, step=4096):
+        self.report(0, total)
+        done = 0
+        for item in iterable:
+            yield item
+            done += 1
+            if done % step == 0:
+                self.report(done)
+        self.report(done)
+
+    # 取出队列中所有事件（非阻塞）
+    def poll(self):
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except Empty:
+                return events
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return end - self.started_at
+
+    @property
+    def rate(self):
+        elapsed = self.elapsed
+        return self.done / elapsed if elapsed > 0 else 0.0
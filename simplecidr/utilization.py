@@ -0,0 +1,144 @@
+import time
+from bisect import bisect_right
+from collections import Counter
+from ipaddress import ip_network
+
+from .aggregation import MAX_PREFIXLEN
+from .parser import parse_lines
+from .setops import difference_intervals, intersect_intervals, intervals_to_prefixes, merge_intervals
+from .subnetinfo import format_address
+
+# 热力图的格子数（64 x 64），每个格子是视图内等大的一段地址
+GRID_COLUMNS = 64
+GRID_CELLS = GRID_COLUMNS * GRID_COLUMNS
+
+
+# 地址空间利用率：父网络内已分配的区间（合并后）、空闲块与统计
+class UtilizationReport:
+    def __init__(self, network):
+        self.network = network
+        self.version = network.version
+        self.max_prefixlen = MAX_PREFIXLEN[network.version]
+        self.start = int(network.network_address)
+        self.end = self.start + network.num_addresses - 1
+        self.total = network.num_addresses
+        # 已分配区间（与父网络求交后合并）；cumulative[i] 为第 i 个区间之前的已分配地址数，
+        # 最后一项为总数，用于按范围统计
+        self.used_starts = []
+        self.used_ends = []
+        self.cumulative = [0]
+        self.free_blocks = []
+        self.allocated_count = 0
+        self.outside_count = 0
+        self.invalid_lines = []
+        self.seconds = 0.0
+
+    @property
+    def used_addresses(self):
+        return self.cumulative[-1]
+
+    @property
+    def free_addresses(self):
+        return self.total - self.used_addresses
+
+    @property
+    def utilization(self):
+        return self.used_addresses / self.total
+
+    # [start, stop) 范围内已分配的地址数：二分查找 + 累计数，与区间数量无关
+    def used_before(self, address):
+        i = bisect_right(self.used_starts, address) - 1
+        if i < 0:
+            return 0
+        return self.cumulative[i] + min(address, self.used_ends[i] + 1) - self.used_starts[i]
+
+    def used_between(self, start, stop):
+        return self.used_before(stop) - self.used_before(start)
+
+    # 视图（网络地址, 前缀长度）按格子聚合的利用率，返回 (每格地址数, [0~1, ...])
+    def grid(self, base, prefixlen, cells=GRID_CELLS):
+        size = 1 << (self.max_prefixlen - prefixlen)
+        cells = min(cells, size)
+        cell_size = size // cells
+        used = [self.used_before(base + i * cell_size) for i in range(cells + 1)]
+        return cell_size, [(used[i + 1] - used[i]) / cell_size for i in range(cells)]
+
+    # 按前缀长度统计空闲：正好为该长度的空闲块数量，以及还能分配多少个该长度的子网；
+    # 空闲区间拆分出的 CIDR 是其中最大的对齐块，任何对齐的子网都只落在其中一个块内
+    def free_by_prefixlen(self):
+        counts = Counter(prefixlen for _, prefixlen in self.free_blocks)
+        rows = []
+        capacity = 0
+        for prefixlen in range(self.network.prefixlen, self.max_prefixlen + 1):
+            capacity = capacity * 2 + counts[prefixlen]
+            if capacity:
+                rows.append((prefixlen, counts[prefixlen], capacity))
+        return rows
+
+    # 最大的空闲块（CIDR）与最长的连续空闲区间
+    def largest_free_block(self):
+        if not self.free_blocks:
+            return None
+        return min(self.free_blocks, key=lambda block: (block[1], block[0]))
+
+    def largest_free_range(self):
+        free = difference_intervals([(self.start, self.end)], list(zip(self.used_starts, self.used_ends)))
+        if not free:
+            return None
+        return max(free, key=lambda interval: (interval[1] - interval[0], -interval[0]))
+
+    def free_cidrs(self):
+        version = self.version
+        for base, prefixlen in self.free_blocks:
+            yield f"{format_address(version, base)}/{prefixlen}"
+
+    def summary(self):
+        text = f"{self.network}：已分配 {self.used_addresses} / {self.total} 个地址，" \
+               f"利用率 {self.utilization:.2%}，空闲块 {len(self.free_blocks)} 个"
+        largest = self.largest_free_block()
+        if largest is not None:
+            text += f"，最大空闲块 {format_address(self.version, largest[0])}/{largest[1]}"
+        if self.outside_count:
+            text += f"；{self.outside_count} 个前缀不在父网络内"
+        if self.invalid_lines:
+            text += f"；无效 {len(self.invalid_lines)} 行"
+        return text + f"（用时 {self.seconds:.3f} 秒）"
+
+    # 文字报告：摘要、最长连续空闲区间与各前缀长度的空闲统计
+    def report_lines(self):
+        lines = [self.summary()]
+        free_range = self.largest_free_range()
+        if free_range is not None:
+            lines.append(f"最长连续空闲区间：{format_address(self.version, free_range[0])} - "
+                         f"{format_address(self.version, free_range[1])}（{free_range[1] - free_range[0] + 1} 个地址）")
+        lines.append("前缀长度\t空闲块\t可分配数量")
+        lines.extend(f"/{prefixlen}\t{blocks}\t{capacity}" for prefixlen, blocks, capacity in self.free_by_prefixlen())
+        return lines
+
+
+# 分析父网络的地址空间利用率：已分配前缀先合并为有序区间，与父网络求交，
+# 再由父网络减去已分配区间得到空闲区间并拆分为最少的 CIDR，整体 O(n log n)
+def analyze_utilization(network, allocated_lines):
+    started = time.perf_counter()
+    if not hasattr(network, "network_address"):
+        network = ip_network(network, strict=False)
+    report = UtilizationReport(network)
+    parsed = parse_lines(allocated_lines)
+    report.invalid_lines = parsed.invalid
+    prefixes = parsed.prefixes[report.version]
+    report.allocated_count = len(prefixes)
+    max_prefixlen = report.max_prefixlen
+    parent = [(report.start, report.end)]
+    used = intersect_intervals(merge_intervals(prefixes, max_prefixlen), parent)
+    # 不在父网络内的前缀（含另一协议版本的前缀）
+    report.outside_count = len(parsed.prefixes[6 if report.version == 4 else 4]) + sum(
+        1 for base, prefixlen in prefixes
+        if base > report.end or base + (1 << (max_prefixlen - prefixlen)) - 1 < report.start)
+    cumulative = report.cumulative
+    for start, end in used:
+        report.used_starts.append(start)
+        report.used_ends.append(end)
+        cumulative.append(cumulative[-1] + end - start + 1)
+    report.free_blocks = intervals_to_prefixes(difference_intervals(parent, used), max_prefixlen)
+    report.seconds = time.perf_counter() - started
+    return report
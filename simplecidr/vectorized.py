@@ -0,0 +1,268 @@
+from array import array
+
+from .profiling import stage
+from .subnetinfo import format_ipv4, format_ipv6, netmask_of
+
+# 可选的 NumPy 向量化后端：整列计算网络地址、掩码、广播地址与首末可用地址，
+# 适合一次处理上百万个前缀；numpy 在首次使用时才导入，未安装时其他功能不受影响
+MASK64 = (1 << 64) - 1
+# 每块处理的行数，块越大越快，但字符串列的内存占用也越大
+CHUNK_SIZE = 65536
+_np = None
+_tables = {}
+
+
+def load_numpy():
+    global _np
+    if _np is None:
+        try:
+            import numpy
+        except ImportError as e:
+            raise ImportError("向量化计算需要安装 numpy：pip install numpy") from e
+        _np = numpy
+    return _np
+
+
+def numpy_available():
+    try:
+        load_numpy()
+    except ImportError:
+        return False
+    return True
+
+
+# 格式化用的查找表：IPv4 地址高 16 位 "a.b." 与低 16 位 "c.d"，各前缀长度的掩码与 "/n"
+def lookup_tables():
+    if not _tables:
+        np = load_numpy()
+        _tables["high"] = np.array([f"{i >> 8}.{i & 255}." for i in range(65536)])
+        _tables["low"] = np.array([f"{i >> 8}.{i & 255}" for i in range(65536)])
+        for version, bits in ((4, 32), (6, 128)):
+            _tables[f"netmask{version}"] = np.array(
+                [format_ipv4(netmask_of(4, p)) if version == 4 else format_ipv6(netmask_of(6, p))
+                 for p in range(bits + 1)])
+            _tables[f"hostmask{version}"] = np.array(
+                [format_ipv4((1 << (32 - p)) - 1) if version == 4 else format_ipv6((1 << (128 - p)) - 1)
+                 for p in range(bits + 1)])
+            _tables[f"suffix{version}"] = np.array([f"/{p}" for p in range(bits + 1)])
+    return _tables
+
+
+# 转换为 numpy 数组；array('I') / array('B') 等支持缓冲区协议的对象不复制
+def as_array(values, dtype):
+    np = load_numpy()
+    if isinstance(values, array):
+        return np.frombuffer(values, dtype=dtype) if values else np.zeros(0, dtype=dtype)
+    return np.asarray(values, dtype=dtype)
+
+
+def check_prefixlens(prefixlens, max_prefixlen):
+    if prefixlens.size and int(prefixlens.max()) > max_prefixlen:
+        raise ValueError(f"前缀长度超出范围：{int(prefixlens.max())} > {max_prefixlen}")
+
+
+# Python 整数（128 位）与两个 uint64 数组（高 64 位、低 64 位）互相转换
+def ipv6_lanes(values):
+    np = load_numpy()
+    values = list(values)
+    high = np.fromiter((value >> 64 for value in values), dtype=np.uint64, count=len(values))
+    low = np.fromiter((value & MASK64 for value in values), dtype=np.uint64, count=len(values))
+    return high, low
+
+
+def lanes_to_ints(high, low):
+    return [h << 64 | l for h, l in zip(high.tolist(), low.tolist())]
+
+
+# 低 n 位为 1 的 uint64 掩码，n 为 0~64
+def low_bits_mask(bits):
+    np = load_numpy()
+    shift = np.minimum(bits, 63).astype(np.uint64)
+    return np.where(bits >= 64, np.uint64(MASK64), (np.uint64(1) << shift) - np.uint64(1))
+
+
+# IPv4：地址与前缀长度数组（地址可带主机位），返回各列的整数数组；
+# /31 与 /32 的首末可用地址与 get_single_subnet_info 相同
+def ipv4_columns(addresses, prefixlens):
+    np = load_numpy()
+    addresses = as_array(addresses, np.uint32)
+    prefixlens = as_array(prefixlens, np.uint8)
+    check_prefixlens(prefixlens, 32)
+    host_bits = np.uint64(32) - prefixlens.astype(np.uint64)
+    num_addresses = np.uint64(1) << host_bits
+    hostmask = (num_addresses - np.uint64(1)).astype(np.uint32)
+    netmask = ~hostmask
+    network = addresses & netmask
+    broadcast = network | hostmask
+    hosts = host_bits > 1
+    return {
+        "network": network,
+        "prefixlen": prefixlens,
+        "netmask": netmask,
+        "hostmask": hostmask,
+        "broadcast": broadcast,
+        "first": np.where(hosts, network + np.uint32(1), network),
+        "last": np.where(hosts, broadcast - np.uint32(1), broadcast),
+        "num_addresses": num_addresses,
+        "host_addresses": np.where(hosts, num_addresses - np.uint64(2), num_addresses),
+    }
+
+
+# IPv6：地址为 (高 64 位, 低 64 位) 两个 uint64 数组，地址类的列同样返回两个数组；
+# 地址数量可能超过 64 位，以主机位数 host_bits 表示（地址数量为 2 ** host_bits）
+def ipv6_columns(addresses, prefixlens):
+    np = load_numpy()
+    high, low = (as_array(lane, np.uint64) for lane in addresses)
+    prefixlens = as_array(prefixlens, np.uint8)
+    check_prefixlens(prefixlens, 128)
+    host_bits = 128 - prefixlens.astype(np.int64)
+    hostmask = (low_bits_mask(np.maximum(host_bits - 64, 0)), low_bits_mask(np.minimum(host_bits, 64)))
+    netmask = (~hostmask[0], ~hostmask[1])
+    network = (high & netmask[0], low & netmask[1])
+    broadcast = (network[0] | hostmask[0], network[1] | hostmask[1])
+    # 主机位至少 2 位时，网络地址的最低位为 0、广播地址的最低位为 1，加减 1 不会进位或借位
+    hosts = host_bits > 1
+    return {
+        "network": network,
+        "prefixlen": prefixlens,
+        "netmask": netmask,
+        "hostmask": hostmask,
+        "broadcast": broadcast,
+        "first": (network[0], np.where(hosts, network[1] + np.uint64(1), network[1])),
+        "last": (broadcast[0], np.where(hosts, broadcast[1] - np.uint64(1), broadcast[1])),
+        "host_bits": host_bits.astype(np.uint8),
+    }
+
+
+def subnet_columns(version, addresses, prefixlens):
+    if version == 4:
+        return ipv4_columns(addresses, prefixlens)
+    return ipv6_columns(addresses, prefixlens)
+
+
+# 地址列格式化为字符串列表：IPv4 用查找表按列拼接，IPv6 逐个格式化（压缩规则与 ipaddress 一致）；
+# 给出 prefixlens 时在后面加上 "/前缀长度"
+def format_addresses(version, values, prefixlens=None):
+    np = load_numpy()
+    tables = lookup_tables()
+    if version == 4:
+        texts = np.char.add(tables["high"][values >> 16], tables["low"][values & 0xFFFF])
+        if prefixlens is not None:
+            texts = np.char.add(texts, tables["suffix4"][prefixlens])
+        return texts.tolist()
+    texts = [format_ipv6(value) for value in lanes_to_ints(*values)]
+    if prefixlens is not None:
+        texts = [text + suffix for text, suffix in zip(texts, tables["suffix6"][prefixlens].tolist())]
+    return texts
+
+
+def format_prefixlens(version, table, prefixlens):
+    return lookup_tables()[f"{table}{version}"][prefixlens].tolist()
+
+
+# 与 brief_rows 相同的五列（子网、子网掩码、首个可用、最后可用、广播），按列返回字符串列表
+def brief_columns(version, addresses, prefixlens):
+    columns = subnet_columns(version, addresses, prefixlens)
+    prefixlens = columns["prefixlen"]
+    return [
+        format_addresses(version, columns["network"], prefixlens),
+        format_prefixlens(version, "netmask", prefixlens),
+        format_addresses(version, columns["first"]),
+        format_addresses(version, columns["last"]),
+        format_addresses(version, columns["broadcast"]),
+    ]
+
+
+def brief_rows_vectorized(version, addresses, prefixlens):
+    return list(zip(*brief_columns(version, addresses, prefixlens)))
+
+
+# 与 get_single_subnet_info 相同的十列（cli.INFO_COLUMNS 的顺序），按行返回
+def info_rows_vectorized(version, addresses, prefixlens):
+    columns = subnet_columns(version, addresses, prefixlens)
+    prefixlens = columns["prefixlen"]
+    networks = format_addresses(version, columns["network"])
+    if version == 4:
+        num_addresses = columns["num_addresses"].tolist()
+        host_addresses = columns["host_addresses"].tolist()
+    else:
+        num_addresses = [1 << bits for bits in columns["host_bits"].tolist()]
+        host_addresses = [count - 2 if count > 2 else count for count in num_addresses]
+    return list(zip(
+        format_addresses(version, columns["network"], prefixlens),
+        [version] * len(networks),
+        networks,
+        format_addresses(version, columns["broadcast"]),
+        format_prefixlens(version, "netmask", prefixlens),
+        format_prefixlens(version, "hostmask", prefixlens),
+        format_addresses(version, columns["first"]),
+        format_addresses(version, columns["last"]),
+        num_addresses,
+        host_addresses,
+    ))
+
+
+# 已解析的前缀 [(协议版本, 网络地址, 前缀长度), ...] 按协议版本分组计算，按输入顺序返回十列的行
+def info_rows_for_prefixes(prefixes):
+    np = load_numpy()
+    rows = [None] * len(prefixes)
+    for version in (4, 6):
+        positions = [i for i, prefix in enumerate(prefixes) if prefix[0] == version]
+        if not positions:
+            continue
+        bases = [prefixes[i][1] for i in positions]
+        prefixlens = np.fromiter((prefixes[i][2] for i in positions), dtype=np.uint8, count=len(positions))
+        addresses = np.array(bases, dtype=np.uint32) if version == 4 else ipv6_lanes(bases)
+        for i, row in zip(positions, info_rows_vectorized(version, addresses, prefixlens)):
+            rows[i] = row
+    return rows
+
+
+# 子网序列的一段转换为地址与前缀长度数组：惰性子网序列按步长生成，批量记录直接使用其数组
+def division_arrays(subnets, start, stop):
+    np = load_numpy()
+    version = subnets.version
+    if hasattr(subnets, "step"):
+        count = stop - start
+        prefixlens = np.full(count, subnets.new_prefixlen, dtype=np.uint8)
+        if version == 4:
+            addresses = subnets.base + np.arange(start, stop, dtype=np.uint64) * np.uint64(subnets.step)
+            return addresses.astype(np.uint32), prefixlens
+        return ipv6_lanes(subnets.base_of(i) for i in range(start, stop)), prefixlens
+    if hasattr(subnets, "bases"):
+        bases = subnets.bases[start:stop]
+        prefixlens = as_array(subnets.prefixlens[start:stop], np.uint8)
+    else:
+        # VLSM 等结果：SubnetInfo 记录的列表
+        records = subnets[start:stop]
+        bases = [record.base for record in records]
+        prefixlens = np.fromiter((record.prefixlen for record in records), dtype=np.uint8, count=len(records))
+    if version == 4:
+        return as_array(bases, np.uint32), prefixlens
+    return ipv6_lanes(bases), prefixlens
+
+
+# 按块产出划分结果的五元组行，与逐行生成的结果相同；export.iter_division_chunks 在行数较多时使用
+def iter_division_chunks_vectorized(subnets, chunk_size=CHUNK_SIZE, start=0, stop=None):
+    total = getattr(subnets, "count", None)
+    if total is None:
+        total = len(subnets)
+    stop = total if stop is None else min(stop, total)
+    if isinstance(getattr(subnets, "prefixes", None), dict):
+        # 前缀集：IPv4 在前、IPv6 在后，两个协议版本分别按列计算
+        count4 = len(subnets.prefixes[4])
+        yield from iter_division_chunks_vectorized(subnets.prefixes[4], chunk_size, start, min(stop, count4))
+        yield from iter_division_chunks_vectorized(
+            subnets.prefixes[6], chunk_size, max(start - count4, 0), max(stop - count4, 0))
+        return
+    names = getattr(subnets, "names", None)
+    for offset in range(start, stop, chunk_size):
+        end = min(offset + chunk_size, stop)
+        with stage("生成表格行") as record:
+            addresses, prefixlens = division_arrays(subnets, offset, end)
+            rows = brief_rows_vectorized(subnets.version, addresses, prefixlens)
+            # VLSM 结果附带需求名称，作为最后一列
+            if names is not None:
+                rows = [row + (name,) for row, name in zip(rows, names[offset:end])]
+            record.add(len(rows))
+        yield rows
@@ -0,0 +1,136 @@
+import heapq
+import re
+
+from .subnetinfo import SubnetInfo
+
+# 单条需求：[名称:] [数量*] (主机数 | /前缀长度)，例如 "site A: 2000"、"40*/31"、"3*500"
+_REQUIREMENT = re.compile(r"^(?:(?P<name>[^:*/]+):)?\s*(?:(?P<count>\d+)\s*[*xX]\s*)?(?P<slash>/)?\s*(?P<size>\d+)$")
+
+
+# 满足主机数量所需的最长前缀长度（主机数规则与 get_single_subnet_info 一致：/32 为 1，/31 为 2）
+def prefixlen_for_hosts(hosts, max_prefixlen):
+    if hosts <= 1:
+        return max_prefixlen
+    if hosts == 2:
+        return max_prefixlen - 1
+    return max_prefixlen - (hosts + 1).bit_length()
+
+
+# 解析分配需求文本，条目之间以逗号、分号或换行分隔，返回 [(名称, 前缀长度), ...]；
+# 数量在展开之前与父网络（前缀长度 min_prefixlen）能容纳的块数比较，避免超大的数量耗尽内存
+def parse_requirements(text, max_prefixlen, min_prefixlen=0):
+    requirements = []
+    for index, item in enumerate(re.split(r"[,;，；\n]+", text), 1):
+        item = item.strip()
+        if not item:
+            continue
+        match = _REQUIREMENT.match(item)
+        if match is None:
+            raise ValueError(f"无法识别的分配需求：{item}")
+        size = int(match.group("size"))
+        if match.group("slash"):
+            if size > max_prefixlen:
+                raise ValueError(f"前缀长度超出范围：{item}")
+            prefixlen = size
+        else:
+            prefixlen = prefixlen_for_hosts(size, max_prefixlen)
+            if prefixlen < 0:
+                raise ValueError(f"主机数量超出范围：{item}")
+        name = (match.group("name") or f"#{index}").strip()
+        count = int(match.group("count") or 1)
+        capacity = 1 << (prefixlen - min_prefixlen) if prefixlen >= min_prefixlen else 0
+        if count > capacity:
+            raise ValueError(f"数量超出父网络的容量（最多 {capacity} 个 /{prefixlen}）：{item}")
+        requirements.extend((name, prefixlen) for _ in range(count))
+    if not requirements:
+        raise ValueError("未填写分配需求")
+    return requirements
+
+
+# 伙伴分配器：每个前缀长度维护一个按地址排序的空闲块小顶堆，
+# 分配时取能容纳需求的最小空闲块中地址最低的一个，并逐级对半拆分
+class BuddyAllocator:
+    def __init__(self, base, prefixlen, max_prefixlen):
+        self.max_prefixlen = max_prefixlen
+        self.min_prefixlen = prefixlen
+        self.free = {p: [] for p in range(prefixlen, max_prefixlen + 1)}
+        self.free[prefixlen].append(base)
+
+    # 分配一个指定前缀长度的块，成功返回网络地址，空间不足返回 None
+    def allocate(self, prefixlen):
+        if not self.min_prefixlen <= prefixlen <= self.max_prefixlen:
+            return None
+        for block_prefixlen in range(prefixlen, self.min_prefixlen - 1, -1):
+            if self.free[block_prefixlen]:
+                break
+        else:
+            return None
+        base = heapq.heappop(self.free[block_prefixlen])
+        # 拆分：保留低半部分继续拆，高半部分（伙伴）放回空闲堆
+        while block_prefixlen < prefixlen:
+            block_prefixlen += 1
+            heapq.heappush(self.free[block_prefixlen],
+                           base + (1 << (self.max_prefixlen - block_prefixlen)))
+        return base
+
+    # 剩余空闲块 [(网络地址, 前缀长度), ...]，按地址排序
+    def free_blocks(self):
+        return sorted((base, p) for p, bases in self.free.items() for base in bases)
+
+
+# VLSM 分配结果的一段：子网记录列表，附带各子网对应的需求名称
+class NamedSubnets(list):
+    def __init__(self, subnets, names):
+        super().__init__(subnets)
+        self.names = names
+
+
+# VLSM 分配结果：按地址排序的子网记录，可直接作为子网表格与导出的数据源
+class VlsmPlan:
+    def __init__(self, network):
+        self.network = network
+        self.version = network.version
+        self.subnets = []
+        self.names = []
+        self.unallocated = []
+        self.free_blocks = []
+
+    @property
+    def count(self):
+        return len(self.subnets)
+
+    def __len__(self):
+        return len(self.subnets)
+
+    def __bool__(self):
+        return bool(self.subnets)
+
+    # 切片保留需求名称，生成表格行时作为最后一列
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return NamedSubnets(self.subnets[item], self.names[item])
+        return self.subnets[item]
+
+    def __iter__(self):
+        return iter(self.subnets)
+
+
+# 按需求分配子网：大块优先分配（同样大小保持输入顺序），总体 O(n log n)
+def allocate_vlsm(network, requirements):
+    max_prefixlen = network.max_prefixlen
+    if isinstance(requirements, str):
+        requirements = parse_requirements(requirements, max_prefixlen, network.prefixlen)
+    allocator = BuddyAllocator(int(network.network_address), network.prefixlen, max_prefixlen)
+    plan = VlsmPlan(network)
+    allocations = []
+    for name, prefixlen in sorted(requirements, key=lambda requirement: requirement[1]):
+        base = allocator.allocate(prefixlen)
+        if base is None:
+            plan.unallocated.append((name, prefixlen))
+        else:
+            allocations.append((base, prefixlen, name))
+    allocations.sort()
+    plan.subnets = [SubnetInfo(network.version, base, prefixlen) for base, prefixlen, _ in allocations]
+    plan.names = [name for _, _, name in allocations]
+    plan.free_blocks = allocator.free_blocks()
+    return plan
@@ -0,0 +1,44 @@
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+
+# 直接运行 pytest 时也能导入仓库根目录下的 simplecidr
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def pytest_addoption(parser):
+    parser.addoption("--update-golden", action="store_true",
+                     help="用当前输出重新生成 tests/golden 下的期望结果")
+
+
+# 转换为 JSON 可比较的形式：元组变列表，地址对象等转为字符串
+def to_json(value):
+    return json.loads(json.dumps(value, default=str, ensure_ascii=False))
+
+
+# 与 tests/golden/<name>.json 中保存的期望结果比较；--update-golden 时改为写入
+@pytest.fixture
+def golden(request):
+    update = request.config.getoption("--update-golden")
+
+    def check(name, actual):
+        path = os.path.join(GOLDEN_DIR, f"{name}.json")
+        actual = to_json(actual)
+        if update:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(actual, f, ensure_ascii=False, indent=1)
+                f.write("\n")
+            return
+        if not os.path.exists(path):
+            pytest.fail(f"缺少期望结果 {path}，请使用 --update-golden 生成")
+        with open(path, encoding="utf-8") as f:
+            expected = json.load(f)
+        assert actual == expected
+
+    return check
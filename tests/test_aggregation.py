@@ -0,0 +1,85 @@
+import random
+from ipaddress import collapse_addresses, ip_network
+
+import pytest
+
+from simplecidr.calculator import Calculator
+
+AGGREGATION_CASES = {
+    "adjacent_v4": (["192.168.0.0/24", "192.168.1.0/24", "192.168.2.0/24", "192.168.3.0/24"], 24),
+    "supernet_v4": (["10.1.2.0/24", "10.1.3.77/24", "10.200.0.0/16", "10.1.0.0/16"], 16),
+    "nested_and_duplicate": (["10.0.0.0/8", "10.1.0.0/16", "10.1.0.0/16", "11.0.0.0/8"], 8),
+    "hosts_to_24": (["172.16.0.1", "172.16.0.2/32", "172.16.1.255", "172.16.3.0/25"], 24),
+    "mixed_families": (["2001:db8::/48", "2001:db8:1::/48", "10.0.0.0/24", "10.0.1.0/24", "fe80::1"], 47),
+    "invalid_lines": (["10.0.0.0/24", "not a network", "10.0.1.0/33", "", "10.0.1.0/24", "not a network"], 23),
+    "default_route": (["0.0.0.0/0", "1.2.3.0/24"], 24),
+}
+
+
+# 原先基于 ipaddress 的实现（按协议版本分别合并，避免混合版本时 collapse_addresses 报错）
+def reference_aggregation(subnets, new_prefixlen):
+    supernets = {4: [], 6: []}
+    invalid = []
+    for subnet in subnets:
+        try:
+            network = ip_network(subnet, strict=False)
+        except ValueError:
+            invalid.append(subnet)
+            continue
+        if network.prefixlen > new_prefixlen:
+            network = network.supernet(new_prefix=new_prefixlen)
+        supernets[network.version].append(network)
+    aggregated = []
+    for version in (4, 6):
+        aggregated.extend(sorted(collapse_addresses(supernets[version])))
+    return aggregated, invalid
+
+
+@pytest.fixture
+def calculator():
+    return Calculator(cache_budget=0)
+
+
+def test_aggregation_golden(calculator, golden):
+    results = {}
+    for name, (subnets, new_prefixlen) in AGGREGATION_CASES.items():
+        aggregated, invalid = calculator.aggregation_subnets_by_new_prefix(subnets, new_prefixlen)
+        results[name] = {"aggregated": [str(subnet) for subnet in aggregated], "invalid": sorted(invalid)}
+    golden("aggregation", results)
+
+
+@pytest.mark.parametrize("name", sorted(AGGREGATION_CASES))
+def test_aggregation_matches_reference(calculator, name):
+    subnets, new_prefixlen = AGGREGATION_CASES[name]
+    lines = [line for line in subnets if line.strip()]
+    aggregated, invalid = calculator.aggregation_subnets_by_new_prefix(lines, new_prefixlen)
+    expected, expected_invalid = reference_aggregation(lines, new_prefixlen)
+    assert aggregated == expected
+    assert sorted(invalid) == sorted(set(expected_invalid))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_aggregation_matches_reference_random(calculator, seed):
+    rng = random.Random(seed)
+    subnets = []
+    for _ in range(2000):
+        if rng.random() < 0.7:
+            base = 0x0A000000 + rng.getrandbits(16) * 256
+            subnets.append(f"{ip_network((base, 32))[0]}/{rng.randint(16, 32)}")
+        else:
+            base = (0x20010DB8 << 96) + (rng.getrandbits(24) << 80)
+            subnets.append(f"{ip_network((base, 128))[0]}/{rng.randint(32, 64)}")
+    for new_prefixlen in (8, 20, 24, 48):
+        aggregated, _ = calculator.aggregation_subnets_by_new_prefix(subnets, new_prefixlen)
+        assert aggregated == reference_aggregation(subnets, new_prefixlen)[0]
+
+
+def test_aggregation_per_family_targets(calculator):
+    result = calculator.aggregate_subnets(["10.0.0.0/24", "10.0.1.0/24", "2001:db8::/64", "2001:db8:0:1::/64"],
+                                          {4: 16, 6: 48})
+    assert [str(subnet) for subnet in result.networks()] == ["10.0.0.0/16", "2001:db8::/48"]
+
+
+def test_aggregation_rejects_negative_prefix(calculator):
+    with pytest.raises(ValueError):
+        calculator.aggregation_subnets_by_new_prefix(["10.0.0.0/8"], -1)
@@ -0,0 +1,139 @@
+import random
+from ipaddress import ip_network
+from math import ceil, log2
+
+import pytest
+
+from simplecidr.calculator import Calculator
+from simplecidr.export import iter_division_chunks
+
+INFO_INPUTS = [
+    "192.168.1.0/24", "192.168.1.77/24", "10.0.0.0/31", "10.0.0.1/32", "0.0.0.0/0",
+    "172.16.5.4/255.255.0.0", "2001:db8::/64", "2001:db8::1/127", "::1/128",
+    "::ffff:1.2.3.4/120", "fe80::/10", "300.1.1.1/24", "1.2.3.4/33", "abc", "",
+]
+
+# (名称, 网络, 划分方式, 参数)
+DIVISION_CASES = [
+    ("v4_prefix_26", "192.168.0.0/22", "prefix", 26),
+    ("v4_prefix_31", "10.0.0.0/28", "prefix", 31),
+    ("v4_prefix_32", "10.0.0.0/29", "prefix", 32),
+    ("v4_prefix_same", "10.0.0.0/24", "prefix", 24),
+    ("v4_prefix_shorter", "10.0.0.0/24", "prefix", 16),
+    ("v4_prefix_too_long", "10.0.0.0/24", "prefix", 33),
+    ("v4_num_subnets_5", "10.0.0.0/24", "num_subnets", 5),
+    ("v4_num_subnets_too_many", "10.0.0.0/30", "num_subnets", 8),
+    ("v4_num_address_100", "10.0.0.0/24", "num_address", 100),
+    ("v4_num_address_1", "10.0.0.0/30", "num_address", 1),
+    ("v6_prefix_64", "2001:db8::/60", "prefix", 64),
+    ("v6_prefix_127", "2001:db8::/124", "prefix", 127),
+    ("v6_prefix_128", "2001:db8::/126", "prefix", 128),
+    ("v6_num_subnets_3", "2001:db8::/48", "num_subnets", 3),
+]
+
+
+@pytest.fixture
+def calculator():
+    return Calculator(cache_budget=0)
+
+
+def divide(calculator, network, method, value):
+    network = ip_network(network, strict=False)
+    if method == "prefix":
+        return calculator.calculate_subnets_by_new_prefix(network, value)
+    if method == "num_subnets":
+        return calculator.calculate_subnets_by_num_subnets(network, value)
+    return calculator.calculate_subnets_by_num_address(network, value)
+
+
+# 原先基于 ipaddress 的实现，作为对照
+def reference_division(network, method, value):
+    network = ip_network(network, strict=False)
+    if method == "num_subnets":
+        if network.num_addresses < value:
+            return []
+        method, value = "num_address", int(network.num_addresses / value)
+    if method == "num_address":
+        if network.num_addresses < value:
+            return []
+        method, value = "prefix", network.max_prefixlen - ceil(log2(value))
+    if value < network.prefixlen or network.max_prefixlen < value:
+        return []
+    return list(network.subnets(new_prefix=value))
+
+
+def reference_rows(calculator, subnets):
+    rows = []
+    for subnet in subnets:
+        info = calculator.compute_single_subnet_info(subnet)
+        rows.append(tuple(str(info[key]) for key in
+                          ("cidr", "netmask", "first_address", "last_address", "broadcast_address")))
+    return rows
+
+
+def test_single_subnet_info_golden(calculator, golden):
+    golden("single_subnet_info", {subnet: calculator.get_single_subnet_info(subnet) for subnet in INFO_INPUTS})
+
+
+def test_single_subnet_info_cached_result_is_a_copy():
+    calculator = Calculator()
+    first = calculator.get_single_subnet_info("10.1.2.3/8")
+    expected = dict(first)
+    first["cidr"] = "changed"
+    assert calculator.get_single_subnet_info("10.1.2.3/8") == expected
+    assert calculator.cache.hits == 1
+
+
+def test_division_golden(calculator, golden):
+    results = {}
+    for name, network, method, value in DIVISION_CASES:
+        subnets = divide(calculator, network, method, value)
+        results[name] = {"count": subnets.count, "rows": calculator.get_multiple_subnet_info(subnets)}
+    golden("division", results)
+
+
+@pytest.mark.parametrize("name, network, method, value", DIVISION_CASES)
+def test_division_matches_reference(calculator, name, network, method, value):
+    subnets = divide(calculator, network, method, value)
+    expected = reference_division(network, method, value)
+    assert list(subnets) == expected
+    assert calculator.get_multiple_subnet_info(subnets) == reference_rows(calculator, expected)
+
+
+def test_division_slices_match_full_rows(calculator):
+    subnets = calculator.calculate_subnets_by_new_prefix(ip_network("10.0.0.0/16"), 24)
+    rows = calculator.get_multiple_subnet_info(subnets)
+    assert calculator.get_multiple_subnet_info(subnets[100:140]) == rows[100:140]
+    assert calculator.get_multiple_subnet_info(subnets[250:]) == rows[250:]
+
+
+def test_large_ipv6_division_is_lazy(calculator):
+    subnets = calculator.calculate_subnets_by_new_prefix(ip_network("2001:db8::/32"), 128)
+    assert subnets.count == 1 << 96
+    last = calculator.get_multiple_subnet_info(subnets[subnets.count - 1:])
+    assert last == [("2001:db8:ffff:ffff:ffff:ffff:ffff:ffff/128", "ffff:ffff:ffff:ffff:ffff:ffff:ffff:ffff",
+                     "2001:db8:ffff:ffff:ffff:ffff:ffff:ffff", "2001:db8:ffff:ffff:ffff:ffff:ffff:ffff",
+                     "2001:db8:ffff:ffff:ffff:ffff:ffff:ffff")]
+
+
+def test_multiple_subnet_info_matches_reference_random(calculator):
+    rng = random.Random(14)
+    subnets = []
+    for _ in range(500):
+        if rng.random() < 0.5:
+            subnets.append(ip_network((rng.getrandbits(32), rng.randint(0, 32)), strict=False))
+        else:
+            subnets.append(ip_network((rng.getrandbits(128), rng.randint(0, 128)), strict=False))
+    assert calculator.get_multiple_subnet_info(subnets) == reference_rows(calculator, subnets)
+
+
+# 导出按块生成的行不进入缓存，界面窗口的行保留在缓存中
+def test_export_chunks_bypass_rows_cache():
+    calculator = Calculator(cache_budget=1 << 20)
+    subnets = calculator.calculate_subnets_by_new_prefix(ip_network("10.0.0.0/16"), 28)
+    window = calculator.get_multiple_subnet_info(subnets[0:20])
+    assert len(calculator.rows_cache) == 1
+    rows = [row for chunk in iter_division_chunks(calculator, subnets, 512) for row in chunk]
+    assert len(rows) == 4096 and rows[:20] == window
+    assert len(calculator.rows_cache) == 1
+    assert calculator.get_multiple_subnet_info(subnets[0:20]) is window
@@ -0,0 +1,94 @@
+import random
+from functools import lru_cache
+
+import pytest
+
+from simplecidr.aggregation import aggregate_subnets, collapse_prefixes
+from simplecidr.compression import compress_prefix_set, compress_prefixes, compress_subnets
+from simplecidr.prefixset import PrefixSet, save_prefix_set
+
+
+def covered_addresses(prefixes, max_prefixlen):
+    return {address for base, prefixlen in prefixes
+            for address in range(base, base + (1 << (max_prefixlen - prefixlen)))}
+
+
+# 最优解（小地址空间上的 trie 动态规划）：最多 limit 个前缀覆盖全部输入时最少多覆盖的地址数
+def optimal_waste(prefixes, max_prefixlen, limit):
+    used = covered_addresses(prefixes, max_prefixlen)
+
+    @lru_cache(maxsize=None)
+    def best(base, bits, limit):
+        size = 1 << bits
+        inside = sum(1 for address in range(base, base + size) if address in used)
+        if inside == 0:
+            return 0
+        if inside == size:
+            return 0 if limit >= 1 else None
+        options = [size - inside] if limit >= 1 else []
+        if bits:
+            half = size >> 1
+            for left in range(limit + 1):
+                low, high = best(base, bits - 1, left), best(base + half, bits - 1, limit - left)
+                if low is not None and high is not None:
+                    options.append(low + high)
+        return min(options) if options else None
+    return best(0, max_prefixlen, limit)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_limit_and_coverage_against_optimum(seed):
+    rng = random.Random(seed)
+    prefixes = [(rng.getrandbits(8) >> (8 - p) << (8 - p), p)
+                for p in (rng.randint(3, 8) for _ in range(rng.randint(2, 12)))]
+    collapsed = collapse_prefixes(prefixes, 8)
+    used = covered_addresses(prefixes, 8)
+    for limit in range(1, len(collapsed) + 1):
+        compressed, collapsed_count, covered, wasted = compress_prefixes(prefixes, 8, max_prefixes=limit)
+        assert collapsed_count == len(collapsed) and covered == len(used)
+        assert len(compressed) <= limit
+        # 结果有序、不相交，覆盖全部输入，多覆盖的地址数准确
+        assert compressed == collapse_prefixes(compressed, 8)
+        result = covered_addresses(compressed, 8)
+        assert used <= result and len(result) - len(used) == wasted
+        assert wasted >= optimal_waste(prefixes, 8, limit)
+    # 不需要压缩时与精确汇总相同
+    assert compress_prefixes(prefixes, 8, max_prefixes=len(collapsed))[0] == collapsed
+
+
+def test_cheapest_merges_first():
+    prefixes = [(0, 24), (512, 24), (4096, 24), (4352, 24)]
+    compressed, _, _, wasted = compress_prefixes(prefixes, 32, max_prefixes=2)
+    assert compressed == [(0, 22), (4096, 23)] and wasted == 512
+    compressed, _, _, wasted = compress_prefixes(prefixes, 32, max_prefixes=1)
+    assert compressed == [(0, 19)] and wasted == 8192 - 1024
+
+
+@pytest.mark.parametrize("max_overcover", [0, 10, 50, 100, 1000])
+def test_overcover_budget(max_overcover):
+    rng = random.Random(max_overcover)
+    lines = [f"10.{rng.randint(0, 15)}.{rng.randint(0, 255)}.0/24" for _ in range(500)]
+    lines += [f"2001:db8:{rng.getrandbits(16):x}::/48" for _ in range(100)]
+    result = compress_subnets(lines, max_overcover=max_overcover, parallel=False)
+    exact = aggregate_subnets(lines, None, parallel=False)
+    for version in (4, 6):
+        assert result.collapsed_count[version] == len(exact.prefixes[version])
+        assert result.wasted[version] * 100 <= result.covered[version] * max_overcover
+        assert len(result.prefixes[version]) <= len(exact.prefixes[version])
+    if max_overcover == 0:
+        assert list(result.cidrs()) == list(exact.cidrs())
+
+
+def test_prefix_set_and_limits(tmp_path):
+    lines = [f"10.{i}.{j}.0/24" for i in range(0, 64, 3) for j in range(0, 256, 5)] + ["bad", "2001:db8::/64"]
+    result = compress_subnets(lines, max_prefixes={4: 20, 6: 5}, parallel=False)
+    assert len(result.prefixes[4]) == 20 and result.prefixes[6] == [(0x20010db8 << 96, 64)]
+    assert result.invalid == ["bad"] and "压缩 20 个" in result.summary()
+    path = tmp_path / "routes.cidrset"
+    save_prefix_set(path, aggregate_subnets(lines, None, parallel=False))
+    with PrefixSet.open(path) as prefix_set:
+        assert compress_prefix_set(prefix_set, {4: 20, 6: 5}).prefixes == result.prefixes
+    with pytest.raises(ValueError):
+        compress_subnets(lines)
+    with pytest.raises(ValueError):
+        compress_subnets(lines, max_prefixes=0)
@@ -0,0 +1,71 @@
+import csv
+import gzip
+import io
+import json
+from ipaddress import ip_network
+
+import pytest
+
+from simplecidr.calculator import Calculator
+from simplecidr.division import SubnetRange
+from simplecidr.export import RowWriter, detect_format, export_chunks, iter_chunks, iter_division_chunks
+
+ROWS = [("10.0.0.0/24", "255.255.255.0"), ("2001:db8::/64", "ffff:ffff:ffff:ffff::")]
+
+
+@pytest.mark.parametrize("path, expected", [
+    ("a.csv", ("csv", False)), ("a.CSV.GZ", ("csv", True)), ("a.jsonl", ("jsonl", False)),
+    ("a.json.gz", ("jsonl", True)), ("a.txt", ("text", False)), ("a.out", ("csv", False)),
+])
+def test_detect_format(path, expected):
+    assert detect_format(path) == expected
+
+
+# plain 的快速写法与通用写法输出相同
+@pytest.mark.parametrize("fmt", ["csv", "jsonl", "text"])
+def test_plain_matches_general_writer(fmt):
+    outputs = []
+    for plain in (False, True):
+        stream = io.StringIO()
+        RowWriter(stream, fmt, ("network", "netmask"), plain=plain).writerows(ROWS)
+        outputs.append(stream.getvalue())
+    assert outputs[0] == outputs[1]
+
+
+def test_general_writer_escapes():
+    rows = [("a,b", 'say "hi"', 3)]
+    stream = io.StringIO()
+    RowWriter(stream, "csv", ("x", "y", "z"), header=["甲", "乙", "丙"]).writerows(rows)
+    assert list(csv.reader(io.StringIO(stream.getvalue()))) == [["甲", "乙", "丙"], ["a,b", 'say "hi"', "3"]]
+    stream = io.StringIO()
+    RowWriter(stream, "jsonl", ("x", "y", "z")).writerows(rows)
+    assert json.loads(stream.getvalue()) == {"x": "a,b", "y": 'say "hi"', "z": 3}
+
+
+@pytest.mark.parametrize("name", ["rows.csv.gz", "rows.jsonl", "rows.txt"])
+def test_export_chunks_round_trip(tmp_path, name):
+    path = tmp_path / name
+    progress = []
+    rows = [(f"10.0.{i}.0/24", str(i)) for i in range(1000)]
+    assert export_chunks(path, ("network", "index"), iter_chunks(rows, 300), progress=progress.append) == 1000
+    assert progress == [300, 600, 900, 1000]
+    opener = gzip.open if name.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8", newline="") as f:
+        text = f.read()
+    if name.startswith("rows.csv"):
+        assert [tuple(row) for row in csv.reader(io.StringIO(text))] == [("network", "index")] + rows
+    elif name.endswith(".jsonl"):
+        assert [tuple(json.loads(line).values()) for line in text.splitlines()] == rows
+    else:
+        assert [tuple(line.split("\t")) for line in text.splitlines()] == rows
+
+
+# 分块生成的划分行与一次生成的相同，start/stop 截取正确
+def test_division_chunks():
+    calculator = Calculator(cache_budget=0)
+    subnets = SubnetRange(ip_network("10.0.0.0/16"), 26)
+    rows = [row for chunk in iter_division_chunks(calculator, subnets, 100, 5, 777) for row in chunk]
+    expected = calculator.get_multiple_subnet_info(subnets[5:777])
+    assert rows == expected and len(rows) == 772
+    assert rows[0][0] == str(list(ip_network("10.0.0.0/16").subnets(new_prefix=26))[5])
+    assert [len(chunk) for chunk in iter_chunks(range(10), 4)] == [4, 4, 2]
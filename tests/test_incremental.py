@@ -0,0 +1,62 @@
+import random
+from ipaddress import ip_network
+
+import pytest
+
+from simplecidr.aggregation import aggregate_subnets
+from simplecidr.incremental import IncrementalAggregator
+
+
+def random_line(rng):
+    kind = rng.random()
+    if kind < 0.02:
+        return "not a network"
+    if kind < 0.2:
+        base = (0x20010DB8 << 96) + (rng.getrandbits(16) << 80)
+        return f"{ip_network((base, 128))[0]}/{rng.randint(40, 64)}"
+    return f"{ip_network((0x0A000000 + rng.getrandbits(20) * 16, 32))[0]}/{rng.randint(12, 30)}"
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_incremental_matches_full_aggregation(seed):
+    rng = random.Random(seed)
+    aggregator = IncrementalAggregator()
+    lines = [random_line(rng) for _ in range(rng.randint(0, 2000))]
+    new_prefixlen = rng.choice([None, 16, 24, {4: 20, 6: 48}])
+    previous = None
+    for _ in range(10):
+        diff = aggregator.update(lines, new_prefixlen)
+        result = aggregator.result()
+        expected = aggregate_subnets(lines, new_prefixlen, parallel=False)
+        assert result.prefixes == expected.prefixes
+        assert result.invalid_lines == expected.invalid_lines
+        assert diff.total == len(expected)
+        if previous is not None and not diff.full:
+            for version in (4, 6):
+                assert diff.removed[version] == sorted(set(previous[version]) - set(expected.prefixes[version]))
+                assert diff.added[version] == sorted(set(expected.prefixes[version]) - set(previous[version]))
+        previous = {version: list(expected.prefixes[version]) for version in (4, 6)}
+        for _ in range(rng.randint(0, 30)):
+            action = rng.random()
+            if action < 0.4 and lines:
+                del lines[rng.randrange(len(lines))]
+            elif action < 0.5 and lines:
+                lines.append(rng.choice(lines))
+            else:
+                lines.insert(rng.randint(0, len(lines)), random_line(rng))
+        if rng.random() < 0.1:
+            new_prefixlen = rng.choice([None, 16, 24])
+
+
+def test_incremental_diff_reports_only_changes():
+    aggregator = IncrementalAggregator()
+    lines = ["10.0.0.0/24", "10.0.1.0/24", "10.0.3.0/24", "10.0.3.0/24"]
+    assert aggregator.update(lines, 24).full
+    diff = aggregator.update(lines + ["10.0.2.0/24"], 24)
+    assert not diff.full and (diff.lines_added, diff.lines_removed) == (1, 0)
+    assert [str(subnet) for subnet in diff.networks("added")] == ["10.0.0.0/22"]
+    assert [str(subnet) for subnet in diff.networks("removed")] == ["10.0.0.0/23", "10.0.3.0/24"]
+    # 重复的行只删除一份时结果不变
+    diff = aggregator.update(lines[:3] + ["10.0.2.0/24"], 24)
+    assert not diff and diff.lines_removed == 1
+    assert aggregator.update(lines, 16).full
@@ -0,0 +1,77 @@
+import random
+from ipaddress import ip_address, ip_network
+
+import pytest
+
+from simplecidr.division import SubnetRange
+from simplecidr.lookup import PrefixTable, parse_address
+
+
+# 参照实现：在所有包含该地址的网络中取前缀最长的一个
+def brute_force_match(networks, address):
+    address = ip_address(address)
+    matches = [network for network in networks if network.version == address.version and address in network]
+    return str(max(matches, key=lambda network: network.prefixlen)) if matches else None
+
+
+def random_networks(rng, count):
+    networks = [ip_network("0.0.0.0/0"), ip_network("::/0"), ip_network("10.1.2.3/32"),
+                ip_network("2001:db8::1/128"), ip_network("255.255.255.255/32")]
+    for _ in range(count):
+        if rng.random() < 0.6:
+            networks.append(ip_network((rng.getrandbits(32) & 0x0FFFFFFF | 0x0A000000, rng.randint(8, 32)), strict=False))
+        else:
+            networks.append(ip_network(((0x20010db8 << 96) | rng.getrandbits(96), rng.randint(32, 128)), strict=False))
+    return networks
+
+
+# 每个网络的首末地址、两侧相邻的地址，以及若干随机地址
+def probe_addresses(rng, networks):
+    addresses = []
+    for network in networks:
+        for value in (int(network.network_address), int(network.broadcast_address)):
+            for delta in (-1, 0, 1):
+                if 0 <= value + delta <= (1 << network.max_prefixlen) - 1:
+                    addresses.append(str(type(network.network_address)(value + delta)))
+    addresses += [str(ip_address(rng.getrandbits(32))) for _ in range(200)]
+    addresses += [str(ip_address((0x20010db8 << 96) | rng.getrandbits(96))) for _ in range(200)]
+    return addresses
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_brute_force(seed):
+    rng = random.Random(seed)
+    networks = random_networks(rng, 150)
+    # 以 /0 以外的一半网络建表时，也要检查没有匹配的地址
+    for subset in (networks, networks[2:][::2]):
+        table = PrefixTable.from_lines([str(network) for network in subset], parallel=False)
+        addresses = probe_addresses(rng, networks)
+        for address in addresses:
+            assert table.lookup(address) == brute_force_match(subset, address)
+        rows = list(table.lookup_lines(addresses))
+        assert rows == [[address, brute_force_match(subset, address) or ""] for address in addresses]
+
+
+# 子网序列的一段与其他前缀部分重叠时走一般的编译路径
+def test_subnet_range_overlapping_prefixes():
+    subnets = SubnetRange(ip_network("10.0.0.0/16"), 24)[3:10]
+    table = PrefixTable.from_subnets(subnets)
+    table.extend(4, [(int(ip_address("10.0.0.0")), 22), (int(ip_address("10.0.8.0")), 21), (0, 0)])
+    networks = [ip_network(f"10.0.{i}.0/24") for i in range(3, 10)] + \
+        [ip_network("10.0.0.0/22"), ip_network("10.0.8.0/21"), ip_network("0.0.0.0/0")]
+    for third in range(0, 20):
+        for last in (0, 255):
+            address = f"10.0.{third}.{last}"
+            assert table.lookup(address) == brute_force_match(networks, address)
+
+
+def test_invalid_addresses():
+    table = PrefixTable.from_lines(["10.0.0.0/8", "bad"], parallel=False)
+    assert table.invalid == [(2, "bad")]
+    invalid = []
+    assert list(table.lookup_lines(["10.1.1.1", "", "999.1.1.1", " 11.0.0.1 "], invalid)) == [
+        ["10.1.1.1", "10.0.0.0/8"], ["11.0.0.1", ""]]
+    assert invalid == [(3, "999.1.1.1")]
+    assert parse_address(" ::ffff:1.2.3.4 ") == (6, 0xFFFF01020304)
+    with pytest.raises(ValueError):
+        table.lookup("10.0.0")
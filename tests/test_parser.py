@@ -0,0 +1,88 @@
+import random
+from ipaddress import ip_network
+
+import pytest
+
+from simplecidr.parser import parse_chunk, parse_lines, parse_prefix, parse_prefix_fast
+
+EDGE_CASES = [
+    "10.0.0.1/8", "0.0.0.0/0", "255.255.255.255", "1.2.3.4/32", "1.2.3.4/0", "01.2.3.4/8", "1.2.3.4/08",
+    "1.2.3.256/24", "1.2.3/24", "1.2.3.4/33", " 1.2.3.4/24", "1.2.3.4/24 ", "1.2.3.4/", "1.2.3.4/24/1",
+    "1.2.3.4/255.255.0.0", "1.2.3.4/0.0.255.255", "::", "::/0", "::1/128", "2001:DB8::1/32", "2001:db8::/129",
+    "2001:db8::1/064", "::ffff:1.2.3.4/96", "fe80::1%eth0/64", "2001:db8:::1", "1:2:3:4:5:6:7:8/64",
+    "1:2:3:4:5:6:7:8:9", "g::1", "", "abc", "١.٢.٣.٤",
+]
+
+
+# 参照实现：ip_network(strict=False)
+def reference(text):
+    try:
+        network = ip_network(text, strict=False)
+    except ValueError:
+        return None
+    return network.version, int(network.network_address), network.prefixlen
+
+
+@pytest.mark.parametrize("text", EDGE_CASES)
+def test_edge_cases_match_ipaddress(text):
+    expected = reference(text)
+    fast = parse_prefix_fast(text)
+    # 快速路径要么给出与 ipaddress 相同的结果，要么交给 ipaddress 处理
+    assert fast is None or fast == expected
+    if expected is None:
+        with pytest.raises(ValueError):
+            parse_prefix(text)
+    else:
+        assert parse_prefix(text) == expected
+
+
+def test_random_prefixes_match_ipaddress():
+    rng = random.Random(0)
+    for _ in range(3000):
+        if rng.random() < 0.5:
+            text = f"{rng.getrandbits(32) >> 24}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}" \
+                   f"/{rng.randint(0, 32)}"
+        else:
+            text = f"{ip_network((rng.getrandbits(128), 128)).network_address}/{rng.randint(0, 128)}"
+        assert parse_prefix_fast(text) == reference(text)
+
+
+# 分块解析时行号连续，空白行跳过但计入行号
+def test_line_numbers_across_chunks():
+    lines = ["10.0.0.0/8", "", "bad", "2001:db8::/32", "  ", "10.1.0.0/16", "also bad", "192.168.1.1"]
+    result = parse_lines(lines * 3, parallel=False, chunk_size=3)
+    assert result.invalid == [(lineno + 8 * i, line) for i in range(3) for lineno, line in ((3, "bad"), (7, "also bad"))]
+    assert result.prefixes[4] == [(0x0A000000, 8), (0x0A010000, 16), (0xC0A80101, 32)] * 3
+    assert result.prefixes[6] == [(0x20010DB8 << 96, 32)] * 3
+    assert len(result) == 12
+    assert parse_chunk(lines, 11)[2] == [(13, "bad"), (17, "also bad")]
+
+
+# 进程池中途损坏：提交失败的块与在途的块都退回当前进程解析，不丢行
+@pytest.mark.parametrize("fail_after", [0, 1, 3, 5])
+def test_pool_submit_failure_loses_no_lines(monkeypatch, fail_after):
+    from concurrent.futures import Future
+    from concurrent.futures.process import BrokenProcessPool
+
+    from simplecidr import parser
+
+    class BreakingPool:
+        submitted = 0
+
+        def submit(self, func, *args):
+            if self.submitted >= fail_after:
+                raise BrokenProcessPool("pool broken")
+            self.submitted += 1
+            future = Future()
+            future.set_result(func(*args))
+            return future
+
+    monkeypatch.setattr(parser, "available_cpus", lambda: 4)
+    monkeypatch.setattr(parser, "PARALLEL_THRESHOLD", 4)
+    monkeypatch.setattr(parser, "process_pool", BreakingPool)
+    monkeypatch.setattr(parser, "shutdown_pool", lambda: None)
+    lines = [f"10.0.{i}.0/24" if i % 7 else f"bad{i}" for i in range(40)]
+    result = parse_lines(lines, chunk_size=2)
+    expected = parse_lines(lines, parallel=False)
+    assert result.prefixes == expected.prefixes
+    assert result.invalid == expected.invalid
@@ -0,0 +1,101 @@
+import random
+from ipaddress import ip_network
+
+import pytest
+
+from simplecidr.aggregation import aggregate_subnets
+from simplecidr.division import SubnetRange
+from simplecidr.lookup import PrefixTable
+from simplecidr.prefixset import PrefixSet, aggregate_prefix_set, is_prefix_set_file, save_prefix_set
+from simplecidr.sources import iter_prefix_file
+from simplecidr.subnetinfo import brief_rows
+from simplecidr.vlsm import allocate_vlsm
+
+
+def random_lines(rng, count4, count6):
+    lines = [str(ip_network((rng.getrandbits(32), rng.randint(16, 32)), strict=False)) for _ in range(count4)]
+    lines += [str(ip_network((rng.getrandbits(128), rng.randint(16, 128)), strict=False)) for _ in range(count6)]
+    return lines
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_aggregation_round_trip_and_reaggregation(tmp_path, seed):
+    rng = random.Random(seed)
+    lines = random_lines(rng, 2000, 500)
+    result = aggregate_subnets(lines, None, parallel=False)
+    path = tmp_path / "result.cidrset"
+    assert save_prefix_set(path, result) == len(result)
+    assert is_prefix_set_file(path)
+    with PrefixSet.open(path) as prefix_set:
+        assert list(prefix_set.cidrs()) == list(result.cidrs())
+        assert prefix_set.disjoint and prefix_set.prefixes[4].collapsed
+        # 再次汇总（含取超网）与从文本汇总的结果相同
+        for new_prefixlen in (None, 20, {4: 24, 6: 48}):
+            expected = aggregate_subnets(lines, new_prefixlen, parallel=False)
+            assert list(aggregate_prefix_set(prefix_set, new_prefixlen).cidrs()) == list(expected.cidrs())
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_lookup_matches_prefix_table(tmp_path, seed):
+    rng = random.Random(seed)
+    result = aggregate_subnets(random_lines(rng, 1000, 300), None, parallel=False)
+    path = tmp_path / "table.cidrset"
+    save_prefix_set(path, result)
+    table = PrefixTable.from_subnets(result)
+    with PrefixSet.open(path) as prefix_set:
+        assert prefix_set.lookup_table() is prefix_set
+        addresses = [(4, rng.getrandbits(32)) for _ in range(2000)] + [(6, rng.getrandbits(128)) for _ in range(2000)]
+        # 每个前缀内的地址一定能匹配到
+        for version in (4, 6):
+            for base, prefixlen in list(prefix_set.prefixes[version])[::10]:
+                addresses.append((version, base + rng.getrandbits((32 if version == 4 else 128) - prefixlen)))
+        for version, address in addresses:
+            assert prefix_set.lookup_int(version, address) == table.lookup_int(version, address)
+        lines = ["10.1.2.3", "", "bad", "2001:db8::1"]
+        invalid = []
+        assert list(prefix_set.lookup_lines(lines, invalid)) == list(table.lookup_lines(lines))
+        assert invalid == [(3, "bad")]
+
+
+# 未排序、互相重叠的前缀：写入时排序去重，查找时编译为 PrefixTable
+def test_unsorted_overlapping_prefixes(tmp_path):
+    lines = ["10.0.0.0/8", "10.1.0.0/16", "192.168.1.0/24", "10.1.0.0/16", "2001:db8::/32", "10.0.0.0/24"]
+    path = tmp_path / "lines.cidrset"
+    save_prefix_set(path, lines)
+    with PrefixSet.open(path) as prefix_set:
+        assert list(prefix_set.cidrs()) == ["10.0.0.0/8", "10.0.0.0/24", "10.1.0.0/16",
+                                            "192.168.1.0/24", "2001:db8::/32"]
+        assert not prefix_set.disjoint
+        assert prefix_set.lookup_table().lookup("10.1.2.3") == "10.1.0.0/16"
+    assert list(iter_prefix_file(path)) == ["10.0.0.0/8", "10.0.0.0/24", "10.1.0.0/16",
+                                            "192.168.1.0/24", "2001:db8::/32"]
+
+
+# 划分结果：打开后切片生成的表格行与原划分结果相同
+@pytest.mark.parametrize("network, new_prefixlen", [("10.0.0.0/12", 28), ("2001:db8::/44", 56)])
+def test_division_round_trip(tmp_path, network, new_prefixlen):
+    subnets = SubnetRange(ip_network(network), new_prefixlen)
+    path = tmp_path / "division.cidrset"
+    save_prefix_set(path, subnets)
+    with PrefixSet.open(path) as prefix_set:
+        assert prefix_set.count == subnets.count and prefix_set.disjoint
+        for start in (0, 1000, subnets.count - 5):
+            assert brief_rows(prefix_set[start:start + 5]) == brief_rows(subnets[start:start + 5])
+
+
+def test_vlsm_plan_is_sorted(tmp_path):
+    plan = allocate_vlsm(ip_network("10.0.0.0/16"), "a:100,b:1000,c:20")
+    path = tmp_path / "vlsm.cidrset"
+    save_prefix_set(path, plan)
+    with PrefixSet.open(path) as prefix_set:
+        expected = sorted((subnet.base, subnet.prefixlen) for subnet in plan.subnets)
+        assert list(prefix_set.prefixes[4]) == expected
+        assert prefix_set.disjoint
+
+
+def test_invalid_file(tmp_path):
+    path = tmp_path / "bad.cidrset"
+    path.write_bytes(b"10.0.0.0/8\n" * 10)
+    with pytest.raises(ValueError):
+        PrefixSet.open(path)
+    assert not is_prefix_set_file(path)
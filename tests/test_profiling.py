@@ -0,0 +1,38 @@
+import json
+
+from simplecidr.aggregation import aggregate_subnets
+from simplecidr.cli import main
+from simplecidr.profiling import Profiler, activate, deactivate, iter_stage, stage
+
+
+def test_stages_are_recorded_only_while_active():
+    with stage("未启用") as record:
+        record.add(1)
+    profiler = activate(Profiler("汇总", memory=True))
+    try:
+        aggregate_subnets(["10.0.0.0/24", "10.0.1.0/24", "bad"], 16, parallel=False)
+        assert list(iter_stage("迭代", [[1, 2], [3]], len)) == [[1, 2], [3]]
+    finally:
+        deactivate(profiler)
+    stages = {record["name"]: record for record in profiler.records()}
+    assert "未启用" not in stages
+    assert stages["解析"]["count"] == 3 and stages["解析"]["depth"] == 0
+    assert stages["读取输入"]["depth"] == 1
+    assert stages["合并前缀"]["calls"] == 1
+    assert stages["迭代"]["count"] == 3 and stages["迭代"]["calls"] == 3
+    # 外层的内存峰值不低于内层
+    assert stages["解析"]["peak_bytes"] >= stages["读取输入"]["peak_bytes"] > 0
+    assert profiler.summary_lines()[1] == "阶段\t用时(秒)\t次数\t数量\t内存峰值"
+    with stage("已停止"):
+        pass
+    assert "已停止" not in {record["name"] for record in profiler.records()}
+
+
+def test_cli_profile_writes_json_trace(tmp_path, capsys):
+    trace = tmp_path / "trace.json"
+    assert main(["--profile", str(trace), "divide", "10.0.0.0/16", "-p", "24", "-f", "csv"]) == 0
+    data = json.loads(trace.read_text(encoding="utf-8"))
+    stages = {record["name"]: record for record in data["stages"]}
+    assert stages["生成表格行"]["count"] == 256
+    assert all(event["ph"] == "X" for event in data["traceEvents"])
+    assert "divide：总用时" in capsys.readouterr().err
@@ -0,0 +1,156 @@
+import asyncio
+import json
+
+import pytest
+
+from simplecidr import server as server_module
+from simplecidr.server import STREAM_BATCH_SIZE, CalculatorServer
+
+
+# 在同一个持久连接上依次发送请求，返回 [(状态码, 响应头, 响应体), ...]
+async def exchange(requests, workers=0):
+    server = CalculatorServer(workers)
+    listener = await server.start("127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    responses = []
+    for method, path, payload in requests:
+        body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        writer.write(f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n\r\n"
+                     .encode("latin-1") + body)
+        head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+        headers = dict(line.split(": ", 1) for line in head[1:] if line)
+        if "Content-Length" in headers:
+            data = await reader.readexactly(int(headers["Content-Length"]))
+        else:
+            data = b""
+            while True:
+                size = int(await reader.readline(), 16)
+                chunk = await reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                data += chunk[:-2]
+        responses.append((int(head[0].split()[1]), headers, data))
+    writer.close()
+    listener.close()
+    await listener.wait_closed()
+    return responses
+
+
+def test_info_and_errors_share_connection():
+    (status, headers, body), (bad_status, _, bad_body), (missing, _, _) = asyncio.run(exchange([
+        ("GET", "/info?subnet=192.168.1.77/24", None),
+        ("GET", "/info?subnet=300.1.1.1/24", None),
+        ("GET", "/nope", None),
+    ]))
+    assert status == 200 and headers["Connection"] == "keep-alive"
+    assert json.loads(body)["host_addresses"] == 254
+    assert bad_status == 400 and "不是一个合规的网络" in json.loads(bad_body)["error"]
+    assert missing == 404
+
+
+def test_divide_page_and_stream_match():
+    (_, _, page), (_, headers, stream) = asyncio.run(exchange([
+        ("GET", "/divide?network=10.0.0.0/16&prefix=24&offset=10&limit=5", None),
+        ("GET", "/divide?network=10.0.0.0/16&prefix=24&stream=1", None),
+    ]))
+    page = json.loads(page)
+    lines = [json.loads(line) for line in stream.decode("utf-8").splitlines()]
+    assert page["count"] == 256 and page["next_offset"] == 15
+    assert headers["Transfer-Encoding"] == "chunked" and len(lines) == 256
+    assert [list(row.values()) for row in lines[10:15]] == page["rows"]
+
+
+def test_aggregate_and_batch():
+    (_, _, aggregated), (_, _, batch) = asyncio.run(exchange([
+        ("POST", "/aggregate", {"subnets": ["10.0.0.0/24", "10.0.1.0/24", "bad"], "prefix": 24}),
+        ("POST", "/batch", [{"path": "/info", "params": {"subnet": "10.0.0.0/8"}},
+                            {"path": "/divide", "params": {"network": "10.0.0.0/24", "subnets": 3}},
+                            {"path": "/divide", "params": {"network": "10.0.0.0/24"}}]),
+    ]))
+    aggregated = json.loads(aggregated)
+    assert aggregated["aggregated"] == ["10.0.0.0/23"] and aggregated["invalid"] == [[3, "bad"]]
+    results = json.loads(batch)["results"]
+    assert [result["status"] for result in results] == [200, 200, 400]
+    assert results[1]["body"]["count"] == 2
+
+
+def test_metrics_count_requests():
+    *_, (_, _, metrics) = asyncio.run(exchange([
+        ("GET", "/info?subnet=10.0.0.0/8", None),
+        ("GET", "/info?subnet=bad", None),
+        ("GET", "/metrics", None),
+    ]))
+    info = json.loads(metrics)["endpoints"]["/info"]
+    assert info["count"] == 2 and info["errors"] == 1
+    assert info["latency_ms"]["max"] >= info["latency_ms"]["p50"] >= 0
+
+
+# 发送原始请求，读取到服务器关闭连接为止
+async def raw_exchange(data):
+    server = CalculatorServer(0)
+    listener = await server.start("127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(data)
+    response = await asyncio.wait_for(reader.read(), 5)
+    writer.close()
+    listener.close()
+    await listener.wait_closed()
+    return response.decode("utf-8")
+
+
+@pytest.mark.parametrize("framing", [
+    "Content-Length: abc\r\n\r\n",
+    "Content-Length: -1\r\n\r\n",
+    "Transfer-Encoding: chunked\r\n\r\nzz\r\n",
+    "Transfer-Encoding: chunked\r\n\r\n-5\r\n",
+])
+def test_malformed_body_framing(framing):
+    # 后面跟着的请求不应被处理：格式错误后连接直接关闭
+    response = asyncio.run(raw_exchange(
+        f"POST /aggregate HTTP/1.1\r\nHost: test\r\n{framing}"
+        "GET /info?subnet=10.0.0.0/8 HTTP/1.1\r\nHost: test\r\n\r\n".encode("latin-1")))
+    assert response.startswith("HTTP/1.1 400 ") and "Connection: close" in response
+    assert "格式错误" in response and response.count("HTTP/1.1") == 1
+
+
+# 划分与生成流式输出都经过 run_cpu（计算量大时交给进程池），分段生成的结果与一次生成相同
+def test_stream_work_goes_through_run_cpu(monkeypatch):
+    calls = []
+    run_cpu = CalculatorServer.run_cpu
+
+    async def recording_run_cpu(self, weight, func, *args):
+        calls.append(func.__name__)
+        return await run_cpu(self, weight, func, *args)
+
+    monkeypatch.setattr(CalculatorServer, "run_cpu", recording_run_cpu)
+    limit = 2 * STREAM_BATCH_SIZE + 10
+    (_, headers, stream), (_, _, vlsm) = asyncio.run(exchange([
+        ("GET", f"/divide?network=10.0.0.0/8&prefix=32&stream=1&format=csv&offset=5&limit={limit}", None),
+        ("POST", "/divide", {"network": "10.0.0.0/24", "vlsm": 'a:2*60\nsay "hi":10', "stream": 1, "format": "csv"}),
+    ]))
+    lines = stream.decode("utf-8").splitlines()
+    assert headers["X-Total-Count"] == str(1 << 24) and len(lines) == limit + 1
+    assert lines[0] == "network,netmask,first,last,broadcast"
+    assert lines[1].startswith("10.0.0.5/32,") and lines[-1].startswith(f"10.2.0.{limit + 4 - 0x20000}/32,")
+    assert vlsm.decode("utf-8").splitlines()[-1].endswith(',"say ""hi"""')
+    assert calls == ["divide_count"] + ["stream_rows"] * 3 + ["divide_count", "stream_rows"]
+
+
+# 响应头发出后出错：不写错误 JSON 与结束块，直接关闭连接，同一连接上的后续请求不再处理
+def test_stream_error_aborts_connection(monkeypatch):
+    stream_rows = server_module.stream_rows
+
+    def failing_stream_rows(params, fmt, start, stop, header):
+        if start:
+            raise RuntimeError("boom")
+        return stream_rows(params, fmt, start, stop, header)
+
+    monkeypatch.setattr(server_module, "stream_rows", failing_stream_rows)
+    response = asyncio.run(raw_exchange(
+        f"GET /divide?network=10.0.0.0/8&prefix=32&stream=1&limit={2 * STREAM_BATCH_SIZE} HTTP/1.1\r\n"
+        "Host: test\r\n\r\nGET /info?subnet=10.0.0.0/8 HTTP/1.1\r\nHost: test\r\n\r\n".encode("latin-1")))
+    assert response.startswith("HTTP/1.1 200 ") and response.count("HTTP/1.1") == 1
+    assert '"error"' not in response and not response.endswith("0\r\n\r\n")
+    assert response.endswith("\r\n") and "10.0.255.255/32" in response
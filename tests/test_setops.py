@@ -0,0 +1,74 @@
+import random
+from ipaddress import collapse_addresses, ip_network
+
+import pytest
+
+from simplecidr.setops import set_operation
+
+
+def collapse(networks):
+    return [network for version in (4, 6)
+            for network in collapse_addresses(n for n in networks if n.version == version)]
+
+
+# 参照实现：逐个用 address_exclude 从 A 中挖去 B
+def reference_difference(left, right):
+    result = collapse(left)
+    for removed in collapse(right):
+        remaining = []
+        for network in result:
+            if network.version != removed.version or not network.overlaps(removed):
+                remaining.append(network)
+            elif removed.subnet_of(network):
+                remaining.extend(network.address_exclude(removed))
+        result = remaining
+    return collapse(result)
+
+
+REFERENCE = {
+    "union": lambda left, right: collapse(left + right),
+    "difference": reference_difference,
+    "intersect": lambda left, right: reference_difference(left, reference_difference(left, right)),
+    "symdiff": lambda left, right: collapse(reference_difference(left, right) + reference_difference(right, left)),
+}
+
+
+# 集中在较小的地址范围内，使两侧经常包含、相邻或重复
+def random_networks(rng, count):
+    networks = []
+    for _ in range(count):
+        if rng.random() < 0.7:
+            networks.append(ip_network((0x0A000000 | rng.getrandbits(16), rng.randint(17, 28)), strict=False))
+        else:
+            networks.append(ip_network(((0x20010db8 << 96) | rng.getrandbits(80), rng.randint(49, 64)), strict=False))
+    return networks
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("operation", sorted(REFERENCE))
+def test_matches_ipaddress(operation, seed):
+    rng = random.Random(seed)
+    left, right = random_networks(rng, 60), random_networks(rng, 60)
+    result = set_operation(operation, [str(n) for n in left], [str(n) for n in right], parallel=False)
+    assert result.networks() == REFERENCE[operation](left, right)
+    assert [row[1] for row in result.rows()] == [n.num_addresses for n in result.networks()]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_overlap_pairs(seed):
+    rng = random.Random(seed)
+    left, right = random_networks(rng, 60), random_networks(rng, 60)
+    result = set_operation("overlap", [str(n) for n in left], [str(n) for n in right], parallel=False)
+    expected = {(str(a), str(b)) for a in set(left) for b in set(right) if a.version == b.version and a.overlaps(b)}
+    rows = list(result.rows())
+    assert len(rows) == len(expected) and set(rows) == expected
+
+
+def test_edge_cases():
+    result = set_operation("difference", ["0.0.0.0/0", "::/0", "bad"], ["10.0.0.0/8", "2001:db8::/32"], parallel=False)
+    assert result.networks() == reference_difference([ip_network("0.0.0.0/0"), ip_network("::/0")],
+                                                     [ip_network("10.0.0.0/8"), ip_network("2001:db8::/32")])
+    assert result.invalid_lines["A"] == [(3, "bad")]
+    assert len(set_operation("intersect", ["10.0.0.0/24"], ["10.0.1.0/24"], parallel=False)) == 0
+    with pytest.raises(ValueError):
+        set_operation("nope", [], [])
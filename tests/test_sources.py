@@ -0,0 +1,51 @@
+import gzip
+
+import pytest
+
+from simplecidr.sources import iter_mapped_lines, iter_prefix_file, preview_prefix_file
+
+LINES = ["10.0.0.0/8", "", "2001:db8::/32", "bad line", "192.168.1.0/24"]
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+@pytest.mark.parametrize("bom", ["", "\ufeff"])
+def test_text_file_lines(tmp_path, newline, bom):
+    path = tmp_path / "routes.txt"
+    path.write_bytes((bom + newline.join(LINES) + newline).encode("utf-8"))
+    assert list(iter_prefix_file(path)) == LINES
+    # 块边界落在行中间时按行拼接，行数与文件一致
+    for block_size in (1, 3, 7, 64):
+        assert list(iter_mapped_lines(path, block_size)) == LINES
+
+
+def test_empty_and_unterminated_files(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+    assert list(iter_prefix_file(path)) == []
+    path.write_bytes(b"10.0.0.0/8\n10.1.0.0/16")
+    assert list(iter_prefix_file(path)) == ["10.0.0.0/8", "10.1.0.0/16"]
+
+
+def test_gzip_and_csv(tmp_path):
+    text = "\n".join(LINES) + "\n"
+    path = tmp_path / "routes.txt.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(text)
+    assert list(iter_prefix_file(path)) == LINES
+    # CSV 取指定列，表头产出空行，使行号与文件一致；带引号的单元格正常解析
+    csv_text = 'network,name\n10.0.0.0/8,"a, b"\n,empty\n2001:db8::/32,c\n'
+    path = tmp_path / "routes.csv"
+    path.write_text(csv_text, encoding="utf-8")
+    assert list(iter_prefix_file(path)) == ["", "10.0.0.0/8", "", "2001:db8::/32"]
+    assert list(iter_prefix_file(path, column=1)) == ["", "a, b", "empty", "c"]
+    path = tmp_path / "routes.csv.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write("10.0.0.0/8,x\n10.1.0.0/16,y\n")
+    assert list(iter_prefix_file(path)) == ["10.0.0.0/8", "10.1.0.0/16"]
+
+
+def test_preview(tmp_path):
+    path = tmp_path / "many.txt"
+    path.write_text("\n".join(f"10.0.{i // 256}.{i % 256}" for i in range(1000)), encoding="utf-8")
+    assert preview_prefix_file(path, 5) == [f"10.0.0.{i}" for i in range(5)]
+    assert len(preview_prefix_file(path)) == 200
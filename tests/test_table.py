@@ -0,0 +1,35 @@
+from ipaddress import ip_network
+
+import pytest
+
+from simplecidr.calculator import Calculator
+from simplecidr.export import iter_division_chunks
+from simplecidr.table import TableIndex, sort_key
+
+COLUMNS = ("network", "netmask", "first", "last", "broadcast")
+
+
+@pytest.fixture(scope="module")
+def index():
+    calculator = Calculator()
+    subnets = calculator.calculate_subnets_by_requirements(ip_network("10.0.0.0/16"), "A:2000, 500, 300*/28")
+    return TableIndex.from_chunks(COLUMNS, iter_division_chunks(calculator, subnets, chunk_size=64)).prepare()
+
+
+@pytest.mark.parametrize("text", ["", "10.0.1", ".255", "255.255.255.240", "10.0.9.1", "nothing"])
+def test_filters_match_brute_force(index, text):
+    assert index.view(text) == [i for i, row in enumerate(index.rows) if any(text in value for value in row)]
+    assert index.view(text, "prefix") == [
+        i for i, row in enumerate(index.rows) if any(value.startswith(text) for value in row)]
+
+
+def test_sort_by_address_not_text(index):
+    order = index.view("", sort_column="netmask", reverse=True)
+    keys = [sort_key(index.rows[i][1]) for i in order]
+    assert keys == sorted(keys, reverse=True)
+    # 按数值而不是按文本比较：10.0.10.0 排在 10.0.9.0 之后
+    order = index.view("", sort_column="network")
+    networks = [ip_network(index.rows[i][0]) for i in order]
+    assert networks == sorted(networks)
+    assert index.view("10.0.1", "prefix", "last", True) == sorted(
+        index.view("10.0.1", "prefix"), key=lambda i: sort_key(index.rows[i][3]), reverse=True)
@@ -0,0 +1,56 @@
+import random
+from ipaddress import ip_network
+
+import pytest
+
+from simplecidr.utilization import analyze_utilization
+
+
+# 逐个地址标记已分配，作为对照
+def brute_force(parent, lines):
+    used = set()
+    for line in lines:
+        network = ip_network(line, strict=False)
+        if network.version == parent.version and network.overlaps(parent):
+            start = max(int(network.network_address), int(parent.network_address))
+            end = min(int(network.broadcast_address), int(parent.broadcast_address))
+            used.update(range(start, end + 1))
+    return used
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_utilization_matches_brute_force(seed):
+    rng = random.Random(seed)
+    parent = ip_network("10.0.0.0/20")
+    lines = [f"{ip_network((0x0A000000 + rng.getrandbits(13), rng.randint(18, 30)), strict=False)}"
+             for _ in range(rng.randint(0, 60))]
+    report = analyze_utilization(parent, lines)
+    used = brute_force(parent, lines)
+    start = int(parent.network_address)
+    assert report.used_addresses == len(used)
+    free = set()
+    for block in report.free_cidrs():
+        block = ip_network(block)
+        assert block.subnet_of(parent)
+        free.update(range(int(block.network_address), int(block.broadcast_address) + 1))
+    assert free.isdisjoint(used) and len(free) + len(used) == parent.num_addresses
+    # 每种前缀长度可分配的数量：逐个检查对齐的子网是否完全空闲
+    for prefixlen, _, capacity in report.free_by_prefixlen():
+        size = 1 << (32 - prefixlen)
+        expected = sum(1 for base in range(start, start + parent.num_addresses, size)
+                       if used.isdisjoint(range(base, base + size)))
+        assert capacity == expected
+    cell_size, fractions = report.grid(start + 1024, 22, cells=64)
+    assert cell_size == 16
+    for i, fraction in enumerate(fractions):
+        cell = range(start + 1024 + i * 16, start + 1024 + (i + 1) * 16)
+        assert fraction == sum(1 for address in cell if address in used) / 16
+
+
+def test_utilization_report_summary():
+    report = analyze_utilization("10.0.0.0/23", ["10.0.0.0/26", "10.0.0.128/25", "192.168.0.0/24", "2001:db8::/32", "bad"])
+    assert report.utilization == 192 / 512
+    assert list(report.free_cidrs()) == ["10.0.0.64/26", "10.0.1.0/24"]
+    assert report.largest_free_block() == (0x0A000100, 24)
+    assert report.outside_count == 2 and report.invalid_lines == [(5, "bad")]
+    assert report.report_lines()[2:4] == ["前缀长度\t空闲块\t可分配数量", "/24\t1\t1"]
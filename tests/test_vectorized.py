@@ -0,0 +1,95 @@
+import random
+from ipaddress import IPv4Network, IPv6Network, ip_network
+
+import pytest
+
+from simplecidr import export
+from simplecidr.aggregation import aggregate_subnets
+from simplecidr.calculator import Calculator
+from simplecidr.cli import INFO_COLUMNS, main
+from simplecidr.export import iter_division_chunks
+from simplecidr.prefixset import PrefixSet, save_prefix_set
+from simplecidr.subnetinfo import brief_rows
+
+np = pytest.importorskip("numpy")
+from simplecidr.vectorized import (  # noqa: E402
+    brief_rows_vectorized, info_rows_vectorized, ipv4_columns, ipv6_lanes, iter_division_chunks_vectorized)
+
+
+# 以逐行计算（brief_rows 与 get_single_subnet_info，含 /31、/32 的处理）为准逐项对照
+@pytest.mark.parametrize("version, bits, network_class", [(4, 32, IPv4Network), (6, 128, IPv6Network)])
+def test_vectorized_rows_match_per_row_output(version, bits, network_class):
+    rng = random.Random(version)
+    addresses = [rng.getrandbits(bits) for _ in range(2000)] + [0, (1 << bits) - 1, (1 << bits) - 1]
+    prefixlens = [rng.randint(0, bits) for _ in range(2000)] + [0, bits, bits - 1]
+    if version == 6:
+        # IPv4 映射地址的显示格式特殊
+        addresses += [0xFFFF << 32 | 0x0A000001]
+        prefixlens += [120]
+        arrays = ipv6_lanes(addresses)
+    else:
+        arrays = np.array(addresses, dtype=np.uint32)
+    calculator = Calculator()
+    brief = brief_rows_vectorized(version, arrays, prefixlens)
+    info = info_rows_vectorized(version, arrays, prefixlens)
+    for address, prefixlen, brief_row, info_row in zip(addresses, prefixlens, brief, info):
+        network = network_class((address, prefixlen), strict=False)
+        assert brief_row == tuple(brief_rows([network])[0])
+        expected = calculator.compute_single_subnet_info(network.with_prefixlen)
+        assert info_row == tuple(value if isinstance(value, int) else str(value)
+                                 for value in (expected[column] for column in INFO_COLUMNS))
+
+
+def test_ipv4_columns_edge_prefixlens():
+    columns = ipv4_columns(np.array([0xC0A80107] * 3, dtype=np.uint32), [31, 32, 0])
+    assert columns["first"].tolist() == [0xC0A80106, 0xC0A80107, 1]
+    assert columns["last"].tolist() == [0xC0A80107, 0xC0A80107, 0xFFFFFFFE]
+    assert columns["host_addresses"].tolist() == [2, 1, (1 << 32) - 2]
+    with pytest.raises(ValueError):
+        ipv4_columns([0], [33])
+
+
+@pytest.mark.parametrize("network, requirement", [
+    ("10.0.0.0/16", 26), ("2001:db8::/52", 64), ("10.0.0.0/16", "A:2000, 500, 300*/28")])
+def test_division_chunks_match(network, requirement):
+    calculator = Calculator()
+    network = ip_network(network)
+    if isinstance(requirement, int):
+        subnets = calculator.calculate_subnets_by_new_prefix(network, requirement)
+    else:
+        subnets = calculator.calculate_subnets_by_requirements(network, requirement)
+    expected = [tuple(row) for chunk in iter_division_chunks(calculator, subnets, start=3, stop=900) for row in chunk]
+    assert [row for chunk in iter_division_chunks_vectorized(subnets, 256, 3, 900) for row in chunk] == expected
+
+
+# 行数达到阈值时导出与流式输出经过向量化后端，结果与逐行生成相同（含前缀集跨越两个协议版本的块）
+def test_export_chunks_use_vectorized_backend(monkeypatch, tmp_path):
+    calculator = Calculator()
+    path = tmp_path / "routes.cidrset"
+    save_prefix_set(path, aggregate_subnets(
+        [f"10.{i}.{j}.0/24" for i in range(4) for j in range(0, 256, 3)] + ["2001:db8::/48", "2001:db8:1::/64"],
+        None, parallel=False))
+    with PrefixSet.open(path) as prefix_set:
+        sources = [calculator.calculate_subnets_by_new_prefix(ip_network("10.0.0.0/8"), 20),
+                   calculator.calculate_subnets_by_new_prefix(ip_network("2001:db8::/48"), 60),
+                   calculator.calculate_subnets_by_requirements(ip_network("10.0.0.0/16"), "A:2000, 500, 300*/28"),
+                   prefix_set]
+        for subnets in sources:
+            expected = [tuple(row) for row in calculator.get_multiple_subnet_info(subnets[5:len(subnets) - 1])]
+            monkeypatch.setattr(export, "VECTORIZE_THRESHOLD", 0)
+            rows = [row for chunk in iter_division_chunks(calculator, subnets, 100, 5, len(subnets) - 1) for row in chunk]
+            assert rows == expected
+            # 未安装 numpy 时退回逐行生成
+            monkeypatch.setattr("simplecidr.vectorized.numpy_available", lambda: False)
+            rows = [row for chunk in iter_division_chunks(calculator, subnets, 100, 5, len(subnets) - 1) for row in chunk]
+            assert [tuple(row) for row in rows] == expected
+            monkeypatch.undo()
+
+
+def test_cli_numpy_output_is_identical(capsys):
+    lines = ["192.168.1.77/24", "10.0.0.1/31", "bad", "2001:db8::1/127", "8.8.8.8/32"]
+    for fmt in ("csv", "jsonl", "text"):
+        assert main(["info", "-f", fmt] + lines) == 1
+        expected = capsys.readouterr()
+        assert main(["info", "-f", fmt, "--numpy"] + lines) == 1
+        assert capsys.readouterr() == expected
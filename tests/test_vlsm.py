@@ -0,0 +1,98 @@
+import csv
+import io
+import json
+import random
+from ipaddress import collapse_addresses, ip_network
+
+import pytest
+
+from simplecidr.calculator import Calculator
+from simplecidr.cli import main
+from simplecidr.vlsm import allocate_vlsm, parse_requirements
+
+
+def test_parse_requirements():
+    assert parse_requirements("web: 100, 2*/30; 3x2", 32) == [
+        ("web", 25), ("#2", 30), ("#2", 30), ("#3", 31), ("#3", 31), ("#3", 31)]
+    for text in ("", "web:", "/33", "1*5000000000"):
+        with pytest.raises(ValueError):
+            parse_requirements(text, 32)
+
+
+# 数量在展开前与父网络的容量比较
+def test_count_capped_by_parent_capacity():
+    assert len(parse_requirements("64*/30", 32, 24)) == 64
+    with pytest.raises(ValueError, match="容量"):
+        parse_requirements("65*/30", 32, 24)
+    with pytest.raises(ValueError, match="容量"):
+        allocate_vlsm(ip_network("10.0.0.0/8"), "100000000*/30")
+    with pytest.raises(ValueError, match="容量"):
+        allocate_vlsm(ip_network("10.0.0.0/24"), "1*/16")
+
+
+# 需求名称随子网一起排序，并作为表格行的最后一列
+def test_names_in_rows():
+    plan = allocate_vlsm(ip_network("10.0.0.0/24"), "small: 10, big: 100, 2*/30")
+    assert [subnet.prefixlen for subnet in plan] == [25, 28, 30, 30]
+    assert plan.names == ["big", "small", "#3", "#3"]
+    rows = Calculator().get_multiple_subnet_info(plan[1:3])
+    assert rows == [("10.0.0.128/28", "255.255.255.240", "10.0.0.129", "10.0.0.142", "10.0.0.143", "small"),
+                    ("10.0.0.144/30", "255.255.255.252", "10.0.0.145", "10.0.0.146", "10.0.0.147", "#3")]
+
+
+# 参照实现：按前缀长度从小到大（块从大到小）依次放在下一个对齐的空闲地址；
+# 块大小单调不增时这样放置总是紧凑的，结果应与伙伴分配完全相同
+def reference_allocation(network, requirements):
+    cursor = int(network.network_address)
+    end = int(network.broadcast_address)
+    allocated, unallocated = [], []
+    for name, prefixlen in sorted(requirements, key=lambda requirement: requirement[1]):
+        subnet = ip_network((cursor, prefixlen)) if cursor <= end else None
+        if subnet is None or not subnet.subnet_of(network):
+            unallocated.append((name, prefixlen))
+            continue
+        allocated.append((subnet, name))
+        cursor = int(subnet.broadcast_address) + 1
+    return sorted(allocated), unallocated
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_buddy_matches_sorted_allocation(seed):
+    rng = random.Random(seed)
+    network = ip_network("10.0.0.0/20") if seed % 2 else ip_network("2001:db8::/116")
+    max_prefixlen = network.max_prefixlen
+    requirements = [(f"r{i}", rng.randint(network.prefixlen + 1, max_prefixlen)) for i in range(rng.randint(1, 60))]
+    plan = allocate_vlsm(network, requirements)
+    allocated, unallocated = reference_allocation(network, requirements)
+    assert [ip_network((subnet.base, subnet.prefixlen)) for subnet in plan] == [subnet for subnet, _ in allocated]
+    assert plan.names == [name for _, name in allocated]
+    assert plan.unallocated == unallocated
+    # 空闲块与已分配的子网恰好铺满父网络
+    free = [ip_network(block) for block in plan.free_blocks]
+    used = [subnet for subnet, _ in allocated]
+    assert sum(block.num_addresses for block in free + used) == network.num_addresses
+    assert list(collapse_addresses(free + used)) == [network]
+
+
+def test_capacity_errors_and_shortage():
+    network = ip_network("192.168.0.0/24")
+    plan = allocate_vlsm(network, "a:100, b:100, c:100")
+    assert [subnet.prefixlen for subnet in plan] == [25, 25] and plan.unallocated == [("c", 25)]
+    assert plan.free_blocks == []
+    with pytest.raises(ValueError, match="主机数量超出范围"):
+        parse_requirements("5000000000", 32)
+    with pytest.raises(ValueError, match="前缀长度超出范围"):
+        parse_requirements("/129", 128)
+
+
+# 名称中的引号等字符在 CSV 与 JSON Lines 中正确转义
+def test_cli_output_escapes_names(tmp_path):
+    for suffix in ("csv", "jsonl"):
+        path = tmp_path / f"plan.{suffix}"
+        assert main(["divide", "10.0.0.0/24", "--vlsm", 'say "hi": 10, a\\b: /30', "-o", str(path)]) == 0
+        text = path.read_text(encoding="utf-8")
+        if suffix == "csv":
+            rows = list(csv.reader(io.StringIO(text)))
+            assert rows[0][-1] == "name" and [row[-1] for row in rows[1:]] == ['say "hi"', "a\\b"]
+        else:
+            assert [json.loads(line)["name"] for line in text.splitlines()] == ['say "hi"', "a\\b"]